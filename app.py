@@ -1,26 +1,88 @@
+import importlib
+
 import streamlit as st
-# Mengimpor fungsi dari file app.py dan retail.py
-from retail import show_retail1_content
-from retail2 import show_retail2_content
+
+import profiling
+from stage_cache import get_stage_cache
 
 st.set_page_config(
     page_title="SDR Kita",
     layout="wide"
 )
 
+# Halaman aplikasi: label -> (modul, fungsi tampilan).
+# Modul baru diimpor saat halamannya pertama kali dibuka, sehingga library berat
+# (scikit-learn, matplotlib, seaborn) tidak ikut dimuat saat aplikasi dibuka.
+PAGES = {
+    "Retail by Interval": ("retail", "show_retail1_content"),
+    "Retail by Min Max": ("retail2", "show_retail2_content"),
+    "Layout Optimization": ("layouting", "show_layouting_content"),
+}
+
+
+def load_page(label):
+    """Mengimpor modul halaman (sekali per proses) dan mengembalikan fungsi tampilannya."""
+    module_name, function_name = PAGES[label]
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def show_profile_panel(container):
+    """Panel sidebar: waktu dan memori per stage pada run terakhir yang tercatat, bisa diunduh/ditambahkan ke log."""
+    last = st.session_state.get("last_profile")
+    with container.expander("Profil Performa", expanded=True):
+        cache_stats = get_stage_cache().stats()
+        hit_rate = '-' if cache_stats['hit_rate'] is None else f"{cache_stats['hit_rate']:.0%}"
+        st.caption(
+            f"Stage cache: {cache_stats['hits']} hit / {cache_stats['misses']} miss ({hit_rate}), "
+            f"{cache_stats['entries']} entri, {cache_stats['size_mb']:.1f} MB"
+        )
+        if not last:
+            st.caption("Belum ada stage yang tercatat (hasil mungkin diambil dari cache).")
+            return
+        st.caption(f"Run terakhir: {last['page']}")
+        st.dataframe(profiling.summarize(last['stages']).round(3), use_container_width=True, hide_index=True)
+        # Data bersama dihitung sekali per server; tambahan per sesi hanya session_state
+        st.caption(f"Memori per sesi: {last['session_mb']:.2f} MB · data bersama: {last['shared_mb']:.1f} MB")
+        st.download_button(
+            "Unduh JSON",
+            profiling.to_jsonl(last['stages'], page=last['page'], session_mb=last['session_mb'], shared_mb=last['shared_mb']),
+            file_name="sdr_profile.jsonl",
+            mime="application/json"
+        )
+        if st.button("Tambahkan ke log", key="append_profile_log"):
+            path = profiling.append_log(last['stages'], page=last['page'], session_mb=last['session_mb'], shared_mb=last['shared_mb'])
+            st.success(f"Disimpan ke `{path}`")
+
+
 def main():
     st.title("SDR Kita")
-    
-    # Membuat dua tab
-    tab1, tab2 = st.tabs(["Retail by Interval", "Retail by Min Max"])
-
-    with tab1:
-        # Memanggil fungsi dari file app.py
-        show_retail1_content() 
 
-    with tab2:
-        # Memanggil fungsi dari file retail.py
-        show_retail2_content()
+    # Hanya halaman yang aktif yang dijalankan; st.tabs menjalankan semua tab di setiap rerun
+    active_page = st.radio(
+        "Halaman",
+        list(PAGES),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_page"
+    )
+    show_profile = st.sidebar.toggle("Tampilkan profil performa", key="show_profile")
+    profile_container = st.sidebar.container()
+    stage_records = profiling.start_run()
+    try:
+        load_page(active_page)()
+    finally:
+        # Rerun tanpa stage (mis. semua dari cache, atau klik tombol log) tidak menimpa profil terakhir
+        if stage_records:
+            session_values = [value for key, value in st.session_state.items() if key != "last_profile"]
+            st.session_state["last_profile"] = {
+                'page': active_page,
+                'stages': stage_records,
+                'session_mb': profiling.session_memory_mb(session_values),
+                'shared_mb': float(profiling.shared_memory()['mb'].sum()),
+            }
+        if show_profile:
+            show_profile_panel(profile_container)
 
 if __name__ == "__main__":
     main()
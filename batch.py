@@ -0,0 +1,232 @@
+"""Menjalankan pipeline SDR Kita tanpa Streamlit untuk satu folder file ekspor.
+
+Contoh:
+    python batch.py interval exports/zrw70 --out hasil/
+    python batch.py minmax exports/stock --out hasil/ --multiplier 1.5
+    python batch.py layout exports/zrw70 --out hasil/ --zones ZAK ZAL --rows 2
+    python batch.py ingest exports/zrw70
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import dataset_store
+import replenishment
+import zrw70_processing
+from clustering import CLUSTERING_METHODS, LINKAGE_OPTIONS
+from data_cache import read_static_table
+from interval_engine import DEFAULT_INTERVAL_GRID, INTERVAL_GRIDS
+from layout_pipeline import LAYOUT_RAW_COLUMNS, MASTER_COLUMNS, ZONES, cluster_material_groups, filter_zones, merge_master_data, picking_priority, zone_layout
+from uom_service import UOM_DATA_FILE, get_uom_index
+from xlsx_ingest import read_xlsx
+
+MASTER_FILE_PATH = 'Material Group.xlsx'
+
+
+def list_exports(input_dir, patterns=('*.xlsx', '*.csv')):
+    """File ekspor di folder input (file sementara Excel '~$...' dilewati)."""
+    paths = []
+    for pattern in patterns:
+        paths.extend(glob.glob(os.path.join(input_dir, pattern)))
+    return sorted(p for p in paths if not os.path.basename(p).startswith('~$'))
+
+
+def _output_path(out_dir, source_path, suffix):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(out_dir, f"{stem}.{suffix}.parquet")
+
+
+def _read_raw(path, columns=LAYOUT_RAW_COLUMNS):
+    """Data mentah ZRW70, hanya kolom `columns` (XLSX dibaca dalam mode read-only)."""
+    if path.lower().endswith('.csv'):
+        return pd.read_csv(path, usecols=lambda col: col in columns)
+    return read_xlsx(path, columns)
+
+
+def run_interval_file(path, out_dir, uom_path, interval_grid, chunksize, quantiles=()):
+    """Data mentah ZRW70 -> statistik per interval (streaming)."""
+    uom_index = get_uom_index(uom_path)
+    result = zrw70_processing.process_raw_data_chunked(path, uom_index, chunksize=chunksize, interval_grid=interval_grid, quantiles=quantiles)
+    out_path = _output_path(out_dir, path, 'interval')
+    result.to_parquet(out_path, index=False)
+    return out_path, len(result)
+
+
+def run_minmax_file(path, out_dir, uom_path, avg_column, multiplier):
+    """Stock analysis -> Min/Max Replenishment."""
+    df = replenishment.attach_pcs_per_box(replenishment.load_stock_analysis(path), replenishment.load_uom_table(uom_path))
+    result = replenishment.calculate_replenishment(df, avg_column, multiplier)
+    out_path = _output_path(out_dir, path, 'minmax')
+    result.to_parquet(out_path, index=False)
+    return out_path, len(result)
+
+
+def prepare_layout_file(path, master_path, zones, n_clusters, method, linkage):
+    """Tahap bersama layout (gabung master, clustering, prioritas) untuk satu file.
+
+    Mengembalikan (prioritas, frame per zona, stats clustering dengan memori puncak).
+    """
+    master_df = read_static_table(master_path, columns=MASTER_COLUMNS)
+    merged_df, _ = merge_master_data(_read_raw(path), master_df)
+    df_filtered = filter_zones(merged_df, zones)
+    if df_filtered.empty:
+        return None, {}, {}
+    clustering_results, _, clustering_stats = cluster_material_groups(df_filtered, n_clusters, method, linkage, track_memory=True)
+    priority = picking_priority(df_filtered, clustering_results)
+    zone_frames = {zone: df_filtered[df_filtered['Storage Type Suggestion'] == zone] for zone in zones}
+    return priority, {zone: zone_df for zone, zone_df in zone_frames.items() if not zone_df.empty}, clustering_stats
+
+
+def run_layout_zone(path, out_dir, zone, zone_df, priority, num_rows):
+    """Slotting + replay untuk satu zona dari satu file."""
+    result = zone_layout(zone_df, priority, num_rows)
+    out_path = _output_path(out_dir, path, f"layout_{zone}")
+    result['layout'].to_parquet(out_path, index=False)
+    result['replay'].to_parquet(_output_path(out_dir, path, f"replay_{zone}"), index=False)
+    return out_path, len(result['layout'])
+
+
+def collect_raw_file(path, storage_type, chunksize):
+    """Total harian per jam dari satu file mentah (untuk dataset store)."""
+    return zrw70_processing.collect_hourly_totals(path, chunksize=chunksize, storage_type=storage_type)
+
+
+def _run_pool(jobs, workers):
+    """Menjalankan daftar (label, fungsi, argumen) di process pool; mengembalikan jumlah kegagalan."""
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(func, *args): label for label, func, args in jobs}
+        for future in as_completed(futures):
+            label = futures[future]
+            try:
+                out_path, n_rows = future.result()
+                print(f"[OK] {label} -> {out_path} ({n_rows} baris)")
+            except Exception as e:
+                failures += 1
+                print(f"[GAGAL] {label}: {e}", file=sys.stderr)
+    return failures
+
+
+def _run_layout(paths, args):
+    failures = 0
+    zone_jobs = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(prepare_layout_file, path, args.master, args.zones, args.clusters, args.method, args.linkage): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                priority, zone_frames, clustering_stats = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[GAGAL] {path}: {e}", file=sys.stderr)
+                continue
+            if priority is None:
+                print(f"[LEWATI] {path}: tidak ada data untuk zona {', '.join(args.zones)}")
+                continue
+            print(f"[CLUSTER] {path}: metode {clustering_stats['method']}, {clustering_stats['n_items']} item, "
+                  f"{clustering_stats['runtime_s']} detik, memori puncak {clustering_stats['peak_memory_mb']} MB")
+            priority.to_parquet(_output_path(args.out, path, 'layout_priority'), index=False)
+            for zone, zone_df in zone_frames.items():
+                zone_jobs.append((f"{path} [{zone}]", run_layout_zone, (path, args.out, zone, zone_df, priority, args.rows)))
+    return failures + _run_pool(zone_jobs, args.workers)
+
+
+def _run_ingest(paths, args):
+    """Mengumpulkan total per jam secara paralel, lalu menulis ke store berurutan nama file (file terakhir menang)."""
+    if args.store:
+        dataset_store.STORE_DIR = args.store
+    failures = 0
+    collected = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(collect_raw_file, path, args.storage_type, args.chunksize): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                collected[path] = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"[GAGAL] {path}: {e}", file=sys.stderr)
+
+    for path in sorted(collected):
+        hourly, material_info, uom_info = collected[path]
+        if hourly is None:
+            print(f"[LEWATI] {path}: tidak ada data untuk Storage Type {args.storage_type}")
+            continue
+        months = dataset_store.append_hourly(hourly, material_info, uom_info, storage_type=args.storage_type)
+        print(f"[OK] {path} -> {dataset_store.STORE_DIR} (bulan {', '.join(months)})")
+    return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Pipeline SDR Kita tanpa Streamlit (batch per folder).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Jumlah proses paralel.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    interval = sub.add_parser('interval', help="ZRW70 mentah -> statistik Min/Max/Avg per interval.")
+    interval.add_argument('input_dir')
+    interval.add_argument('--out', required=True)
+    interval.add_argument('--uom', default=UOM_DATA_FILE)
+    interval.add_argument('--grid', default=DEFAULT_INTERVAL_GRID, choices=sorted(INTERVAL_GRIDS))
+    interval.add_argument('--chunksize', type=int, default=50_000)
+    interval.add_argument('--quantiles', type=float, nargs='*', default=[], help="Kuantil total harian, mis. 0.5 0.9 0.95.")
+
+    minmax = sub.add_parser('minmax', help="Stock analysis -> Min/Max Replenishment.")
+    minmax.add_argument('input_dir')
+    minmax.add_argument('--out', required=True)
+    minmax.add_argument('--uom', default=UOM_DATA_FILE)
+    minmax.add_argument('--avg-column', default=replenishment.DEFAULT_AVG_COLUMN)
+    minmax.add_argument('--multiplier', type=float, default=1.5)
+
+    layout = sub.add_parser('layout', help="ZRW70 + Material Group -> cluster dan layout per zona.")
+    layout.add_argument('input_dir')
+    layout.add_argument('--out', required=True)
+    layout.add_argument('--master', default=MASTER_FILE_PATH)
+    layout.add_argument('--zones', nargs='+', default=ZONES, choices=ZONES)
+    layout.add_argument('--rows', type=int, default=2)
+    layout.add_argument('--clusters', type=int, default=3)
+    layout.add_argument('--method', default='auto', choices=CLUSTERING_METHODS)
+    layout.add_argument('--linkage', default='average', choices=LINKAGE_OPTIONS)
+
+    ingest = sub.add_parser('ingest', help="ZRW70 mentah -> dataset store (partisi per bulan).")
+    ingest.add_argument('input_dir')
+    ingest.add_argument('--store', default=None, help="Folder dataset store (default: SDR_STORE_DIR atau sdr_store).")
+    ingest.add_argument('--storage-type', default='ZYY')
+    ingest.add_argument('--chunksize', type=int, default=50_000)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    paths = list_exports(args.input_dir)
+    if not paths:
+        print(f"Tidak ada file .xlsx/.csv di {args.input_dir}", file=sys.stderr)
+        return 1
+    if getattr(args, 'out', None):
+        os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    if args.command == 'interval':
+        jobs = [(path, run_interval_file, (path, args.out, args.uom, args.grid, args.chunksize, tuple(args.quantiles))) for path in paths]
+        failures = _run_pool(jobs, args.workers)
+    elif args.command == 'minmax':
+        jobs = [(path, run_minmax_file, (path, args.out, args.uom, args.avg_column, args.multiplier)) for path in paths]
+        failures = _run_pool(jobs, args.workers)
+    elif args.command == 'layout':
+        failures = _run_layout(paths, args)
+    else:
+        failures = _run_ingest(paths, args)
+
+    print(f"Selesai dalam {time.perf_counter() - start:.1f} detik, {failures} gagal.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Benchmark skala pipeline SDR Kita pada data ZRW70 sintetis.
+
+Contoh:
+    python bench.py --scales 10k 100k
+    python bench.py --scales 10k 100k 1m --save-baseline
+    python bench.py --scales 1m --tolerance 0.2 --out bench_hasil.json
+    python bench.py --scales 10k --xlsx-rows 500000
+
+Setiap benchmark dicatat throughput (baris/detik, waktu terbaik dari `--repeat`)
+dan memori puncak (tracemalloc). Hasil dibandingkan dengan baseline JSON;
+exit code 1 jika ada regresi di atas toleransi. Baseline dari mesin lain (Python,
+arsitektur, model atau jumlah CPU berbeda) tidak dibandingkan kecuali dengan
+`--ignore-platform`.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import replenishment
+import synthetic
+import zrw70_processing
+from clustering import cluster_items
+from cooccurrence import cooccurrence_matrix
+from layout_pipeline import merge_master_data
+from quantile_sketch import DEFAULT_QUANTILES, build_sketch, exact_quantiles, sketch_quantiles, validate_quantiles
+from slotting import optimize_slotting
+from xlsx_ingest import read_xlsx
+
+BASELINE_FILE = os.environ.get('SDR_BENCH_BASELINE', 'bench_baseline.json')
+# Jumlah pass local search slotting per run; tanpa batas waktu agar kerja per run tetap
+SLOTTING_PASSES = 5
+
+
+def _prepare(n_rows, n_skus, seed):
+    """Data sintetis satu skala: ZRW70, master UoM, data layout (sudah digabung), dan stock analysis."""
+    materials = synthetic.generate_materials(n_skus, seed=seed)
+    raw = synthetic.generate_zrw70(n_rows, materials, seed=seed)
+    df_uom = synthetic.uom_master(materials)
+    layout_df, _ = merge_master_data(raw[raw['Storage Type Suggestion'] != 'ZYY'], synthetic.material_group_master(materials))
+    stock = replenishment.attach_pcs_per_box(synthetic.generate_stock_analysis(n_rows, materials, seed=seed), df_uom)
+    daily = zrw70_processing.daily_interval_totals(zrw70_processing.prepare_rows(raw))
+    return {'raw': raw, 'uom': df_uom, 'layout': layout_df, 'stock': stock, 'daily': daily}
+
+
+def _benchmarks(data):
+    """Daftar (nama, jumlah baris input, fungsi tanpa argumen)."""
+    state = {}
+
+    def cooccurrence():
+        state['co'], state['ids'] = cooccurrence_matrix(data['layout'], item_col='Material Group 2')
+
+    def clustering():
+        cluster_items(state['co'], n_clusters=3)
+
+    def slotting():
+        co = state['co']
+        weights = np.asarray(co.diagonal()).ravel()
+        num_rows = 2
+        optimize_slotting(weights, num_rows, max(1, (len(weights) + num_rows - 1) // num_rows), co_occurrence=co,
+                          max_passes=SLOTTING_PASSES, time_limit=float('inf'))
+
+    daily_keys = ['Material ID', 'Time Interval', 'Movement Type']
+
+    def quantile_sketch():
+        sketch_quantiles(build_sketch(data['daily'], daily_keys, 'TO Dummy Quantity'), daily_keys, DEFAULT_QUANTILES)
+
+    def quantile_exact():
+        exact_quantiles(data['daily'], daily_keys, 'TO Dummy Quantity', DEFAULT_QUANTILES)
+
+    return [
+        ('process_raw_data', len(data['raw']), lambda: zrw70_processing.process_raw_data(data['raw'], data['uom'])),
+        ('calculate_replenishment', len(data['stock']),
+         lambda: replenishment.calculate_replenishment(data['stock'].copy(), replenishment.DEFAULT_AVG_COLUMN)),
+        ('cooccurrence', len(data['layout']), cooccurrence),
+        ('clustering', len(data['layout']), clustering),
+        ('slotting', len(data['layout']), slotting),
+        ('quantile_sketch', len(data['daily']), quantile_sketch),
+        ('quantile_exact', len(data['daily']), quantile_exact),
+    ]
+
+
+def _measure(func, repeat, memory):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return best, peak_mb
+
+
+def run_scale(scale, n_skus=2_000, repeat=3, memory=True, seed=0):
+    """Menjalankan semua benchmark untuk satu skala; mengembalikan {'nama@skala': hasil}."""
+    n_rows = synthetic.SCALES[scale]
+    data = _prepare(n_rows, n_skus, seed)
+    results = {}
+    for name, rows, func in _benchmarks(data):
+        seconds, peak_mb = _measure(func, repeat, memory)
+        results[f"{name}@{scale}"] = {
+            'rows': rows,
+            'seconds': round(seconds, 4),
+            'rows_per_s': round(rows / seconds, 1) if seconds else None,
+            'peak_mb': None if peak_mb is None else round(peak_mb, 1),
+        }
+        print(f"{name:<24} {scale:>5}  {seconds:8.3f} s  {results[f'{name}@{scale}']['rows_per_s'] or 0:>14,.0f} baris/s  "
+              f"{'-' if peak_mb is None else f'{peak_mb:,.1f} MB':>12}")
+
+    # Akurasi sketch kuantil terhadap jalur eksak
+    accuracy = validate_quantiles(data['daily'], ['Material ID', 'Time Interval', 'Movement Type'], 'TO Dummy Quantity')
+    print(accuracy.round(3).to_string(index=False))
+    results[f"quantile_accuracy@{scale}"] = {
+        row['Kuantil']: {'mean_abs_error': round(float(row['Galat Rata-rata']), 4), 'max_abs_error': round(float(row['Galat Maksimum']), 4)}
+        for _, row in accuracy.iterrows()
+    }
+    return results
+
+
+def _write_stock_xlsx(path, n_rows, n_skus, seed):
+    """File Stock Analysis sintetis dengan tata letak ekspor asli (3 baris judul, lalu header)."""
+    from openpyxl import Workbook
+
+    df = synthetic.generate_stock_analysis(n_rows, synthetic.generate_materials(n_skus, seed=seed), seed=seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['Retail Warehouse Stock Analysis'])
+    sheet.append([])
+    sheet.append([])
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([value.item() if isinstance(value, np.generic) else value for value in row])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def run_xlsx_ingest(n_rows, n_skus=2_000, seed=0, workdir=None):
+    """Membaca file Stock Analysis XLSX sintetis dengan `read_xlsx` dan dengan `pd.read_excel`.
+
+    File ditulis sekali ke `workdir` (bawaan folder sementara) dan dipakai ulang. Setiap
+    jalur dibaca satu kali (tanpa tracemalloc, yang memperlambat openpyxl berlipat-lipat).
+    """
+    import pandas as pd
+
+    path = os.path.join(workdir or tempfile.gettempdir(), f"sdr_bench_stock_{n_rows}_{seed}.xlsx")
+    if not os.path.exists(path):
+        _write_stock_xlsx(path, n_rows, n_skus, seed)
+    readers = [
+        ('xlsx_read_xlsx', lambda: read_xlsx(path, names=replenishment.STOCK_ANALYSIS_COLUMNS, skiprows=3)),
+        ('xlsx_read_excel', lambda: pd.read_excel(path, names=replenishment.STOCK_ANALYSIS_COLUMNS, skiprows=3)),
+    ]
+    results = {}
+    for name, func in readers:
+        seconds, _ = _measure(func, 1, False)
+        results[f"{name}@{n_rows}"] = {'rows': n_rows, 'seconds': round(seconds, 4), 'rows_per_s': round(n_rows / seconds, 1),
+                                       'peak_mb': None}
+        print(f"{name:<24} {n_rows:>7,}  {seconds:8.3f} s  {n_rows / seconds:>14,.0f} baris/s")
+    return results
+
+
+def _cpu_model():
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as handle:
+            for line in handle:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def platform_info():
+    """Ciri mesin yang memengaruhi angka throughput; dicatat di baseline dan dicek sebelum membandingkan."""
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'cpu': _cpu_model(), 'cpus': os.cpu_count()}
+
+
+def platform_mismatch(baseline_info, current=None):
+    """Daftar ciri mesin yang berbeda antara baseline dan mesin ini (kosong jika sama)."""
+    current = current or platform_info()
+    return [f"{key}: baseline {baseline_info.get(key)!r}, mesin ini {value!r}"
+            for key, value in current.items() if baseline_info.get(key) != value]
+
+
+def compare(results, baseline, tolerance=0.15):
+    """Regresi dibanding baseline: throughput turun atau memori puncak naik lebih dari `tolerance`."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or 'rows_per_s' not in result:
+            continue
+        if base.get('rows_per_s') and result['rows_per_s'] and result['rows_per_s'] < base['rows_per_s'] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {result['rows_per_s']:,.0f} < baseline {base['rows_per_s']:,.0f} baris/s")
+        if base.get('peak_mb') and result['peak_mb'] and result['peak_mb'] > base['peak_mb'] * (1 + tolerance):
+            regressions.append(f"{key}: memori puncak {result['peak_mb']:,.1f} > baseline {base['peak_mb']:,.1f} MB")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark skala pipeline SDR Kita dengan data sintetis.")
+    parser.add_argument('--scales', nargs='+', default=['10k', '100k'], choices=list(synthetic.SCALES))
+    parser.add_argument('--skus', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran memori puncak (tracemalloc).")
+    parser.add_argument('--xlsx-rows', type=int, default=None,
+                        help="Juga membandingkan read_xlsx dengan pd.read_excel pada file Stock Analysis XLSX sebanyak N baris.")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil sebagai baseline baru.")
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    parser.add_argument('--ignore-platform', action='store_true',
+                        help="Tetap membandingkan walaupun baseline direkam di mesin/Python lain.")
+    parser.add_argument('--out', default=None, help="File JSON untuk hasil run ini.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = {}
+    for scale in args.scales:
+        results.update(run_scale(scale, args.skus, args.repeat, not args.no_memory, args.seed))
+    if args.xlsx_rows:
+        results.update(run_xlsx_ingest(args.xlsx_rows, args.skus, args.seed))
+
+    run_info = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **platform_info(),
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as handle:
+            json.dump(run_info, handle, indent=2)
+
+    baseline_info = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline_info = json.load(handle)
+    baseline = baseline_info.get('results', {})
+
+    if args.save_baseline:
+        # Hasil baru ditimpakan ke baseline lama (skala yang tidak dijalankan tetap)
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump({**run_info, 'results': {**baseline, **results}}, handle, indent=2)
+        print(f"Baseline disimpan ke {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"Tidak ada baseline di {args.baseline}; jalankan dengan --save-baseline untuk membuatnya.")
+        return 0
+    # Throughput absolut hanya bermakna di mesin yang sama dengan baseline
+    mismatch = platform_mismatch(baseline_info)
+    if mismatch and not args.ignore_platform:
+        print(f"[PERINGATAN] Baseline {args.baseline} direkam di mesin lain ({'; '.join(mismatch)}); "
+              "perbandingan dilewati. Buat baseline di mesin ini dengan --save-baseline, atau pakai --ignore-platform.",
+              file=sys.stderr)
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"[REGRESI] {line}", file=sys.stderr)
+    print(f"{len(regressions)} regresi dibanding baseline (toleransi {args.tolerance:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import sparse
+
+CLUSTERING_METHODS = ['auto', 'agglomerative', 'connectivity', 'spectral']
+LINKAGE_OPTIONS = ['average', 'complete', 'single', 'ward']
+
+# Batas jumlah item untuk metode matriks jarak padat (memori O(n^2))
+DENSE_MAX_ITEMS = 2000
+
+
+def _dense_agglomerative(co_occurrence, n_clusters, linkage):
+    from sklearn.cluster import AgglomerativeClustering
+
+    if linkage == 'ward':
+        raise ValueError("Linkage 'ward' tidak bisa dipakai dengan jarak precomputed.")
+    distance_matrix = 1 / (co_occurrence.toarray() + 1)
+    model = AgglomerativeClustering(n_clusters=n_clusters, metric='precomputed', linkage=linkage)
+    return model.fit_predict(distance_matrix)
+
+
+def spectral_embedding(co_occurrence, n_components=16):
+    """Embedding spektral dari afinitas sparse D^-1/2 A D^-1/2 (randomized SVD, tanpa matriks padat)."""
+    from sklearn.preprocessing import normalize
+    from sklearn.utils.extmath import randomized_svd
+
+    n_items = co_occurrence.shape[0]
+    n_components = max(1, min(n_components, n_items - 1))
+    # Self-loop kecil agar item tanpa pasangan tetap punya derajat > 0
+    affinity = co_occurrence.astype(float) + sparse.identity(n_items, format='csr')
+    degree = np.asarray(affinity.sum(axis=1)).ravel()
+    inv_sqrt = sparse.diags(1 / np.sqrt(degree))
+    normalized = (inv_sqrt @ affinity @ inv_sqrt).tocsr()
+
+    if n_items <= 2 * n_components + 10:
+        u, s, _ = np.linalg.svd(normalized.toarray())
+        u, s = u[:, :n_components], s[:n_components]
+    else:
+        u, s, _ = randomized_svd(normalized, n_components=n_components, n_iter=4, random_state=0)
+    return normalize(u * s)
+
+
+def _connectivity_agglomerative(co_occurrence, n_clusters, linkage):
+    from sklearn.cluster import AgglomerativeClustering
+
+    # Penggabungan hanya boleh antar item yang pernah muncul bersama (graf sparse)
+    connectivity = (co_occurrence > 0).astype(np.int8)
+    model = AgglomerativeClustering(n_clusters=n_clusters, connectivity=connectivity, linkage=linkage)
+    return model.fit_predict(spectral_embedding(co_occurrence))
+
+
+def _spectral(co_occurrence, n_clusters):
+    from sklearn.cluster import KMeans
+
+    embedding = spectral_embedding(co_occurrence, n_components=max(n_clusters, 8))
+    return KMeans(n_clusters=n_clusters, n_init=3, random_state=0).fit_predict(embedding)
+
+
+def cluster_items(co_occurrence, n_clusters=3, method='auto', linkage='average', track_memory=False):
+    """Clustering item berdasarkan graf co-occurrence sparse.
+
+    Metode:
+    - 'agglomerative': jarak padat 1 / (co + 1) (perilaku lama, memori O(n^2)).
+    - 'connectivity': agglomerative pada embedding spektral, hanya menggabungkan
+      item yang terhubung di graf sparse. Linkage 'ward' paling cepat untuk set besar.
+    - 'spectral': k-means pada embedding spektral; paling ringan untuk 50k+ item.
+    - 'auto': 'agglomerative' untuk set kecil, 'spectral' untuk set besar.
+
+    Mengembalikan (labels, stats) dengan waktu proses dan memori puncak. Memori puncak
+    (tracemalloc) hanya diukur jika `track_memory` aktif dan belum ada tracer lain yang
+    berjalan (peak milik pemanggil tidak di-reset); selain itu bernilai None.
+    """
+    if method not in CLUSTERING_METHODS:
+        raise ValueError(f"Metode clustering tidak dikenal: {method}")
+    if linkage not in LINKAGE_OPTIONS:
+        raise ValueError(f"Linkage tidak dikenal: {linkage}")
+
+    co_occurrence = sparse.csr_matrix(co_occurrence)
+    n_items = co_occurrence.shape[0]
+    n_clusters = max(1, min(int(n_clusters), n_items))
+    if method == 'auto':
+        if n_items > DENSE_MAX_ITEMS:
+            method = 'spectral'
+        else:
+            method = 'connectivity' if linkage == 'ward' else 'agglomerative'
+
+    measure_memory = track_memory and not tracemalloc.is_tracing()
+    if measure_memory:
+        tracemalloc.start()
+    peak = None
+    start = time.perf_counter()
+    try:
+        if n_items == 0:
+            labels = np.array([], dtype=int)
+        elif n_clusters == 1:
+            labels = np.zeros(n_items, dtype=int)
+        elif method == 'agglomerative':
+            labels = _dense_agglomerative(co_occurrence, n_clusters, linkage)
+        elif method == 'connectivity':
+            labels = _connectivity_agglomerative(co_occurrence, n_clusters, linkage)
+        else:
+            labels = _spectral(co_occurrence, n_clusters)
+        runtime = time.perf_counter() - start
+        if measure_memory:
+            _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    stats = {
+        'method': method,
+        'linkage': linkage if method in ('agglomerative', 'connectivity') else None,
+        'n_items': n_items,
+        'n_clusters': n_clusters,
+        'runtime_s': round(runtime, 4),
+        'peak_memory_mb': None if peak is None else round(peak / 1024 ** 2, 2),
+    }
+    return np.asarray(labels), stats
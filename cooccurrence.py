@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def build_incidence(df, item_col='Material Group 2', doc_col='Reference Document', weight_col=None):
+    """Matriks insiden sparse dokumen x item.
+
+    Tanpa `weight_col` isinya biner (item ada/tidak di dokumen); dengan
+    `weight_col` (mis. 'TO Dummy') isinya total kuantitas item di dokumen.
+    Mengembalikan (matriks CSR, daftar item terurut).
+    """
+    data = df[[doc_col, item_col] + ([weight_col] if weight_col else [])].dropna(subset=[doc_col, item_col])
+    item_ids = sorted(data[item_col].unique())
+    item_codes = pd.Categorical(data[item_col], categories=item_ids).codes
+    doc_codes, doc_uniques = pd.factorize(data[doc_col])
+
+    if weight_col:
+        values = pd.to_numeric(data[weight_col], errors='coerce').fillna(0).to_numpy(dtype=float)
+    else:
+        values = np.ones(len(data), dtype=np.int64)
+
+    incidence = sparse.csr_matrix(
+        (values, (doc_codes, item_codes)),
+        shape=(len(doc_uniques), len(item_ids))
+    )
+    incidence.sum_duplicates()
+    if not weight_col:
+        # Item yang muncul beberapa kali di satu dokumen tetap dihitung sekali
+        incidence.data[:] = 1
+    return incidence, item_ids
+
+
+def cooccurrence_matrix(df, item_col='Material Group 2', doc_col='Reference Document', weight_col=None):
+    """Matriks co-occurrence sparse item x item dari satu perkalian X.T @ X (diagonal dinolkan).
+
+    Versi biner menghitung jumlah dokumen yang memuat kedua item sekaligus.
+    Mengembalikan (matriks CSR simetris, daftar item terurut).
+    """
+    incidence, item_ids = build_incidence(df, item_col, doc_col, weight_col)
+    co_occurrence = (incidence.T @ incidence).tocsr()
+    co_occurrence.setdiag(0)
+    co_occurrence.eliminate_zeros()
+    return co_occurrence, item_ids
+
+
+def top_k_neighbours(co_occurrence, item_ids, k=5):
+    """Tetangga dengan co-occurrence tertinggi per item, tanpa membentuk matriks padat n x n."""
+    co_occurrence = sparse.csr_matrix(co_occurrence)
+    item_ids = np.asarray(item_ids, dtype=object)
+    rows = []
+    for i in range(co_occurrence.shape[0]):
+        start, end = co_occurrence.indptr[i], co_occurrence.indptr[i + 1]
+        if start == end:
+            continue
+        cols = co_occurrence.indices[start:end]
+        vals = co_occurrence.data[start:end]
+        top = np.argsort(-vals, kind='stable')[:k]
+        for rank, j in enumerate(top, start=1):
+            rows.append((item_ids[i], item_ids[cols[j]], vals[j], rank))
+    return pd.DataFrame(rows, columns=['Item', 'Neighbour', 'Co-occurrence', 'Rank'])
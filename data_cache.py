@@ -0,0 +1,155 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+# Folder cache kolumnar untuk file input statis (bisa diganti lewat environment)
+CACHE_DIR = os.environ.get('SDR_CACHE_DIR', '.sdr_cache')
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def file_fingerprint(file_path):
+    """Sidik jari file: path absolut + mtime + ukuran."""
+    stat = os.stat(file_path)
+    raw = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _source_columns(source_path):
+    """Nama kolom file sumber tanpa membaca isinya (kolom index tanpa nama dibuang)."""
+    if source_path.lower().endswith('.csv'):
+        header = pd.read_csv(source_path, nrows=0).columns
+    else:
+        from openpyxl import load_workbook
+        workbook = load_workbook(source_path, read_only=True)
+        try:
+            row = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        header = [h for h in row if h is not None]
+    return [str(col) for col in header if not str(col).startswith('Unnamed')]
+
+
+def _twin_matches(twin_path, file_path, columns=None):
+    """True jika CSV kembaran memuat semua kolom yang dibutuhkan.
+
+    Kolom yang dibutuhkan adalah `columns` yang juga ada di file Excel (atau seluruh
+    header Excel jika `columns` None); tanpa file Excel, cukup `columns`.
+    """
+    try:
+        twin_columns = set(_source_columns(twin_path))
+        if os.path.exists(file_path):
+            required = _source_columns(file_path)
+            if columns is not None:
+                required = [col for col in columns if col in required]
+        else:
+            required = columns or []
+    except Exception:
+        return False
+    return all(col in twin_columns for col in required)
+
+
+def find_csv_twin(file_path, columns=None):
+    """Mencari CSV kembaran (mis. 'nama.csv' atau 'nama (1).csv') yang lebih baru dari file Excel.
+
+    Kembaran dengan skema berbeda (mis. ekspor lama tanpa 'Movement Type') diabaikan,
+    sehingga file Excel yang dibaca.
+    """
+    stem, _ = os.path.splitext(file_path)
+    candidates = [stem + '.csv'] + glob.glob(glob.escape(stem) + ' (*).csv')
+    candidates = [p for p in candidates if os.path.isfile(p) and os.path.getsize(p) > 0]
+    if not candidates:
+        return None
+    newest = max(candidates, key=os.path.getmtime)
+    if os.path.exists(file_path) and os.path.getmtime(newest) <= os.path.getmtime(file_path):
+        return None
+    if not _twin_matches(newest, file_path, columns):
+        return None
+    return newest
+
+
+def static_source_path(file_path, columns=None, use_csv_twin=False):
+    """File yang benar-benar dibaca `read_static_table`: CSV kembaran yang cocok, atau `file_path` sendiri."""
+    if use_csv_twin:
+        return find_csv_twin(file_path, columns) or file_path
+    return file_path
+
+
+def _read_source(source_path):
+    """Membaca file sumber apa adanya (CSV dengan engine cepat, selain itu Excel)."""
+    if source_path.lower().endswith('.csv'):
+        engine = 'pyarrow' if _has_pyarrow() else 'c'
+        df = pd.read_csv(source_path, engine=engine)
+        # Buang kolom index hasil ekspor (kolom tanpa nama)
+        df = df.loc[:, [col for col in df.columns if not str(col).startswith('Unnamed')]]
+        return df
+    return pd.read_excel(source_path)
+
+
+def _cache_path(source_path):
+    slug = os.path.basename(source_path).replace(' ', '_')
+    ext = 'parquet' if _has_pyarrow() else 'pkl'
+    return os.path.join(CACHE_DIR, f"{slug}-{file_fingerprint(source_path)}.{ext}"), slug
+
+
+def _write_cache(df, cache_path, slug):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        if cache_path.endswith('.parquet'):
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # Kolom dengan tipe campuran tidak bisa disimpan; lewati cache saja
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    # Hapus cache lama dari file sumber yang sama (fingerprint berbeda)
+    for old in glob.glob(os.path.join(CACHE_DIR, glob.escape(slug) + '-*')):
+        if old != cache_path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def read_static_table(file_path, columns=None, use_csv_twin=False):
+    """Memuat file input statis lewat cache kolumnar (Parquet), hanya kolom yang dibutuhkan.
+
+    Cache dikunci oleh path + mtime + ukuran file sumber, sehingga otomatis
+    dibuat ulang jika file sumber diganti. Jika `use_csv_twin` aktif dan ada
+    CSV kembaran yang lebih baru dengan kolom yang cocok, CSV itu yang dibaca.
+    """
+    source_path = static_source_path(file_path, columns, use_csv_twin)
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+
+    cache_path, slug = _cache_path(source_path)
+    if os.path.exists(cache_path):
+        try:
+            if cache_path.endswith('.parquet'):
+                import pyarrow.parquet as pq
+                available = pq.read_schema(cache_path).names
+                wanted = None if columns is None else [col for col in columns if col in available]
+                return pd.read_parquet(cache_path, columns=wanted)
+            df = pd.read_pickle(cache_path)
+            return df if columns is None else df[[col for col in columns if col in df.columns]]
+        except Exception:
+            # Cache rusak, baca ulang dari sumber
+            pass
+
+    df = _read_source(source_path)
+    _write_cache(df, cache_path, slug)
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
@@ -0,0 +1,188 @@
+import glob
+import os
+
+import pandas as pd
+
+from data_cache import _has_pyarrow
+from interval_engine import DEFAULT_INTERVAL_GRID
+from zrw70_processing import finalize_interval_stats, interval_summary, interval_totals_from_hourly, merge_interval_summaries
+
+# Folder dataset store, dipartisi per Storage Type dan bulan (bisa diganti lewat environment):
+#   <STORE_DIR>/storage_type=ZYY/month=2025-10/{hourly,materials,uom}.parquet
+STORE_DIR = os.environ.get('SDR_STORE_DIR', 'sdr_store')
+
+
+def _partition_dir(storage_type, month):
+    return os.path.join(STORE_DIR, f"storage_type={storage_type}", f"month={month}")
+
+
+def _table_path(partition_dir, table):
+    ext = 'parquet' if _has_pyarrow() else 'pkl'
+    return os.path.join(partition_dir, f"{table}.{ext}")
+
+
+def _read_table(partition_dir, table):
+    path = _table_path(partition_dir, table)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+
+
+def _write_table(df, partition_dir, table):
+    """Tulis atomik (file sementara lalu rename) agar pembaca tidak melihat file setengah jadi."""
+    os.makedirs(partition_dir, exist_ok=True)
+    path = _table_path(partition_dir, table)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # Kolom teks bertipe campuran (mis. angka dan string) disimpan sebagai string
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype(str).where(df[col].notna(), None)
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _material_keys(df):
+    return ['Material ID', 'Movement Type'] if 'Movement Type' in df.columns else ['Material ID']
+
+
+def list_partitions(storage_type=None):
+    """Daftar partisi yang tersimpan: DataFrame [Storage Type, Month], terurut."""
+    pattern = os.path.join(STORE_DIR, 'storage_type=*', 'month=*')
+    rows = []
+    for partition_dir in glob.glob(pattern):
+        if not os.path.exists(_table_path(partition_dir, 'hourly')):
+            continue
+        type_part = os.path.basename(os.path.dirname(partition_dir))
+        rows.append({
+            'Storage Type': type_part.split('=', 1)[1],
+            'Month': os.path.basename(partition_dir).split('=', 1)[1],
+        })
+    partitions = pd.DataFrame(rows, columns=['Storage Type', 'Month'])
+    if storage_type is not None:
+        partitions = partitions[partitions['Storage Type'] == storage_type]
+    return partitions.sort_values(['Storage Type', 'Month']).reset_index(drop=True)
+
+
+def list_months(storage_type='ZYY'):
+    """Bulan ('YYYY-MM') yang tersedia untuk satu Storage Type."""
+    return list_partitions(storage_type)['Month'].tolist()
+
+
+def store_version(storage_type='ZYY'):
+    """Penanda perubahan store (mtime terbaru) untuk kunci cache."""
+    paths = glob.glob(os.path.join(STORE_DIR, f"storage_type={storage_type}", 'month=*', '*'))
+    return max((os.path.getmtime(p) for p in paths), default=0.0)
+
+
+def append_hourly(hourly, material_info, uom_info, storage_type='ZYY'):
+    """Menambahkan total per jam ke partisi bulan masing-masing.
+
+    Tanggal yang sudah ada di partisi diganti seluruhnya oleh data baru, sehingga
+    mengunggah ulang file yang sama (atau ekspor yang tumpang tindih) tidak
+    menghitung ganda. Mengembalikan daftar bulan yang ditulis.
+    """
+    hourly = hourly.dropna(subset=['Created Date'])
+    months = hourly['Created Date'].dt.strftime('%Y-%m')
+    written = []
+    for month, part in hourly.groupby(months, sort=True):
+        partition_dir = _partition_dir(storage_type, month)
+        material_ids = part['Material ID'].unique()
+
+        existing = _read_table(partition_dir, 'hourly')
+        if existing is not None:
+            existing = existing[~existing['Created Date'].isin(part['Created Date'].unique())]
+            part = pd.concat([existing, part], ignore_index=True)
+        _write_table(part, partition_dir, 'hourly')
+
+        # Info material/UoM: entri lama didahulukan (kemunculan pertama), entri baru melengkapi
+        new_materials = material_info[material_info['Material ID'].isin(material_ids)]
+        existing = _read_table(partition_dir, 'materials')
+        if existing is not None:
+            new_materials = pd.concat([existing, new_materials], ignore_index=True)
+        _write_table(new_materials.drop_duplicates(subset=_material_keys(new_materials)), partition_dir, 'materials')
+
+        new_uom = uom_info[uom_info['Material ID'].isin(material_ids)]
+        existing = _read_table(partition_dir, 'uom')
+        if existing is not None:
+            new_uom = pd.concat([existing, new_uom], ignore_index=True)
+        _write_table(new_uom.drop_duplicates(), partition_dir, 'uom')
+        written.append(month)
+    return written
+
+
+def _months_in_range(months, start_date, end_date):
+    """Partition pruning: buang bulan di luar rentang tanggal."""
+    if start_date is not None:
+        months = [m for m in months if m >= pd.Timestamp(start_date).strftime('%Y-%m')]
+    if end_date is not None:
+        months = [m for m in months if m <= pd.Timestamp(end_date).strftime('%Y-%m')]
+    return months
+
+
+def load_partitions(months=None, storage_type='ZYY', start_date=None, end_date=None):
+    """Membaca hanya partisi bulan terpilih; filter rentang tanggal (inklusif) jika diberikan.
+
+    Mengembalikan (total per jam, info material, info UoM); total per jam kosong jika tidak ada data.
+    """
+    available = list_months(storage_type)
+    months = available if months is None else [m for m in months if m in available]
+    months = _months_in_range(sorted(months), start_date, end_date)
+
+    hourly, materials, uom = [], [], []
+    for month in months:
+        partition_dir = _partition_dir(storage_type, month)
+        hourly.append(_read_table(partition_dir, 'hourly'))
+        materials.append(_read_table(partition_dir, 'materials'))
+        uom.append(_read_table(partition_dir, 'uom'))
+    if not hourly:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    hourly = pd.concat(hourly, ignore_index=True)
+    if start_date is not None:
+        hourly = hourly[hourly['Created Date'] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        hourly = hourly[hourly['Created Date'] <= pd.Timestamp(end_date)]
+    materials = pd.concat(materials, ignore_index=True)
+    materials = materials.drop_duplicates(subset=_material_keys(materials))
+    uom = pd.concat(uom, ignore_index=True).drop_duplicates()
+    return hourly, materials, uom
+
+
+def interval_stats(df_uom, months=None, storage_type='ZYY', interval_grid=DEFAULT_INTERVAL_GRID, start_date=None, end_date=None,
+                   quantiles=(), exact_quantiles_mode=False):
+    """Statistik Min/Max/Avg (+ kuantil) per interval lintas bulan dari total harian yang tersimpan (tanpa proses ulang file mentah).
+
+    Setiap bulan diringkas sendiri (min/max/jumlah + sketch kuantil) lalu digabung, sehingga
+    deret harian semua bulan tidak perlu disimpan bersamaan. Mode eksak (validasi) tetap
+    menggabungkan seluruh deret harian.
+    """
+    if exact_quantiles_mode:
+        hourly, materials, uom = load_partitions(months, storage_type, start_date, end_date)
+        if hourly.empty:
+            return pd.DataFrame()
+        return finalize_interval_stats(
+            interval_totals_from_hourly(hourly, interval_grid), materials, uom, df_uom,
+            quantiles=quantiles, exact_quantiles_mode=True
+        )
+
+    available = list_months(storage_type)
+    months = available if months is None else [m for m in months if m in available]
+    summaries, materials, uom = [], [], []
+    for month in _months_in_range(sorted(months), start_date, end_date):
+        hourly, month_materials, month_uom = load_partitions([month], storage_type, start_date, end_date)
+        if hourly.empty:
+            continue
+        summaries.append(interval_summary(interval_totals_from_hourly(hourly, interval_grid), with_sketch=bool(quantiles)))
+        materials.append(month_materials)
+        uom.append(month_uom)
+
+    summary = merge_interval_summaries(summaries)
+    if summary is None:
+        return pd.DataFrame()
+    materials = pd.concat(materials, ignore_index=True)
+    materials = materials.drop_duplicates(subset=_material_keys(materials))
+    uom = pd.concat(uom, ignore_index=True).drop_duplicates()
+    return finalize_interval_stats(None, materials, uom, df_uom, quantiles=quantiles, summary=summary)
@@ -0,0 +1,139 @@
+import os
+import re
+import tempfile
+
+import pandas as pd
+
+from schema import export_frame
+
+# Format unduhan: kode -> (label, ekstensi, MIME)
+EXPORT_FORMATS = {
+    'xlsx': ('Excel (.xlsx)', '.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('CSV (.csv)', '.csv', 'text/csv'),
+    'parquet': ('Parquet (.parquet)', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+# Jumlah baris per potongan yang ditulis sekaligus
+CHUNK_ROWS = 50_000
+# Batas baris data per sheet Excel (1.048.576 baris termasuk header)
+MAX_SHEET_ROWS = 1_048_575
+
+
+def available_formats():
+    """Format yang bisa dipakai di lingkungan ini (Parquet butuh pyarrow)."""
+    try:
+        import pyarrow  # noqa: F401
+        return list(EXPORT_FORMATS)
+    except ImportError:
+        return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet']
+
+
+def _chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _sheet_name(name, used):
+    """Nama sheet Excel yang valid (maks. 31 karakter, tanpa []:*?/\\) dan unik."""
+    base = re.sub(r'[\[\]:*?/\\]', '-', str(name)).strip() or 'Sheet'
+    base = base[:31]
+    candidate, i = base, 2
+    while candidate.lower() in used:
+        suffix = f" ({i})"
+        candidate, i = base[:31 - len(suffix)] + suffix, i + 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _sheet_groups(df, sheet_by, default_sheet):
+    """Pasangan (nama sheet, DataFrame); satu sheet per nilai `sheet_by` jika diberikan."""
+    if not sheet_by:
+        yield default_sheet, df
+        return
+    for value, group in df.groupby(sheet_by, sort=True, observed=True, dropna=False):
+        yield ('N/A' if pd.isna(value) else value), group
+
+
+def write_csv(df, path, chunk_rows=CHUNK_ROWS):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+        if df.empty:
+            df.to_csv(f, index=False)
+
+
+def _parquet_schema(df, chunk_rows=CHUNK_ROWS):
+    """Skema Arrow dari potongan pertama yang berisi data.
+
+    Frame kosong tidak bisa dipakai: kolom object kosong bertipe `null` dan potongan
+    berikutnya (mis. 'Product Name' berisi teks) gagal dikonversi. Kolom yang masih
+    `null` (seluruh potongan pertama kosong) dianggap teks.
+    """
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+def write_parquet(df, path, chunk_rows=CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(df, chunk_rows)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_xlsx(df, path, sheet_by=None, sheet_name='Data', chunk_rows=CHUNK_ROWS):
+    """Menulis XLSX baris per baris (xlsxwriter constant_memory).
+
+    Sheet yang melebihi batas baris Excel dilanjutkan ke sheet berikutnya.
+    """
+    import xlsxwriter
+
+    header = [str(col) for col in df.columns]
+    used_names = set()
+    with xlsxwriter.Workbook(path, {'constant_memory': True}) as workbook:
+        for name, group in _sheet_groups(df, sheet_by, sheet_name):
+            for part_start in range(0, max(len(group), 1), MAX_SHEET_ROWS):
+                part = group.iloc[part_start:part_start + MAX_SHEET_ROWS]
+                part_name = name if part_start == 0 else f"{name} {part_start // MAX_SHEET_ROWS + 1}"
+                worksheet = workbook.add_worksheet(_sheet_name(part_name, used_names))
+                worksheet.write_row(0, 0, header)
+                row = 1
+                for chunk in _chunks(part, chunk_rows):
+                    # Kategori -> nilai biasa, float32 -> float64, NaN -> sel kosong
+                    values = export_frame(chunk).astype(object)
+                    values = values.where(values.notna(), None).to_numpy()
+                    for record in values:
+                        worksheet.write_row(row, 0, record)
+                        row += 1
+
+
+def write_export(df, path, fmt, sheet_by=None, sheet_name='Data'):
+    """Menulis DataFrame ke file `path` dalam format `fmt` secara bertahap per potongan baris."""
+    if fmt == 'xlsx':
+        write_xlsx(df, path, sheet_by=sheet_by, sheet_name=sheet_name)
+    elif fmt == 'csv':
+        write_csv(df, path)
+    elif fmt == 'parquet':
+        write_parquet(df, path)
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+
+
+def export_bytes(df, fmt, sheet_by=None, sheet_name='Data'):
+    """Membuat file ekspor lewat file sementara dan mengembalikan isinya (untuk st.download_button)."""
+    suffix = EXPORT_FORMATS[fmt][1]
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        write_export(df, path, fmt, sheet_by=sheet_by, sheet_name=sheet_name)
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
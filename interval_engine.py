@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+OTHER_INTERVAL = 'Other'
+
+# Grid interval bawaan: batas jam (edge) berurutan, interval = [edge[i], edge[i+1])
+INTERVAL_GRIDS = {
+    '2h': [7, 9, 11, 13, 15, 17, 19, 21],
+    '1h': list(range(7, 22)),
+    'shift': [7, 15, 23],
+}
+DEFAULT_INTERVAL_GRID = '2h'
+
+BOX_QUANTITY_COLUMNS = {
+    'Min Total Quantity': 'Min Total Quantity (BOX)',
+    'Max Total Quantity': 'Max Total Quantity (BOX)',
+    'Average Total Quantity': 'Average Total Quantity (BOX)',
+}
+
+
+def _format_hour(hour):
+    return f"{int(hour):02d}:{int(round((hour % 1) * 60)):02d}"
+
+
+def interval_labels(edges):
+    """Label interval 'HH:MM-HH:MM' untuk setiap pasangan edge berurutan."""
+    return [f"{_format_hour(start)}-{_format_hour(end)}" for start, end in zip(edges[:-1], edges[1:])]
+
+
+def resolve_interval_grid(interval_grid=DEFAULT_INTERVAL_GRID):
+    """Mengembalikan (edges, labels) dari nama grid ('2h', '1h', 'shift') atau daftar edge kustom."""
+    if isinstance(interval_grid, str):
+        if interval_grid not in INTERVAL_GRIDS:
+            raise ValueError(f"Grid interval tidak dikenal: {interval_grid}")
+        edges = INTERVAL_GRIDS[interval_grid]
+    else:
+        edges = list(interval_grid)
+    edges = np.asarray(edges, dtype=float)
+    if edges.size < 2 or np.any(np.diff(edges) <= 0):
+        raise ValueError("Edge interval harus berisi minimal 2 jam yang naik berurutan.")
+    return edges, interval_labels(edges)
+
+
+def bin_hours(hours, interval_grid=DEFAULT_INTERVAL_GRID):
+    """Memetakan array jam ke label interval sekaligus (tanpa apply per baris).
+
+    Jam di luar grid atau NaN diberi label 'Other'.
+    """
+    edges, labels = resolve_interval_grid(interval_grid)
+    hours = np.asarray(hours, dtype=float)
+    idx = np.searchsorted(edges, hours, side='right') - 1
+    valid = ~np.isnan(hours) & (idx >= 0) & (idx < len(labels))
+    label_array = np.array(labels + [OTHER_INTERVAL], dtype=object)
+    return label_array[np.where(valid, idx, len(labels))]
+
+
+def box_factor(uom, conversion_to_pcs):
+    """Faktor pembagi ke BOX: 1 untuk BOX, konversi PCS untuk PCS, NaN untuk sisanya."""
+    uom = np.asarray(uom, dtype=object)
+    conversion = pd.to_numeric(pd.Series(conversion_to_pcs), errors='coerce').to_numpy(dtype=float)
+    valid = pd.notna(uom) & ~np.isnan(conversion) & (np.nan_to_num(conversion, nan=0.0) > 0)
+    factor = np.where(uom == 'BOX', 1.0, np.where(uom == 'PCS', conversion, np.nan))
+    return np.where(valid, factor, np.nan)
+
+
+def convert_to_box(df, columns=BOX_QUANTITY_COLUMNS):
+    """Mengkonversi kolom kuantitas (default Min, Max, dan Avg) ke unit BOX dengan satu operasi array per kolom."""
+    factor = box_factor(df['UOM'], df['Conversion_to_PCS'])
+    for source_col, box_col in columns.items():
+        df[box_col] = df[source_col].to_numpy(dtype=float) / factor
+    return df
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from clustering import cluster_items
+from cooccurrence import cooccurrence_matrix
+from pick_replay import compare_layouts
+from picking_stats import picking_stats
+from profiling import stage
+from slotting import greedy_slotting, optimize_slotting
+from stage_cache import get_stage_cache, stage_key
+
+MASTER_COLUMNS = ['Material ID', 'Product lvl 1-Category', 'Product lvl 2-Type', 'Product lvl 3-Group', 'Material Group 2']
+# Kolom data mentah ZRW70 yang dibutuhkan analisis layout
+LAYOUT_RAW_COLUMNS = ['Reference Document', 'TO Dummy', 'Storage Type Suggestion', 'Confirm 1 Time', 'Material ID', 'Material Desc']
+ZONES = ['ZAA', 'ZAB', 'ZAC', 'ZAD', 'ZAE', 'ZAF', 'ZAG', 'ZAH', 'ZAI', 'ZAJ', 'ZAK', 'ZAL', 'ZAM']
+# Frame hasil `zone_report` yang disimpan di stage cache (PNG diambil ulang dari cache gambar)
+ZONE_CACHE_FRAMES = ('layout', 'greedy_layout', 'replay', 'annotations')
+
+
+def merge_master_data(df, master_df):
+    """Menggabungkan ZRW70 dengan data master Material Group, lalu membuang baris tanpa 'TO Dummy'.
+
+    Mengembalikan (merged_df, jumlah baris yang dibuang).
+    """
+    excel_data_to_merge = master_df[MASTER_COLUMNS].copy()
+
+    # Clean and prepare 'Material ID' for merging
+    df = df.copy()
+    df['Material ID'] = df['Material ID'].astype(str).str.replace(r'\.0$', '', regex=True)
+    excel_data_to_merge['Material ID'] = excel_data_to_merge['Material ID'].astype(str)
+
+    merged_df = pd.merge(df, excel_data_to_merge, on='Material ID', how='left')
+
+    initial_rows = merged_df.shape[0]
+    merged_df.dropna(subset=['TO Dummy'], inplace=True)
+    return merged_df, initial_rows - merged_df.shape[0]
+
+
+def filter_zones(merged_df, zones):
+    """Baris untuk zona terpilih, dengan 'Confirm 1 Time' sudah berupa datetime."""
+    df_filtered = merged_df[merged_df['Storage Type Suggestion'].isin(zones)].copy()
+    df_filtered['Confirm 1 Time'] = pd.to_datetime(df_filtered['Confirm 1 Time'], errors='coerce')
+    return df_filtered
+
+
+def cluster_material_groups(df_filtered, n_clusters=3, method='auto', linkage='average', track_memory=False):
+    """Co-occurrence dan clustering Material Group 2 (`track_memory`: ukur memori puncak clustering).
+
+    Mengembalikan (tabel Material Group 2 -> Cluster Label, matriks co-occurrence sparse, stats clustering).
+    """
+    with stage('co-occurrence', rows=len(df_filtered)):
+        co_occurrence, material_group_ids = cooccurrence_matrix(df_filtered, item_col='Material Group 2')
+    with stage('clustering', rows=len(material_group_ids)):
+        labels, stats = cluster_items(co_occurrence, n_clusters=n_clusters, method=method, linkage=linkage,
+                                      track_memory=track_memory)
+    clustering_results = pd.DataFrame({'Material Group 2': material_group_ids, 'Cluster Label': labels})
+    return clustering_results, co_occurrence, stats
+
+
+def picking_priority(df_filtered, clustering_results, stats=None):
+    """First Pick Frequency dan rata-rata Picking Sequence Score per Material Group 2.
+
+    Statistik dokumen diambil dari `stats` (PickingStats) atau dihitung/diambil dari cache.
+    """
+    if stats is None:
+        with stage('picking stats', rows=len(df_filtered)):
+            stats = picking_stats(df_filtered)
+    group_stats = stats.by('Material Group 2')[['Material Group 2', 'First Pick Frequency', 'Picking Sequence Score']]
+
+    # First Pick Frequency (higher is better), Picking Sequence Score (lower is better)
+    priority = pd.merge(clustering_results, group_stats, on='Material Group 2', how='left')
+    priority['First Pick Frequency'] = priority['First Pick Frequency'].fillna(0).astype(int)
+    max_score = priority['Picking Sequence Score'].max() if not priority['Picking Sequence Score'].empty else 1
+    priority['Picking Sequence Score'] = priority['Picking Sequence Score'].fillna(max_score)
+    return priority
+
+
+def aligned_cooccurrence(zone_df, material_group_ids):
+    """Matriks co-occurrence 'Material Group 2' dengan urutan baris/kolom sesuai `material_group_ids`.
+
+    Group yang tidak punya 'Reference Document' sama sekali tidak ada di matriks
+    co-occurrence; baris dan kolomnya diisi nol.
+    """
+    co_occurrence, co_ids = cooccurrence_matrix(zone_df, item_col='Material Group 2')
+    position = pd.Index(co_ids).get_indexer(material_group_ids)
+    known = np.flatnonzero(position >= 0)
+    selector = sparse.csr_matrix(
+        (np.ones(len(known)), (known, position[known])),
+        shape=(len(position), co_occurrence.shape[0])
+    )
+    return (selector @ co_occurrence @ selector.T).tocsr()
+
+
+def zone_layout(zone_df, priority, num_rows=2):
+    """Layout satu zona: urutan prioritas, slotting optimasi, dan layout greedy pembanding.
+
+    Jumlah kolom dihitung otomatis agar semua Material Group muat di `num_rows` baris.
+    """
+    material_group_ids_zone = sorted(list(zone_df['Material Group 2'].dropna().unique()))
+    clustering_results_zone = priority[priority['Material Group 2'].isin(material_group_ids_zone)]
+
+    # Sort 'Material Group 2' IDs based on 'First Pick Frequency' (desc) and then 'Average Picking Sequence Score' (asc)
+    sorted_priority = clustering_results_zone.sort_values(
+        by=['First Pick Frequency', 'Picking Sequence Score'],
+        ascending=[False, True]
+    ).set_index('Material Group 2')
+    sorted_material_group_ids_zone = sorted_priority.index.tolist()
+
+    num_cols = max(1, (len(material_group_ids_zone) + num_rows - 1) // num_rows)
+
+    # Optimasi slotting: bobot First Pick Frequency + tarikan co-occurrence di dalam zona
+    zone_co_occurrence = aligned_cooccurrence(zone_df, sorted_material_group_ids_zone)
+    weights = sorted_priority['First Pick Frequency'].to_numpy()
+
+    slot_rows, slot_cols, slotting_stats = optimize_slotting(weights, num_rows, num_cols, co_occurrence=zone_co_occurrence)
+    layout = pd.DataFrame({
+        'Material Group 2': sorted_material_group_ids_zone,
+        'Cluster Label': sorted_priority['Cluster Label'].to_numpy(),
+        'Row': slot_rows,
+        'Column': slot_cols,
+        'Picking Distance': slot_rows + slot_cols
+    })
+
+    # Layout greedy lama, disimpan untuk pembanding di simulasi replay
+    greedy_rows, greedy_cols = greedy_slotting(weights, num_rows, num_cols)
+    greedy_layout = layout.assign(Row=greedy_rows, Column=greedy_cols, **{'Picking Distance': greedy_rows + greedy_cols})
+
+    replay = compare_layouts(zone_df, {'Optimasi': layout, 'Greedy (lama)': greedy_layout})
+    return {
+        'num_rows': num_rows,
+        'num_cols': num_cols,
+        'layout': layout,
+        'greedy_layout': greedy_layout,
+        'slotting_stats': slotting_stats,
+        'replay': replay,
+    }
+
+
+def zone_report(zone, zone_df, priority, num_rows=2):
+    """Layout satu zona beserta gambar PNG-nya; dipakai sebagai job di process pool."""
+    from layout_render import annotation_table, render_zone_png
+
+    result = zone_layout(zone_df, priority, num_rows)
+    result['zone'] = zone
+    result['annotations'] = annotation_table(zone_df)
+    result['png'] = render_zone_png(zone_df, zone, result['layout'], num_rows, result['num_cols'], annotations=result['annotations'])
+    return result
+
+
+def analyse_zones(zone_frames, priority, num_rows=2, executor=None):
+    """Layout + gambar untuk banyak zona ({zona: data zona}).
+
+    Jika `executor` (mis. ProcessPoolExecutor) diberikan, setiap zona dikerjakan paralel
+    sehingga total waktu mendekati zona yang paling lama. Hasil mengikuti urutan input.
+    """
+    if executor is None:
+        return {zone: zone_report(zone, zone_df, priority, num_rows) for zone, zone_df in zone_frames.items()}
+    futures = {
+        zone: executor.submit(zone_report, zone, zone_df, priority, num_rows)
+        for zone, zone_df in zone_frames.items()
+    }
+    return {zone: future.result() for zone, future in futures.items()}
+
+
+def _zone_cache_entry(result):
+    """(frames, meta) untuk stage cache dari hasil `zone_report`."""
+    frames = {name: result[name] for name in ZONE_CACHE_FRAMES}
+    stats = {key: value.item() if hasattr(value, 'item') else value for key, value in result['slotting_stats'].items()}
+    return frames, {'num_rows': result['num_rows'], 'num_cols': result['num_cols'], 'slotting_stats': stats}
+
+
+def cached_zone_reports(zone_frames, priority, num_rows, input_key, params, executor=None, cache=None):
+    """Seperti `analyse_zones`, tetapi zona yang sudah pernah dihitung diambil dari stage cache disk.
+
+    Kunci per zona = `input_key` (sidik jari file ZRW70) + `params` (zona terpilih, pengaturan
+    clustering, versi master, dst.) + zona + `num_rows`. Hanya zona yang belum ada di cache
+    yang dikirim ke `executor`.
+    """
+    from layout_render import render_zone_png
+
+    cache = cache or get_stage_cache()
+    keys = {zone: stage_key('zone_layout', input_key, {**params, 'zone': zone, 'num_rows': num_rows}) for zone in zone_frames}
+    results, missing = {}, {}
+    for zone, zone_df in zone_frames.items():
+        cached = cache.load(keys[zone])
+        if cached is None:
+            missing[zone] = zone_df
+            continue
+        frames, meta = cached
+        result = {**frames, **meta, 'zone': zone}
+        result['png'] = render_zone_png(zone_df, zone, frames['layout'], meta['num_rows'], meta['num_cols'], annotations=frames['annotations'])
+        results[zone] = result
+
+    if missing:
+        computed = analyse_zones(missing, priority, num_rows, executor=executor)
+        for zone, result in computed.items():
+            frames, meta = _zone_cache_entry(result)
+            cache.store(keys[zone], frames, meta, stage_name='zone_layout', params={**params, 'zone': zone, 'num_rows': num_rows})
+        results.update(computed)
+    return {zone: results[zone] for zone in zone_frames}
+
+
+def run_layout_analysis(df, master_df, zones, num_rows=2, n_clusters=3, method='auto', linkage='average',
+                        track_memory=False):
+    """Pipeline lengkap ZRW70 + Material Group -> cluster, prioritas, dan layout per zona (tanpa UI)."""
+    merged_df, rows_dropped = merge_master_data(df, master_df)
+    df_filtered = filter_zones(merged_df, zones)
+    result = {'rows_dropped': rows_dropped, 'n_rows': len(df_filtered), 'zones': {}}
+    if df_filtered.empty:
+        return result
+
+    clustering_results, co_occurrence, clustering_stats = cluster_material_groups(
+        df_filtered, n_clusters, method, linkage, track_memory=track_memory
+    )
+    priority = picking_priority(df_filtered, clustering_results)
+    result.update(clustering_stats=clustering_stats, priority=priority)
+    for zone in zones:
+        zone_df = df_filtered[df_filtered['Storage Type Suggestion'] == zone]
+        if not zone_df.empty:
+            result['zones'][zone] = zone_layout(zone_df, priority, num_rows)
+    return result
@@ -0,0 +1,153 @@
+import glob
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR
+
+# Folder cache PNG heatmap layout (dibagi semua proses worker)
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, 'figures')
+# Jumlah maksimum PNG yang disimpan; yang paling lama tidak dipakai dihapus lebih dulu
+FIGURE_CACHE_MAX_FILES = 256
+
+
+def annotation_table(zone_df):
+    """Tabel anotasi per Material Group 2 dalam satu kali groupby.
+
+    Berisi Material ID yang paling sering muncul dan kata pertama Material Desc-nya
+    (index = Material Group 2, kolom 'Top Material ID', 'First Word', 'Annotation').
+    """
+    columns = ['Top Material ID', 'First Word', 'Annotation']
+    rows = zone_df[['Material Group 2', 'Material ID', 'Material Desc']].dropna(subset=['Material Group 2', 'Material ID'])
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    counts = rows.groupby(['Material Group 2', 'Material ID'], sort=False, observed=True).agg(
+        count=('Material ID', 'size'),
+        desc=('Material Desc', 'first')
+    ).reset_index()
+    # Stabil: jika jumlah sama, Material ID yang muncul lebih dulu yang dipakai (seperti value_counts)
+    top = counts.sort_values('count', ascending=False, kind='stable').drop_duplicates('Material Group 2')
+
+    first_word = top['desc'].where(top['desc'].map(lambda desc: isinstance(desc, str)), '').str.split().str[0].fillna('')
+    group_text = top['Material Group 2'].astype(str)
+    table = pd.DataFrame({
+        'Top Material ID': top['Material ID'].to_numpy(),
+        'First Word': first_word.to_numpy(),
+        'Annotation': np.where(first_word != '', group_text + '\n' + first_word, group_text)
+    }, index=pd.Index(top['Material Group 2'].to_numpy(), name='Material Group 2'))
+    return table
+
+
+def _layout_cells(warehouse_layout_df_zone, annotations, num_rows, num_cols):
+    """Baris, kolom, label cluster, dan teks anotasi untuk sel yang berada di dalam grid."""
+    rows = warehouse_layout_df_zone['Row'].to_numpy(dtype=int)
+    cols = warehouse_layout_df_zone['Column'].to_numpy(dtype=int)
+    inside = (rows >= 0) & (rows < num_rows) & (cols >= 0) & (cols < num_cols)
+
+    groups = warehouse_layout_df_zone['Material Group 2'][inside]
+    texts = annotations['Annotation'].reindex(groups.to_numpy()).to_numpy(dtype=object)
+    texts = np.where(pd.isna(texts), groups.astype(str).to_numpy(), texts)
+    labels = warehouse_layout_df_zone['Cluster Label'].to_numpy(dtype=float)[inside]
+    return rows[inside], cols[inside], labels, texts
+
+
+def figure_key(zone_name, warehouse_layout_df_zone, num_rows, num_cols, annotations=None, dpi=100):
+    """Hash isi layout (posisi, cluster, anotasi) + pengaturan baris/kolom, untuk kunci cache gambar."""
+    if annotations is None:
+        annotations = pd.DataFrame(columns=['Annotation'])
+    rows, cols, labels, texts = _layout_cells(warehouse_layout_df_zone, annotations, num_rows, num_cols)
+    digest = hashlib.sha1(f"{zone_name}|{num_rows}|{num_cols}|{dpi}".encode('utf-8'))
+    digest.update(rows.tobytes())
+    digest.update(cols.tobytes())
+    digest.update(labels.tobytes())
+    digest.update('\x1f'.join(texts).encode('utf-8'))
+    return digest.hexdigest()[:20]
+
+
+def visualize_zone_layout(zone_df, zone_name, warehouse_layout_df_zone, num_rows, num_cols, annotations=None):
+    """Heatmap layout zona (warna = Cluster Label) dengan anotasi Material Group 2 dan kata pertama deskripsi."""
+    # Diimpor di sini agar matplotlib/seaborn hanya dimuat saat layout pertama kali digambar
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if annotations is None:
+        annotations = annotation_table(zone_df)
+    rows, cols, labels, texts = _layout_cells(warehouse_layout_df_zone, annotations, num_rows, num_cols)
+
+    layout_matrix_zone = np.full((num_rows, num_cols), np.nan)
+    layout_matrix_zone[rows, cols] = labels
+
+    fig, ax = plt.subplots(figsize=(num_cols * 1.5, num_rows * 2))
+    sns.heatmap(layout_matrix_zone, annot=False, cmap='viridis', cbar_kws={'label': 'Cluster Label'}, linewidths=.5, linecolor='lightgray', ax=ax)
+
+    # Annotate cells dengan Material Group 2 ID dan Kata Pertama dari Material Desc yang paling sering
+    for r, c, annotation_text in zip(rows, cols, texts):
+        ax.text(c + 0.5, r + 0.5, annotation_text,
+                ha='center', va='center', color='white', fontsize=8)
+
+    ax.set_title(f'Warehouse Layout Rekomendasi ({zone_name}) - {num_rows}x{num_cols}', fontsize=14)
+    ax.set_xlabel('Column', fontsize=12)
+    ax.set_ylabel('Row', fontsize=12)
+    ax.set_yticks(np.arange(num_rows) + 0.5, range(num_rows))
+    ax.set_xticks(np.arange(num_cols) + 0.5, range(num_cols))
+    ax.invert_yaxis()
+
+    return fig
+
+
+def _prune_figure_cache():
+    paths = glob.glob(os.path.join(FIGURE_CACHE_DIR, '*.png'))
+    if len(paths) <= FIGURE_CACHE_MAX_FILES:
+        return
+    paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+    for old in paths[:len(paths) - FIGURE_CACHE_MAX_FILES]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def render_zone_png(zone_df, zone_name, warehouse_layout_df_zone, num_rows, num_cols, dpi=100, annotations=None):
+    """Menggambar layout zona ke PNG (bytes), lewat cache file yang dikunci hash layout.
+
+    Layout yang sama (posisi, cluster, anotasi, baris x kolom) tidak digambar ulang,
+    termasuk jika dihitung di proses worker yang berbeda.
+    """
+    if annotations is None:
+        annotations = annotation_table(zone_df)
+    key = figure_key(zone_name, warehouse_layout_df_zone, num_rows, num_cols, annotations, dpi)
+    cache_path = os.path.join(FIGURE_CACHE_DIR, f"{key}.png")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as handle:
+                png = handle.read()
+            os.utime(cache_path)
+            return png
+        except OSError:
+            pass
+
+    import matplotlib.pyplot as plt
+
+    fig = visualize_zone_layout(zone_df, zone_name, warehouse_layout_df_zone, num_rows, num_cols, annotations)
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    png = buffer.getvalue()
+
+    try:
+        os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as handle:
+            handle.write(png)
+        os.replace(tmp_path, cache_path)
+        _prune_figure_cache()
+    except OSError:
+        # Cache hanya optimasi; gambar tetap dikembalikan
+        pass
+    return png
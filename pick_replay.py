@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Asumsi default untuk estimasi throughput
+SLOT_LENGTH_M = 1.5      # jarak antar slot (meter)
+WALK_SPEED_M_PER_MIN = 60.0
+PICK_SECONDS_PER_LINE = 10.0
+
+
+def replay_picks(picks, layout, item_col='Material Group 2', doc_col='Reference Document',
+                 time_col='Confirm 1 Time', slot_length=SLOT_LENGTH_M,
+                 walk_speed=WALK_SPEED_M_PER_MIN, pick_seconds=PICK_SECONDS_PER_LINE):
+    """Memutar ulang setiap dokumen picking (urut `time_col`) pada sebuah layout.
+
+    Rute per dokumen: (0, 0) -> item pertama -> ... -> item terakhir -> (0, 0),
+    jarak Manhattan dalam satuan slot. Baris dengan item yang tidak ada di
+    layout dilewati (dihitung di kolom 'Unplaced Lines').
+    Mengembalikan DataFrame per dokumen.
+    """
+    data = picks[[doc_col, item_col, time_col]].dropna(subset=[doc_col])
+    times = data[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, errors='coerce')
+
+    layout = layout.dropna(subset=[item_col]).drop_duplicates(subset=[item_col])
+    slot_index = pd.Index(layout[item_col]).get_indexer(data[item_col])
+    placed = slot_index >= 0
+
+    doc_codes, doc_uniques = pd.factorize(data[doc_col])
+    lines_total = np.bincount(doc_codes, minlength=len(doc_uniques))
+
+    # Urutkan per dokumen lalu waktu konfirmasi (lexsort: kunci terakhir = kunci utama)
+    doc_codes = doc_codes[placed]
+    slot_index = slot_index[placed]
+    time_values = times.to_numpy()[placed].astype('datetime64[ns]').view('int64').copy()
+    # NaT di akhir dokumen, sama seperti sort_values dan picking_stats
+    time_values[pd.isna(times).to_numpy()[placed]] = np.iinfo(np.int64).max
+    order = np.lexsort((time_values, doc_codes))
+    doc_codes = doc_codes[order]
+    rows = layout['Row'].to_numpy(dtype=np.int64)[slot_index[order]]
+    cols = layout['Column'].to_numpy(dtype=np.int64)[slot_index[order]]
+
+    # Jarak antar pick berurutan; awal dokumen dihitung dari depot (0, 0)
+    step = np.empty(len(rows), dtype=np.int64)
+    if len(rows):
+        step[0] = rows[0] + cols[0]
+        step[1:] = np.abs(np.diff(rows)) + np.abs(np.diff(cols))
+        new_doc = np.r_[True, doc_codes[1:] != doc_codes[:-1]]
+        step[new_doc] = rows[new_doc] + cols[new_doc]
+        last = np.r_[doc_codes[1:] != doc_codes[:-1], True]
+        # Kembali ke depot setelah pick terakhir
+        step[last] += rows[last] + cols[last]
+
+    n_docs = len(doc_uniques)
+    distance = np.bincount(doc_codes, weights=step, minlength=n_docs)
+    lines_placed = np.bincount(doc_codes, minlength=n_docs)
+    travel_minutes = distance * slot_length / walk_speed
+    pick_minutes = lines_placed * pick_seconds / 60
+
+    return pd.DataFrame({
+        doc_col: doc_uniques,
+        'Lines': lines_placed,
+        'Unplaced Lines': lines_total - lines_placed,
+        'Travel Distance': distance,
+        'Estimated Minutes': travel_minutes + pick_minutes,
+    })
+
+
+def summarize_replay(per_document):
+    """Ringkasan hasil replay: total jarak, rata-rata per dokumen, dan estimasi throughput."""
+    total_minutes = per_document['Estimated Minutes'].sum()
+    total_lines = per_document['Lines'].sum()
+    return {
+        'Documents': len(per_document),
+        'Lines': int(total_lines),
+        'Unplaced Lines': int(per_document['Unplaced Lines'].sum()),
+        'Total Travel Distance': float(per_document['Travel Distance'].sum()),
+        'Avg Distance per Document': float(per_document['Travel Distance'].mean()) if len(per_document) else 0.0,
+        'Lines per Hour': float(total_lines / total_minutes * 60) if total_minutes else 0.0,
+    }
+
+
+def compare_layouts(picks, layouts, item_col='Material Group 2', **replay_params):
+    """Membandingkan beberapa layout kandidat ({nama: tabel layout}) pada data picking yang sama."""
+    rows = []
+    for name, layout in layouts.items():
+        summary = summarize_replay(replay_picks(picks, layout, item_col=item_col, **replay_params))
+        rows.append({'Layout': name, **summary})
+    return pd.DataFrame(rows)
@@ -0,0 +1,112 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Level item yang bisa di-query dari statistik picking
+ITEM_LEVELS = ('Material Group 2', 'Material ID')
+# Jumlah hasil statistik yang disimpan di memori (per sidik jari input)
+MAX_CACHED_STATS = 8
+
+_stats_cache = OrderedDict()
+
+
+def frame_fingerprint(df, columns):
+    """Sidik jari isi kolom DataFrame (hash nilai dan index per baris)."""
+    hashed = pd.util.hash_pandas_object(df[list(columns)], index=True).to_numpy()
+    raw = hashlib.sha1(hashed.tobytes())
+    raw.update('|'.join(map(str, columns)).encode('utf-8'))
+    return raw.hexdigest()[:16]
+
+
+class PickingStats:
+    """Statistik picking per dokumen dari satu kali pengurutan (dokumen, waktu konfirmasi).
+
+    Untuk setiap baris: urutan picking di dalam dokumen, jumlah item dokumen, pick
+    pertama, dan Picking Sequence Score (urutan / jumlah item). Ringkasan per level
+    item ('Material Group 2' atau 'Material ID') dihitung sekali lalu disimpan.
+    """
+
+    def __init__(self, df, doc_col='Reference Document', time_col='Confirm 1 Time', item_levels=ITEM_LEVELS):
+        self.doc_col = doc_col
+        self.time_col = time_col
+        self.item_levels = [level for level in item_levels if level in df.columns]
+
+        doc_codes, _ = pd.factorize(df[doc_col])
+        times = df[time_col]
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times, errors='coerce')
+        time_values = times.to_numpy().astype('datetime64[ns]').view('int64').copy()
+        # NaT di akhir dokumen, sama seperti sort_values
+        time_values[pd.isna(times).to_numpy()] = np.iinfo(np.int64).max
+
+        # Baris tanpa dokumen tidak ikut dihitung (seperti groupby)
+        valid = np.flatnonzero(doc_codes >= 0)
+        order = valid[np.lexsort((time_values[valid], doc_codes[valid]))]
+        doc_codes = doc_codes[order]
+
+        n_lines = len(order)
+        new_doc = np.r_[True, doc_codes[1:] != doc_codes[:-1]] if n_lines else np.zeros(0, dtype=bool)
+        doc_start = np.flatnonzero(new_doc)
+        doc_size = np.diff(np.r_[doc_start, n_lines])
+        line_doc = np.cumsum(new_doc) - 1
+
+        self.positions = order
+        self.index = df.index[order]
+        self.picking_order = np.arange(n_lines) - np.repeat(doc_start, doc_size) + 1
+        self.document_size = np.repeat(doc_size, doc_size)
+        self.sequence_score = self.picking_order / np.maximum(self.document_size, 1)
+        self.first_pick = new_doc
+        self.n_documents = len(doc_start)
+        self._line_doc = line_doc
+        self._items = {level: df[level].to_numpy()[order] for level in self.item_levels}
+        self._by_level = {}
+
+    def lines(self):
+        """Statistik per baris (index asli, urut dokumen lalu waktu konfirmasi)."""
+        return pd.DataFrame({
+            'Picking Order': self.picking_order,
+            'Total Items in Document': self.document_size,
+            'Picking Sequence Score': self.sequence_score,
+            'First Pick': self.first_pick,
+        }, index=self.index)
+
+    def by(self, level='Material Group 2'):
+        """First Pick Frequency, rata-rata Picking Sequence Score, jumlah baris dan dokumen per item."""
+        if level not in self._by_level:
+            if level not in self._items:
+                raise KeyError(f"Level '{level}' tidak tersedia; pilihan: {self.item_levels}")
+            codes, uniques = pd.factorize(self._items[level])
+            keep = codes >= 0
+            codes = codes[keep]
+            n_items = len(uniques)
+            lines = np.bincount(codes, minlength=n_items)
+            score_sum = np.bincount(codes, weights=self.sequence_score[keep], minlength=n_items)
+            first = np.bincount(codes[self.first_pick[keep]], minlength=n_items)
+            # Dokumen unik per item: pasangan (item, dokumen) yang berbeda
+            pairs = np.unique(np.stack([codes, self._line_doc[keep]]), axis=1) if len(codes) else np.zeros((2, 0), dtype=np.int64)
+            documents = np.bincount(pairs[0], minlength=n_items)
+            self._by_level[level] = pd.DataFrame({
+                level: uniques,
+                'First Pick Frequency': first,
+                'Picking Sequence Score': score_sum / np.maximum(lines, 1),
+                'Lines': lines,
+                'Documents': documents,
+            })
+        return self._by_level[level]
+
+
+def picking_stats(df, doc_col='Reference Document', time_col='Confirm 1 Time', item_levels=ITEM_LEVELS):
+    """PickingStats untuk `df`, dipakai ulang selama isi kolom yang relevan tidak berubah."""
+    columns = [doc_col, time_col, *[level for level in item_levels if level in df.columns]]
+    key = frame_fingerprint(df, columns)
+    if key in _stats_cache:
+        _stats_cache.move_to_end(key)
+        return _stats_cache[key]
+
+    stats = PickingStats(df, doc_col=doc_col, time_col=time_col, item_levels=item_levels)
+    _stats_cache[key] = stats
+    while len(_stats_cache) > MAX_CACHED_STATS:
+        _stats_cache.popitem(last=False)
+    return stats
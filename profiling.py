@@ -0,0 +1,158 @@
+import contextvars
+import functools
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Log JSON-lines default untuk hasil profil (bisa diganti lewat environment)
+PROFILE_LOG = os.environ.get('SDR_PROFILE_LOG', 'sdr_profile.jsonl')
+
+# Ukuran data bersama (dipakai semua sesi) per nama, dalam MB; hanya entri terbaru yang disimpan
+MAX_SHARED_ENTRIES = 32
+_shared_sizes = OrderedDict()
+
+# Catatan stage untuk run yang sedang aktif (per sesi/thread); None = profil tidak aktif
+_records = contextvars.ContextVar('sdr_profile_records', default=None)
+_stack = contextvars.ContextVar('sdr_profile_stack', default=())
+
+
+def _peak_rss_mb():
+    """RSS puncak proses (MB), atau None jika tidak tersedia di platform ini."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _row_count(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple) and value and isinstance(value[0], (pd.DataFrame, pd.Series)):
+        return len(value[0])
+    return None
+
+
+def start_run():
+    """Memulai run profil baru; stage berikutnya di konteks ini dicatat ke daftar yang dikembalikan."""
+    records = []
+    _records.set(records)
+    _stack.set(())
+    return records
+
+
+def records():
+    """Catatan stage run aktif (kosong jika profil tidak aktif)."""
+    return list(_records.get() or [])
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Mengukur satu stage: wall time, CPU time, kenaikan RSS puncak, dan jumlah baris.
+
+    Jumlah baris bisa diisi belakangan lewat `record['rows'] = ...` di dalam blok.
+    Stage bersarang dicatat dengan nama 'induk / anak'.
+    """
+    parent = _stack.get()
+    full_name = ' / '.join((*parent, name))
+    token = _stack.set((*parent, name))
+    record = {'stage': full_name, 'rows': rows}
+    rss_before = _peak_rss_mb()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['wall_s'] = time.perf_counter() - wall_start
+        record['cpu_s'] = time.process_time() - cpu_start
+        rss_after = _peak_rss_mb()
+        record['peak_rss_delta_mb'] = None if rss_before is None else rss_after - rss_before
+        _stack.reset(token)
+        active = _records.get()
+        if active is not None:
+            active.append(record)
+
+
+def profiled(name=None):
+    """Dekorator: setiap panggilan fungsi dicatat sebagai stage (baris = panjang hasil DataFrame)."""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as record:
+                result = func(*args, **kwargs)
+                record['rows'] = _row_count(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def summarize(stage_records):
+    """Ringkasan per stage (stage yang berulang, mis. per potongan file, dijumlahkan)."""
+    columns = ['stage', 'calls', 'wall_s', 'cpu_s', 'peak_rss_delta_mb', 'rows']
+    if not stage_records:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(stage_records)
+    summary = df.groupby('stage', sort=False).agg(
+        calls=('stage', 'size'),
+        wall_s=('wall_s', 'sum'),
+        cpu_s=('cpu_s', 'sum'),
+        peak_rss_delta_mb=('peak_rss_delta_mb', 'sum'),
+        rows=('rows', 'sum')
+    ).reset_index()
+    return summary[columns]
+
+
+def to_jsonl(stage_records, **meta):
+    """Satu baris JSON untuk satu run: metadata (mis. halaman, versi) + daftar stage."""
+    payload = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), **meta, 'stages': stage_records}
+    return json.dumps(payload, default=str) + '\n'
+
+
+def append_log(stage_records, path=PROFILE_LOG, **meta):
+    """Menambahkan hasil run ke log JSON-lines untuk memantau regresi antar rilis."""
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(to_jsonl(stage_records, **meta))
+    return path
+
+
+def object_memory_mb(obj):
+    """Perkiraan memori objek (DataFrame/Series termasuk isi string, array NumPy, atau koleksinya) dalam MB."""
+    if isinstance(obj, pd.DataFrame):
+        return obj.memory_usage(deep=True).sum() / 1024 ** 2
+    if isinstance(obj, pd.Series):
+        return obj.memory_usage(deep=True) / 1024 ** 2
+    if hasattr(obj, 'nbytes'):
+        return obj.nbytes / 1024 ** 2
+    if isinstance(obj, dict):
+        return sum(object_memory_mb(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(object_memory_mb(value) for value in obj)
+    return sys.getsizeof(obj) / 1024 ** 2
+
+
+def register_shared(name, obj):
+    """Mencatat data bersama (satu salinan per proses server) untuk panel memori; mengembalikan `obj`."""
+    _shared_sizes[name] = object_memory_mb(obj)
+    _shared_sizes.move_to_end(name)
+    while len(_shared_sizes) > MAX_SHARED_ENTRIES:
+        _shared_sizes.popitem(last=False)
+    return obj
+
+
+def shared_memory():
+    """Data bersama yang tercatat: DataFrame [nama, MB]."""
+    return pd.DataFrame({'data': list(_shared_sizes), 'mb': list(_shared_sizes.values())})
+
+
+def session_memory_mb(values):
+    """Memori yang hanya dimiliki satu sesi (mis. isi session_state), dalam MB."""
+    return sum(object_memory_mb(value) for value in values)
@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Kuantil bawaan untuk demand harian per interval
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95)
+# Parameter kompresi t-digest: kira-kira jumlah maksimum centroid per grup adalah COMPRESSION / 2
+COMPRESSION = 100
+
+
+def quantile_label(q):
+    """Label kolom kuantil: 0.5 -> 'P50', 0.995 -> 'P99.5'."""
+    return f"P{q * 100:g}"
+
+
+def _group_codes(df, keys):
+    """Kode grup per baris (-1 untuk kunci kosong, seperti groupby biasa)."""
+    return df.groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+
+
+def _compress(centroids, keys, compression):
+    """Menggabungkan centroid per grup dengan fungsi skala k1 t-digest (ekor distribusi tetap rapat)."""
+    if centroids.empty:
+        return centroids
+    codes = _group_codes(centroids, keys)
+    keep = codes >= 0
+    centroids, codes = centroids[keep], codes[keep]
+    means = centroids['mean'].to_numpy(dtype=float)
+    weights = centroids['weight'].to_numpy(dtype=float)
+
+    order = np.lexsort((means, codes))
+    codes, means, weights = codes[order], means[order], weights[order]
+    total = np.bincount(codes, weights=weights)
+    group_offset = np.r_[0.0, np.cumsum(total)[:-1]][codes]
+    q_mid = (np.cumsum(weights) - weights / 2 - group_offset) / total[codes]
+    bucket = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_mid - 1, -1, 1))).astype(np.int64)
+
+    # Centroid berurutan dengan grup dan bucket yang sama digabung (rata-rata berbobot)
+    starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (bucket[1:] != bucket[:-1])])
+    merged_weight = np.add.reduceat(weights, starts)
+    merged_mean = np.add.reduceat(weights * means, starts) / merged_weight
+
+    result = centroids[keys].iloc[order[starts]].reset_index(drop=True)
+    result['mean'] = merged_mean
+    result['weight'] = merged_weight
+    return result
+
+
+def build_sketch(df, keys, value_col, compression=COMPRESSION):
+    """Sketch t-digest per grup `keys` dari kolom `value_col` (tabel centroid: keys, mean, weight)."""
+    centroids = df[list(keys)].copy()
+    centroids['mean'] = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=float)
+    centroids['weight'] = 1.0
+    return _compress(centroids.dropna(subset=['mean']), list(keys), compression)
+
+
+def merge_sketches(sketches, keys, compression=COMPRESSION):
+    """Menggabungkan beberapa sketch (mis. per potongan atau per bulan) menjadi satu."""
+    sketches = [sketch for sketch in sketches if sketch is not None and not sketch.empty]
+    if not sketches:
+        return pd.DataFrame(columns=[*keys, 'mean', 'weight'])
+    return _compress(pd.concat(sketches, ignore_index=True), list(keys), compression)
+
+
+def sketch_quantiles(sketch, keys, quantiles=DEFAULT_QUANTILES):
+    """Perkiraan kuantil per grup dari sketch, interpolasi linear seperti `Series.quantile`.
+
+    Centroid berbobot w menempati posisi tengah rank-nya; untuk centroid tunggal
+    (grup kecil yang belum dikompresi) hasilnya sama persis dengan kuantil eksak.
+    """
+    columns = [*keys, *[quantile_label(q) for q in quantiles]]
+    if sketch.empty:
+        return pd.DataFrame(columns=columns)
+    codes = _group_codes(sketch, list(keys))
+    order = np.lexsort((sketch['mean'].to_numpy(dtype=float), codes))
+    codes = codes[order]
+    means = sketch['mean'].to_numpy(dtype=float)[order]
+    weights = sketch['weight'].to_numpy(dtype=float)[order]
+
+    n_groups = codes.max() + 1
+    total = np.bincount(codes, weights=weights, minlength=n_groups)
+    group_offset = np.r_[0.0, np.cumsum(total)[:-1]]
+    # Posisi rank (0..W-1) tengah setiap centroid di dalam grupnya
+    center = np.cumsum(weights) - weights - group_offset[codes] + (weights - 1) / 2
+    position_key = codes + center / total[codes]
+    first = np.searchsorted(codes, np.arange(n_groups), side='left')
+    last = np.searchsorted(codes, np.arange(n_groups), side='right') - 1
+
+    result = sketch[list(keys)].iloc[order[first]].reset_index(drop=True)
+    group_ids = np.arange(n_groups)
+    for q in quantiles:
+        target = q * (total - 1)
+        j = np.searchsorted(position_key, group_ids + target / total, side='right') - 1
+        lo = np.clip(j, first, last)
+        hi = np.clip(j + 1, first, last)
+        span = center[hi] - center[lo]
+        frac = np.where(span > 0, np.clip((target - center[lo]) / np.where(span > 0, span, 1), 0, 1), 0.0)
+        result[quantile_label(q)] = means[lo] + frac * (means[hi] - means[lo])
+    return result
+
+
+def exact_quantiles(df, keys, value_col, quantiles=DEFAULT_QUANTILES):
+    """Kuantil eksak per grup (mode validasi; membutuhkan seluruh deret nilai)."""
+    columns = [*keys, *[quantile_label(q) for q in quantiles]]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+    exact = df.groupby(list(keys), observed=True)[value_col].quantile(list(quantiles)).unstack()
+    exact.columns = [quantile_label(q) for q in exact.columns]
+    return exact.reset_index()[columns]
+
+
+def validate_quantiles(df, keys, value_col, quantiles=DEFAULT_QUANTILES, compression=COMPRESSION):
+    """Membandingkan jalur sketch dengan jalur eksak: galat per kuantil dan throughput masing-masing."""
+    start = time.perf_counter()
+    approx = sketch_quantiles(build_sketch(df, keys, value_col, compression), keys, quantiles)
+    sketch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = exact_quantiles(df, keys, value_col, quantiles)
+    exact_seconds = time.perf_counter() - start
+
+    merged = pd.merge(exact, approx, on=list(keys), suffixes=(' exact', ' sketch'))
+    rows = []
+    for q in quantiles:
+        label = quantile_label(q)
+        error = (merged[f"{label} sketch"] - merged[f"{label} exact"]).abs()
+        scale = merged[f"{label} exact"].abs().where(lambda s: s > 0)
+        rows.append({
+            'Kuantil': label,
+            'Grup': len(merged),
+            'Galat Rata-rata': error.mean(),
+            'Galat Maksimum': error.max(),
+            'Galat Relatif Rata-rata (%)': (error / scale).mean() * 100,
+            'Sketch (baris/s)': len(df) / sketch_seconds if sketch_seconds else np.nan,
+            'Eksak (baris/s)': len(df) / exact_seconds if exact_seconds else np.nan,
+        })
+    return pd.DataFrame(rows)
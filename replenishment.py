@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+from uom_service import as_uom_index, get_uom_index
+from xlsx_ingest import read_xlsx
+
+# Nama kolom file Retail Warehouse Stock Analysis (3 baris judul dilewati)
+STOCK_ANALYSIS_COLUMNS = [
+    'Product Name', 'Material ID', 'Movement Category Retail', 'Min-Max Recommendation Assessment',
+    'Avg Picking (Month-1) in Box', 'Avg Last 14 Days in Box', 'Avg Last 3 Days in Box',
+    'Stock in Box', 'Xdays'
+]
+DEFAULT_AVG_COLUMN = 'Avg Picking (Month-1) in Box'
+# Grid pengali Max Replenishment (sama dengan slider di halaman Min Max)
+MULTIPLIER_GRID = np.round(np.arange(1.0, 3.0 + 1e-9, 0.1), 1)
+
+
+@profiled('load_stock_analysis')
+def load_stock_analysis(source, progress=None):
+    """Memuat file Retail Warehouse Stock Analysis dan mengubah kolom kuantitas (Box) ke numerik.
+
+    File dibaca dalam mode read-only hanya sampai kolom terakhir yang dipakai; `progress`
+    (IngestProgress) diperbarui jumlah baris terbaca.
+    """
+    df = read_xlsx(source, names=STOCK_ANALYSIS_COLUMNS, skiprows=3, progress=progress)
+    quantity_cols = [col for col in STOCK_ANALYSIS_COLUMNS if 'Box' in col]
+    for col in quantity_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+@profiled('load_uom_table')
+def load_uom_table(file_path):
+    """Indeks master UoM bersama (satu konversi per Material, dimuat ulang jika file berubah)."""
+    return get_uom_index(file_path)
+
+
+def attach_pcs_per_box(df, df_uom):
+    """Menambahkan kolom 'Pcs per Box' dari master UoM (UomIndex atau DataFrame)."""
+    return df.assign(**{'Pcs per Box': as_uom_index(df_uom).lookup(df['Material ID'])})
+
+
+def average_columns(df):
+    """Kolom rata-rata (Box) yang bisa dipakai sebagai basis Min Replenishment."""
+    return [col for col in df.columns if 'Avg' in col and 'Box' in col]
+
+
+@profiled('calculate_replenishment')
+def calculate_replenishment(df, chosen_avg_column, max_multiplier=1.5):
+    """Menghitung Min/Max Replenishment (dalam Box dan Pcs)."""
+    df['Min Replenishment'] = df[chosen_avg_column].fillna(0).round().astype(int)
+    df['Max Replenishment'] = (df[chosen_avg_column] * max_multiplier).fillna(0).round().astype(int)
+
+    df['Min Replenishment (Pcs)'] = (df['Min Replenishment'] * df['Pcs per Box']).fillna(0).round().astype(int)
+    df['Max Replenishment (Pcs)'] = (df['Max Replenishment'] * df['Pcs per Box']).fillna(0).round().astype(int)
+
+    return df
+
+
+# Kolom hasil `calculate_replenishment`
+REPLENISHMENT_COLUMNS = ['Min Replenishment', 'Max Replenishment', 'Min Replenishment (Pcs)', 'Max Replenishment (Pcs)']
+
+
+def _rounded_int(values, dtype):
+    """Seperti `.fillna(0).round().astype(int)` pada array NumPy."""
+    return np.rint(np.nan_to_num(values, nan=0.0)).astype(dtype)
+
+
+class ScenarioCube:
+    """Min/Max Replenishment untuk semua kombinasi kolom rata-rata x pengali dalam satu broadcast.
+
+    Hasil disimpan sebagai array ringkas (kolom x pengali x item); mengganti pengali atau
+    kolom rata-rata hanya mengambil irisan cube. Angka per item sama dengan
+    `calculate_replenishment`.
+    """
+
+    def __init__(self, df, avg_columns=None, multipliers=MULTIPLIER_GRID):
+        self.df = df
+        self.avg_columns = list(avg_columns or average_columns(df))
+        self.multipliers = np.asarray(multipliers, dtype=float)
+
+        avg = df[self.avg_columns].to_numpy(dtype=float).T                  # (kolom, item)
+        pcs = pd.to_numeric(df['Pcs per Box'], errors='coerce').to_numpy(dtype=float)
+
+        self.min_box = _rounded_int(avg, np.int32)                            # (kolom, item)
+        self.max_box = _rounded_int(avg[:, None, :] * self.multipliers[None, :, None], np.int32)  # (kolom, pengali, item)
+        self.min_pcs = _rounded_int(self.min_box * pcs, np.int64)
+        self.max_pcs = _rounded_int(self.max_box * pcs, np.int64)
+
+    def _position(self, avg_column, multiplier):
+        col = self.avg_columns.index(avg_column)
+        matches = np.flatnonzero(np.isclose(self.multipliers, multiplier))
+        return col, (matches[0] if len(matches) else None)
+
+    def result(self, avg_column, multiplier, rows=None, columns=None):
+        """Frame hasil untuk satu skenario (kolom sama dengan `calculate_replenishment`).
+
+        `rows` (posisi baris) dan `columns` (kolom input yang ikut) membatasi salinan
+        hanya pada bagian yang ditampilkan; frame sumber tidak pernah diubah.
+        """
+        col, mult = self._position(avg_column, multiplier)
+        base = self.df if columns is None else self.df[list(columns)]
+        items = slice(None) if rows is None else np.asarray(rows)
+        if rows is not None:
+            base = base.iloc[items]
+        if mult is None:
+            # Pengali di luar grid: hitung langsung (butuh kolom rata-rata dan Pcs per Box)
+            source = self.df if rows is None else self.df.iloc[items]
+            calculated = calculate_replenishment(source[[avg_column, 'Pcs per Box']].copy(), avg_column, multiplier)
+            return base.assign(**{col_name: calculated[col_name] for col_name in REPLENISHMENT_COLUMNS})
+        return base.assign(**{
+            'Min Replenishment': self.min_box[col, items],
+            'Max Replenishment': self.max_box[col, mult, items],
+            'Min Replenishment (Pcs)': self.min_pcs[col, items],
+            'Max Replenishment (Pcs)': self.max_pcs[col, mult, items],
+        })
+
+    def summary(self):
+        """Total per skenario: Box, Pcs, dan jumlah item dengan Max Replenishment > 0."""
+        n_cols, n_mult = len(self.avg_columns), len(self.multipliers)
+        return pd.DataFrame({
+            'Kolom Rata-Rata': np.repeat(self.avg_columns, n_mult),
+            'Pengali': np.tile(self.multipliers, n_cols),
+            'Total Min (Box)': np.repeat(self.min_box.sum(axis=1, dtype=np.int64), n_mult),
+            'Total Max (Box)': self.max_box.sum(axis=2, dtype=np.int64).ravel(),
+            'Total Min (Pcs)': np.repeat(self.min_pcs.sum(axis=1), n_mult),
+            'Total Max (Pcs)': self.max_pcs.sum(axis=2).ravel(),
+            'Item Terdampak': (self.max_box > 0).sum(axis=2).ravel(),
+        })
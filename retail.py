@@ -1,167 +1,198 @@
 import streamlit as st
 import pandas as pd
-import io
 import numpy as np
 import os 
+from data_cache import file_fingerprint, read_static_table, static_source_path
+import zrw70_processing
+import dataset_store
+from interval_engine import DEFAULT_INTERVAL_GRID
+from quantile_sketch import DEFAULT_QUANTILES, quantile_label
+from schema import apply_schema, category_mask, category_options
+from export import EXPORT_FORMATS, available_formats, export_bytes
+from search_index import SearchIndex, split_terms
+from table_view import TableView, show_paginated_table
+from profiling import profiled, register_shared, stage
+from stage_cache import get_stage_cache, upload_fingerprint
+from xlsx_ingest import read_upload
+from uom_service import UOM_COLUMNS, UOM_DATA_FILE, UomIndex, get_uom_index
 
 # Tentukan nama file statis
 PROCESSED_DATA_FILE = '2025-11-02T15-57_export.xlsx'
-UOM_DATA_FILE = 'ZRW12-UoM.XLSX'
+
+# Kolom yang benar-benar dipakai dari masing-masing file statis
+PROCESSED_DATA_COLUMNS = [
+    'Material ID', 'Material Desc', 'Movement Type', 'Time Interval', 'UOM',
+    'Min Total Quantity (BOX)', 'Max Total Quantity (BOX)', 'Average Total Quantity (BOX)'
+]
+
+# Pilihan grid interval waktu untuk data mentah (lihat interval_engine.INTERVAL_GRIDS)
+INTERVAL_GRID_OPTIONS = {
+    '2h': 'Per 2 Jam (07:00-21:00)',
+    '1h': 'Per 1 Jam (07:00-21:00)',
+    'shift': 'Per Shift (07:00-15:00, 15:00-23:00)',
+}
+
+# Kuantil total harian yang bisa ditambahkan ke hasil (selain Min/Max/Avg)
+QUANTILE_OPTIONS = (0.5, 0.75, 0.9, 0.95, 0.99)
 
 # Fungsi untuk memuat file CSV hasil proses secara otomatis (di-cache agar cepat)
-@st.cache_data
-def load_processed_data(file_path):
-    """Memuat data hasil proses dari file."""
+@st.cache_resource(max_entries=2)
+@profiled('load_processed_data')
+def load_processed_data(file_path, source_key=None):
+    """Memuat data hasil proses dari file (satu salinan bersama untuk semua sesi; jangan diubah di tempat).
+
+    `source_key` (sidik jari file yang benar-benar dibaca) hanya dipakai sebagai kunci cache.
+    """
     if not os.path.exists(file_path):
         st.error(f"File dataset tidak ditemukan: **{file_path}**")
         return pd.DataFrame()
     try:
-        df = pd.read_excel(file_path)
-        # Konversi ulang tipe data yang mungkin berubah setelah disimpan/dibaca
-        if 'Material ID' in df.columns:
-            df['Material ID'] = df['Material ID'].astype('Int64', errors='ignore')
-        return df
+        # Baca lewat cache kolumnar; CSV kembaran yang lebih baru dipakai jika ada
+        df = read_static_table(file_path, columns=PROCESSED_DATA_COLUMNS, use_csv_twin=True)
+        # Perlu memastikan 'Movement Type' ada; jika tidak, tambahkan kolom dummy agar filter tidak error
+        if 'Movement Type' not in df.columns:
+            df['Movement Type'] = '999' # Nilai dummy
+        # Tipe ringkas (kategori, float32, ID integer) agar hemat memori
+        return register_shared(f"dataset:{os.path.basename(file_path)}", apply_schema(df))
     except Exception as e:
         st.error(f"Terjadi kesalahan saat memuat file dataset: {e}")
         return pd.DataFrame()
 
-# Fungsi untuk memuat file UoM secara otomatis (di-cache agar cepat)
-@st.cache_data
+# Fungsi untuk memuat indeks UoM bersama (dimuat sekali per proses, otomatis dimuat ulang jika file berubah)
+@profiled('load_uom_data')
 def load_uom_data(file_path):
-    """Memuat data UoM dari file XLSX statis."""
+    """Indeks UoM dari file XLSX statis (lihat uom_service)."""
     if not os.path.exists(file_path):
         st.error(f"File UoM statis tidak ditemukan: **{file_path}**")
         # Menggunakan dummy data UoM jika file tidak ada
-        return pd.DataFrame({
+        return UomIndex(pd.DataFrame({
              'Material': [1010513.0, 1010514.0, 1010515.0, 1010516.0], 
              'UOM(in BUn)': [12.0, 1.0, 12.0, 12.0]
-           })
+           }), version='dummy')
     try:
-        return pd.read_excel(file_path)
+        return get_uom_index(file_path)
     except Exception as e:
         st.error(f"Terjadi kesalahan saat memuat file UoM statis: {e}")
-        return pd.DataFrame()
+        return UomIndex(pd.DataFrame(columns=UOM_COLUMNS), version='empty')
 
 
 def show_retail1_content():
     st.title("📦 Replenishment Retail by Interval")
     
-    @st.cache_data
-    def get_time_interval(hour):
-        """Menentukan interval waktu berdasarkan jam pembuatan."""
-        if 7 <= hour < 9: return '07:00-09:00'
-        elif 9 <= hour < 11: return '09:00-11:00'
-        elif 11 <= hour < 13: return '11:00-13:00'
-        elif 13 <= hour < 15: return '13:00-15:00'
-        elif 15 <= hour < 17: return '15:00-17:00'
-        elif 17 <= hour < 19: return '17:00-19:00'
-        elif 19 <= hour < 21: return '19:00-21:00'
-        else: return 'Other'
-
-    @st.cache_data
-    def convert_to_box_final(row):
-        """Mengkonversi kuantitas Min, Max, dan Avg ke unit BOX."""
-        avg_qty = row['Average Total Quantity']
-        min_qty = row['Min Total Quantity']
-        max_qty = row['Max Total Quantity']
-        original_uom = row['UOM']
-        conversion_to_pcs = row['Conversion_to_PCS']
-        
-        if pd.isna(original_uom) or pd.isna(conversion_to_pcs) or conversion_to_pcs <= 0:
-            return np.nan, np.nan, np.nan 
-        elif original_uom == 'BOX':
-            return min_qty, max_qty, avg_qty
-        elif original_uom == 'PCS':
-            min_qty_box = min_qty / conversion_to_pcs
-            max_qty_box = max_qty / conversion_to_pcs
-            avg_qty_box = avg_qty / conversion_to_pcs
-            return min_qty_box, max_qty_box, avg_qty_box
-        else:
-            return np.nan, np.nan, np.nan
-
-    @st.cache_data
-    def process_raw_data(df, df_uom):
-        """Fungsi utama untuk memproses data mentah (df_uom diambil dari database)."""
-        st.info("Memproses data mentah. Ini mungkin memakan waktu beberapa detik...")
-        
-        # 1. Filter Data Awal
-        # Tambahkan 'Movement Type' ke dalam proses data jika ada di kolom mentah
-        df_filtered = df[df['Storage Type Suggestion'] == 'ZYY'].copy()
-
-        if df_filtered.empty:
-            st.warning("Tidak ada data ditemukan untuk 'Storage Type Suggestion' = 'ZYY'.")
-            return pd.DataFrame()
-
-        # 2. Pembersihan & Pembuatan Kolom Waktu
-        df_filtered['Confirm 1 Time'] = pd.to_datetime(df_filtered['Confirm 1 Time'], errors='coerce')
-        df_filtered['Created Time'] = pd.to_datetime(df_filtered['Created Time'], format='%H:%M:%S', errors='coerce')
-        df_filtered['Created Hour'] = df_filtered['Created Time'].dt.hour
-        df_filtered['Time Interval'] = df_filtered['Created Hour'].apply(get_time_interval)
-        excel_epoch = pd.to_datetime('1899-12-30')
-        df_filtered['Created Date'] = pd.to_datetime(df_filtered['Created Date'], unit='D', origin=excel_epoch, errors='coerce')
-        df_filtered['Material ID'] = df_filtered['Material ID'].astype(float)
-        
-        # Kolom yang akan digabungkan ke hasil akhir
-        merge_cols = ['Material ID', 'Material Desc']
-        if 'Movement Type' in df_filtered.columns:
-            merge_cols.append('Movement Type')
-        
-        # **Ekstrak Material ID, Material Desc, dan Movement Type (jika ada)**
-        material_info = df_filtered[merge_cols].copy().drop_duplicates(subset=['Material ID', 'Movement Type'] if 'Movement Type' in df_filtered.columns else ['Material ID'])
-        
-        # 3. Hitung Kuantitas Total Harian per Interval
-        group_keys = ['Material ID', 'Created Date', 'Time Interval']
-        if 'Movement Type' in df_filtered.columns:
-            group_keys.append('Movement Type')
-            
-        daily_quantity_by_interval = df_filtered.groupby(group_keys)['TO Dummy Quantity'].sum().reset_index()
-
-        # 4. Hitung Min, Max, dan Rata-rata Total Harian per Material dan Interval
-        group_keys_agg = ['Material ID', 'Time Interval']
-        if 'Movement Type' in daily_quantity_by_interval.columns:
-            group_keys_agg.append('Movement Type')
-            
-        quantity_by_interval = daily_quantity_by_interval.groupby(group_keys_agg)['TO Dummy Quantity'].agg(['min', 'max', 'mean']).reset_index()
-        quantity_by_interval.columns = group_keys_agg + ['Average Total Quantity', 'Min Total Quantity', 'Max Total Quantity']
-
-        # 5. Gabungkan Material Desc & Movement Type ke Data Kuantitas
-        quantity_by_interval = pd.merge(quantity_by_interval, material_info, on=['Material ID', 'Movement Type'] if 'Movement Type' in material_info.columns else ['Material ID'], how='left')
-
-        # 6. Pembersihan dan Persiapan Data UoM
-        df_uom_cleaned = df_uom[['Material', 'UOM(in BUn)']].copy()
-        df_uom_cleaned.columns = ['Material ID', 'Conversion_to_PCS']
-        df_uom_cleaned.dropna(subset=['Material ID', 'Conversion_to_PCS'], inplace=True)
-        df_uom_cleaned['Material ID'] = df_uom_cleaned['Material ID'].astype(float)
-        uom_info_from_df = df_filtered[['Material ID', 'UOM Actual']].copy().drop_duplicates()
-        uom_info_from_df.columns = ['Material ID', 'UOM']
-        df_uom_cleaned = pd.merge(df_uom_cleaned, uom_info_from_df, on='Material ID', how='left').drop_duplicates(subset=['Material ID', 'UOM', 'Conversion_to_PCS'])
-
-        # 7. Gabungkan Data Kuantitas dan UoM
-        quantity_by_interval_merged = pd.merge(
-            quantity_by_interval, 
-            df_uom_cleaned[['Material ID', 'Conversion_to_PCS', 'UOM']], 
-            on='Material ID', 
-            how='left'
+    def save_upload_to_store(uploaded_file, file_key, stream_mode=True):
+        """Menyimpan total per jam file unggahan ke dataset store (partisi per bulan), sekali per file per sesi.
+
+        Dipanggil di luar fungsi yang di-cache sehingga tetap berjalan walaupun hasil
+        interval diambil dari cache (mis. file yang sama diunggah ulang dengan opsi ini aktif).
+        """
+        stored = st.session_state.setdefault('stored_uploads', set())
+        if file_key in stored:
+            return
+        hourly, material_info, uom_info = load_hourly_totals(uploaded_file, file_key, stream_mode)
+        months = dataset_store.append_hourly(hourly, material_info, uom_info) if hourly is not None else []
+        stored.add(file_key)
+        if months:
+            st.success(f"Total harian disimpan ke dataset store untuk bulan: {', '.join(months)}")
+
+    @st.cache_resource(max_entries=8)
+    def load_hourly_totals(_uploaded_file, file_key, stream_mode=True):
+        """Total harian per jam (total per jam, info material, info UoM) file ZRW70 unggahan.
+
+        Mode streaming membaca file per potongan baris agar memori tetap terbatas; selain itu
+        kolom RAW_COLUMNS dibaca sekaligus (thread latar, dengan progress bar). Keduanya
+        menghasilkan total yang sama, yang juga disimpan di stage cache disk.
+        Mengembalikan (None, None, None) jika tidak ada baris 'ZYY'.
+        """
+        def compute():
+            if stream_mode:
+                st.info("Memproses data mentah secara streaming. Ini mungkin memakan waktu beberapa detik...")
+                source = _uploaded_file
+            else:
+                source = get_stage_cache().cached_frame(
+                    'zrw70_raw', file_key, {'columns': zrw70_processing.RAW_COLUMNS},
+                    lambda: read_upload(_uploaded_file, zrw70_processing.RAW_COLUMNS, label="Membaca ZRW70")
+                )
+                st.info("Memproses data mentah. Ini mungkin memakan waktu beberapa detik...")
+            hourly, material_info, uom_info = zrw70_processing.collect_hourly_totals(source)
+            if hourly is None:
+                return {}, {}
+            return {'hourly': hourly, 'materials': material_info, 'uom': uom_info}, {}
+
+        with stage('hourly totals (stage cache)') as record:
+            frames, _ = get_stage_cache().cached_frames('zrw70_hourly', file_key, {'storage_type': 'ZYY'}, compute)
+            record['rows'] = len(frames['hourly']) if frames else 0
+        if not frames:
+            return None, None, None
+        return frames['hourly'], frames['materials'], frames['uom']
+
+    @st.cache_resource(max_entries=8)
+    def process_upload(_uploaded_file, file_key, _uom_index, uom_version, interval_grid=DEFAULT_INTERVAL_GRID, stream_mode=True,
+                       quantiles=(), exact_quantiles_mode=False):
+        """Statistik interval untuk file ZRW70 unggahan, diturunkan dari total per jam.
+
+        Kunci cache adalah sidik jari isi file (`file_key`) + parameter stage, bukan isi
+        DataFrame, sehingga rerun tidak meng-hash ulang data. Hasil juga disimpan di stage
+        cache disk: unggah ulang file yang sama langsung selesai, juga setelah redeploy.
+        """
+        def compute():
+            hourly, material_info, uom_info = load_hourly_totals(_uploaded_file, file_key, stream_mode)
+            if hourly is None:
+                return pd.DataFrame()
+            result_df = zrw70_processing.finalize_interval_stats(
+                zrw70_processing.interval_totals_from_hourly(hourly, interval_grid), material_info, uom_info, _uom_index,
+                quantiles=quantiles, exact_quantiles_mode=exact_quantiles_mode
+            )
+            st.success("Pemrosesan data selesai!")
+            return result_df
+
+        params = {
+            'storage_type': 'ZYY', 'uom_version': uom_version, 'interval_grid': interval_grid,
+            'quantiles': quantiles, 'exact_quantiles_mode': exact_quantiles_mode,
+        }
+        with stage('interval stats (stage cache)') as record:
+            result_df = get_stage_cache().cached_frame('interval_stats', file_key, params, compute)
+            record['rows'] = len(result_df)
+        if result_df.empty:
+            return result_df
+        return register_shared(f"upload:{file_key}", apply_schema(result_df))
+
+    @st.cache_resource(max_entries=8)
+    def load_store_data(months, start_date, end_date, _uom_index, uom_version, interval_grid, store_version, quantiles=(), exact_quantiles_mode=False):
+        """Statistik interval dari dataset store (hanya partisi bulan terpilih). `store_version`/`uom_version` = kunci cache."""
+        result_df = dataset_store.interval_stats(
+            _uom_index, months=list(months), interval_grid=interval_grid, start_date=start_date, end_date=end_date,
+            quantiles=quantiles, exact_quantiles_mode=exact_quantiles_mode
         )
-        
-        # Tentukan kunci unik untuk groupby
-        unique_keys = ['Material ID', 'Time Interval']
-        if 'Movement Type' in quantity_by_interval_merged.columns:
-            unique_keys.append('Movement Type')
-            
-        quantity_by_interval_unique = quantity_by_interval_merged.groupby(unique_keys).first().reset_index()
-
-        # 8. Konversi ke BOX
-        quantity_by_interval_unique[[ 'Min Total Quantity (BOX)', 'Max Total Quantity (BOX)', 'Average Total Quantity (BOX)']] = quantity_by_interval_unique.apply(
-            lambda row: pd.Series(convert_to_box_final(row)), axis=1
+        if result_df.empty:
+            return result_df
+        return register_shared(f"store:{','.join(months)}:{interval_grid}", apply_schema(result_df))
+
+    def quantile_settings(key_prefix):
+        """Pilihan kuantil total harian (P50/P90/P95, ...) dan mode eksak untuk validasi."""
+        quantiles = st.multiselect(
+            "Kuantil Total Harian:",
+            QUANTILE_OPTIONS,
+            default=list(DEFAULT_QUANTILES),
+            format_func=quantile_label,
+            key=f'{key_prefix}_quantiles',
+            help="Lebih stabil terhadap outlier dibanding Min/Max. Dihitung dengan sketch t-digest yang bisa digabung per bulan."
         )
-        
-        # Pembersihan akhir
-        quantity_by_interval_unique['Material ID'] = quantity_by_interval_unique['Material ID'].astype('Int64')
-        result_df = quantity_by_interval_unique.sort_values(by='Average Total Quantity (BOX)', ascending=False).round(2)
-        
-        st.success("Pemrosesan data selesai!")
-        return result_df
+        exact_mode = st.checkbox(
+            "Kuantil eksak (validasi)",
+            key=f'{key_prefix}_exact_quantiles',
+            help="Menghitung kuantil dari seluruh deret harian. Lebih lambat dan boros memori; untuk membandingkan hasil sketch."
+        )
+        return tuple(sorted(quantiles)), exact_mode
+
+    @st.cache_resource(max_entries=4)
+    def get_search_index(_df, dataset_key):
+        """Indeks pencarian Material ID/Desc, dibangun sekali per dataset (`dataset_key`)."""
+        return SearchIndex(_df, 'Material ID', ['Material Desc'])
+
+    @st.cache_resource(max_entries=4)
+    def get_table_view(_df, dataset_key):
+        """Urutan sort (Average Total Quantity, Material ID) dan ringkasan tabel hasil, sekali per dataset (`dataset_key`)."""
+        return TableView(_df, sort_columns=['Average Total Quantity (BOX)', 'Material ID'], unique_column='Material ID')
 
     # --- Pilihan Unggah (Dipindahkan ke Menu Utama) ---
     st.header("⬆️ Unggah Data")
@@ -174,12 +205,15 @@ def show_retail1_content():
                 "1. Mode Unggah:",
                 (
                     'Pilihan Dataset (Oktober 2025)',
+                    'Dataset Store (Multi Bulan)',
                     'Unggah File Mentah (ZRW70)'
                 ),
                 key='upload_mode'
             )
         
         df_final = pd.DataFrame()
+        dataset_key = None
+        quantiles = ()
         
         # --- LOGIKA UNGGAH FILE MENTAH (ZRW70) ---
         if upload_option == 'Unggah File Mentah (ZRW70)': 
@@ -188,33 +222,104 @@ def show_retail1_content():
                     "2. Unggah File Excel Data (ZRW70)", 
                     type=['xlsx']
                 )
+                stream_mode = st.checkbox(
+                    "Mode streaming (hemat memori)",
+                    value=True,
+                    help="Membaca file per potongan baris. Disarankan untuk file ekspor beberapa bulan."
+                )
+                interval_grid = st.selectbox(
+                    "Grid Interval Waktu:",
+                    list(INTERVAL_GRID_OPTIONS.keys()),
+                    format_func=lambda key: INTERVAL_GRID_OPTIONS[key],
+                    help="Pembagian jam Created Time menjadi interval."
+                )
+                save_to_store = st.checkbox(
+                    "Simpan ke dataset store",
+                    value=False,
+                    help="Total harian per jam disimpan per bulan, agar bisa dianalisis lintas bulan tanpa unggah ulang."
+                )
+                quantiles, exact_quantiles_mode = quantile_settings('raw')
 
             df_uom = load_uom_data(UOM_DATA_FILE) 
             
             if uploaded_file_data and not df_uom.empty:
                 try:
-                    df = pd.read_excel(uploaded_file_data)
                     with col_file2:
                         st.success(f"File UoM (**{UOM_DATA_FILE}**) berhasil dimuat dari data statis.")
-                    df_final = process_raw_data(df, df_uom)
+                    file_key = upload_fingerprint(uploaded_file_data)
+                    df_final = process_upload(
+                        uploaded_file_data, file_key, df_uom, df_uom.version, interval_grid, stream_mode,
+                        quantiles, exact_quantiles_mode
+                    )
+                    if save_to_store:
+                        save_upload_to_store(uploaded_file_data, file_key, stream_mode)
+                    if df_final.empty:
+                        st.warning("Tidak ada data ditemukan untuk 'Storage Type Suggestion' = 'ZYY'.")
+                    dataset_key = (file_key, df_uom.version, interval_grid, stream_mode, quantiles, exact_quantiles_mode)
                 except Exception as e:
                     st.error(f"Terjadi kesalahan saat membaca atau memproses file mentah: {e}")
             elif uploaded_file_data and df_uom.empty:
                  st.warning(f"File UoM ({UOM_DATA_FILE}) tidak dapat dimuat. Unggah data mentah dibatalkan.")
 
+        # --- LOGIKA DATASET STORE (PARTISI PER BULAN) ---
+        elif upload_option == 'Dataset Store (Multi Bulan)':
+            available_months = dataset_store.list_months()
+            if not available_months:
+                with col_file1:
+                    st.info("Dataset store masih kosong. Unggah file mentah ZRW70 dengan opsi **Simpan ke dataset store**.")
+            else:
+                with col_file1:
+                    selected_months = st.multiselect(
+                        "2. Pilih Bulan:",
+                        available_months,
+                        default=available_months[-1:],
+                        help="Hanya partisi bulan yang dipilih yang dibaca."
+                    )
+                    interval_grid = st.selectbox(
+                        "Grid Interval Waktu:",
+                        list(INTERVAL_GRID_OPTIONS.keys()),
+                        format_func=lambda key: INTERVAL_GRID_OPTIONS[key],
+                        key='store_interval_grid'
+                    )
+                    quantiles, exact_quantiles_mode = quantile_settings('store')
+                with col_file2:
+                    use_date_range = st.checkbox("Batasi rentang tanggal")
+                    start_date = end_date = None
+                    if use_date_range and selected_months:
+                        date_range = st.date_input(
+                            "Rentang Tanggal:",
+                            value=(
+                                pd.Period(min(selected_months)).start_time.date(),
+                                pd.Period(max(selected_months)).end_time.date()
+                            )
+                        )
+                        if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+                            start_date, end_date = date_range
+
+                df_uom = load_uom_data(UOM_DATA_FILE)
+                if selected_months and not df_uom.empty:
+                    version = dataset_store.store_version()
+                    df_final = load_store_data(
+                        tuple(selected_months), start_date, end_date, df_uom, df_uom.version, interval_grid, version, quantiles, exact_quantiles_mode
+                    )
+                    dataset_key = ('store', tuple(selected_months), start_date, end_date, interval_grid, version, quantiles, exact_quantiles_mode)
+                    with col_file1:
+                        if df_final.empty:
+                            st.warning("Tidak ada data pada bulan/rentang tanggal yang dipilih.")
+                        else:
+                            st.success(f"Dataset store **{', '.join(selected_months)}** berhasil dimuat! ({len(df_final)} baris)")
+
         # --- LOGIKA PILIHAN DATASET (HASIL PROSES) ---
         elif upload_option == 'Pilihan Dataset (Oktober 2025)':
 
-            df_final = load_processed_data(PROCESSED_DATA_FILE)
+            # Sidik jari file yang benar-benar dibaca (CSV kembaran jika dipakai, selain itu XLSX)
+            source_path = static_source_path(PROCESSED_DATA_FILE, PROCESSED_DATA_COLUMNS, use_csv_twin=True)
+            source_key = file_fingerprint(source_path) if os.path.exists(source_path) else None
+            df_final = load_processed_data(PROCESSED_DATA_FILE, source_key)
+            if not df_final.empty:
+                dataset_key = (file_fingerprint(PROCESSED_DATA_FILE), source_key)
             
             if not df_final.empty:
-                # Perlu memastikan 'Movement Type' ada jika Anda menggunakan dataset statis
-                # Jika dataset statis tidak memiliki kolom 'Movement Type', filter tidak akan muncul.
-                if 'Movement Type' not in df_final.columns:
-                    # Tambahkan kolom dummy jika tidak ada, agar filter tidak error jika digunakan
-                    df_final['Movement Type'] = '999' # Nilai dummy
-                    
-                st.session_state.df_final = df_final.copy()
                 with col_file1:
                     st.success(f"Dataset **Oktober 2025** berhasil dimuat! ({len(df_final)} baris)")
 
@@ -224,18 +329,22 @@ def show_retail1_content():
     if not df_final.empty:
         
         st.header("📊 Replenishment Planning")
+        if 'memory_mb' in df_final.attrs:
+            memory_before, memory_after = df_final.attrs['memory_mb']
+            st.caption(f"Memori data: {memory_before:.1f} MB → {memory_after:.1f} MB setelah skema ringkas.")
         st.markdown("---")
 
         # --- Aplikasikan Filter ---
-        df_display = df_final.copy()
+        # df_final dipakai bersama semua sesi: filter hanya membentuk mask baris, bukan salinan data
+        row_mask = np.ones(len(df_final), dtype=bool)
 
         # Kolom untuk menempatkan Filter di atas tabel
         col_interval, col_movement = st.columns(2)
-        col_material, col_empty = st.columns(2) # Tambah baris baru untuk filter material
+        col_material, col_search_mode = st.columns(2) # Tambah baris baru untuk filter material
 
         with col_interval:
             # 1. Filter Interval Waktu (Multiple Select) - Tanpa Default
-            unique_intervals = sorted(df_final['Time Interval'].unique())
+            unique_intervals = category_options(df_final['Time Interval'])
             selected_intervals = st.multiselect(
                 "1. Filter berdasarkan **Interval Waktu**:",
                 unique_intervals,
@@ -247,12 +356,8 @@ def show_retail1_content():
             # 2. Filter Movement Type (Multiple Select)
             if 'Movement Type' in df_final.columns:
                 
-                # --- PERBAIKAN: Konversi ke String dan isi NaN/None ---
-                # Mengubah semua tipe data ke string, dan mengisi NaN/None dengan 'N/A' sebelum mengambil nilai unik
-                movement_series = df_final['Movement Type'].astype(str).replace({'nan': 'N/A', 'None': 'N/A'})
-                
-                unique_movement_types = sorted(movement_series.unique()) 
-                # --- AKHIR PERBAIKAN ---
+                # Nilai kosong sudah menjadi kategori 'N/A' di skema (lihat schema.apply_schema)
+                unique_movement_types = category_options(df_final['Movement Type'])
 
                 selected_movement_types = st.multiselect(
                     "2. Filter berdasarkan **Movement Type**:",
@@ -261,10 +366,6 @@ def show_retail1_content():
                     help="Pilih satu atau lebih jenis Movement Type."
                 )
                 
-                # Filter harus menggunakan nilai yang sudah dikonversi ke string
-                if selected_movement_types:
-                    df_display = df_display[movement_series.isin(selected_movement_types)]
-                    
             else:
                 selected_movement_types = None
                 st.info("Kolom 'Movement Type' tidak ada dalam dataset ini.")
@@ -277,32 +378,37 @@ def show_retail1_content():
                 help="Masukkan ID atau Deskripsi, pisahkan dengan spasi (contoh: 10105 BOX KARTON GANTUNGAN)"
             )
 
+        with col_search_mode:
+            search_logic = st.radio(
+                "Logika pencarian:",
+                ('Salah satu kata (OR)', 'Semua kata (AND)'),
+                horizontal=True
+            )
+            id_prefix = st.checkbox(
+                "Material ID diawali kata kunci (prefix)",
+                help="Jika aktif, Material ID dicocokkan dari awal, bukan di posisi mana saja."
+            )
+
         
         # Filter 1: Interval Waktu
         # Hanya filter jika ada interval yang dipilih
         if selected_intervals:
-            df_display = df_display[df_display['Time Interval'].isin(selected_intervals)]
+            row_mask &= category_mask(df_final['Time Interval'], selected_intervals)
             
-        # Filter 2: Movement Type
-        if selected_movement_types and 'Movement Type' in df_display.columns:
-            df_display = df_display[df_display['Movement Type'].isin(selected_movement_types)]
+        # Filter 2: Movement Type (pada kode kategori)
+        if selected_movement_types and 'Movement Type' in df_final.columns:
+            row_mask &= category_mask(df_final['Movement Type'], selected_movement_types)
         
         # Filter 3: Material ID/Description (Multiple Search - DIPISAH SPASI)
         if search_materials_raw:
             # Pisahkan input berdasarkan SPASI dan hilangkan string kosong
-            search_terms = [term.strip().lower() for term in search_materials_raw.split() if term.strip()]
-            
-            # Buat mask pencarian (OR logic)
-            search_mask = pd.Series(False, index=df_display.index)
+            search_terms = split_terms(search_materials_raw)
             
             if search_terms:
-                for term in search_terms:
-                    # Mencari di kolom Material ID (setelah diubah jadi string) ATAU Material Desc
-                    current_mask = (df_display['Material ID'].astype(str).str.contains(term, case=False, na=False)) | \
-                                   (df_display['Material Desc'].astype(str).str.contains(term, case=False, na=False))
-                    search_mask = search_mask | current_mask
-                
-                df_display = df_display[search_mask]
+                # Mencari di Material ID ATAU Material Desc lewat indeks (dibangun sekali per dataset)
+                search_index = get_search_index(df_final, dataset_key)
+                row_mask &= search_index.search(search_terms, match_all=search_logic == 'Semua kata (AND)', id_prefix=id_prefix)
+
         
         # --- Tampilan DataFrame Hasil ---
         
@@ -320,40 +426,60 @@ def show_retail1_content():
             'Min Total Quantity (BOX)', 
             'Max Total Quantity (BOX)',
         ]
+        # Kolom kuantil yang dipilih (mis. 'P90 Total Quantity (BOX)'), dengan nama yang sama seperti di finalize_interval_stats
+        cols_to_display += list(zrw70_processing.quantile_columns(quantiles).values())
         
         # Filter kolom yang benar-benar ada di DataFrame untuk menghindari error
-        cols_to_display = [col for col in cols_to_display if col in df_display.columns]
-
-        st.dataframe(df_display[cols_to_display], use_container_width=True)
+        cols_to_display = [col for col in cols_to_display if col in df_final.columns]
+
+        # Sort dan pemotongan halaman di server; hanya halaman aktif yang dikirim ke browser
+        table_view = get_table_view(df_final, dataset_key)
+        filter_key = (dataset_key, tuple(selected_intervals), tuple(selected_movement_types or ()), search_materials_raw, search_logic, id_prefix)
+        show_paginated_table(
+            table_view, cols_to_display, key='retail1_table', mask=row_mask, filter_key=filter_key,
+            use_container_width=True,
+            # Kuantitas disimpan float32; tampilkan 2 desimal seperti hasil proses
+            column_config={col: st.column_config.NumberColumn(format="%.2f") for col in cols_to_display if 'Quantity' in col}
+        )
 
-        
-        st.info(f"**Total Baris Hasil (Setelah Filter):** {len(df_display)} | **Material ID Ditampilkan:** {df_display['Material ID'].nunique()}")
+        n_rows, n_materials = table_view.summary(row_mask, filter_key)
+        st.info(f"**Total Baris Hasil (Setelah Filter):** {n_rows} | **Material ID Ditampilkan:** {n_materials}")
 
         # --- Download Hasil Proses ---
         st.subheader("Unduh Hasil Proses")
 
-        @st.cache_data
-        def convert_df_to_excel(df):
-            """Konversi DataFrame ke format Excel dalam memori (BytesIO)."""
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='ReplenishmentData')
-            processed_data = output.getvalue()
-            return processed_data
-
-        excel_data = convert_df_to_excel(df_final)
+        col_format, col_sheet = st.columns(2)
+        with col_format:
+            export_format = st.selectbox(
+                "Format file:",
+                available_formats(),
+                format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                key='retail1_export_format'
+            )
+        with col_sheet:
+            sheet_by = st.selectbox(
+                "Pisah sheet per (khusus Excel):",
+                ['Tidak dipisah', 'Time Interval', 'Movement Type'],
+                disabled=export_format != 'xlsx',
+                key='retail1_export_sheet_by'
+            )
+        sheet_by = None if export_format != 'xlsx' or sheet_by == 'Tidak dipisah' else sheet_by
 
+        _, extension, mime = EXPORT_FORMATS[export_format]
         st.download_button(
-            label="📥 Unduh Data Hasil Proses Lengkap (Excel)",
-            data=excel_data,
-            file_name='Analisis_Material_Interval_ZYY_Hasil_Lengkap.xlsx',
-            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            help="Data hasil lengkap (sebelum difilter) termasuk Material Desc dalam format Excel (.xlsx)."
+            label=f"📥 Unduh Data Hasil Proses Lengkap ({export_format.upper()})",
+            # File baru dibuat saat tombol diklik, ditulis bertahap per potongan baris
+            data=lambda: export_bytes(df_final, export_format, sheet_by=sheet_by, sheet_name='ReplenishmentData'),
+            file_name='Analisis_Material_Interval_ZYY_Hasil_Lengkap' + extension,
+            mime=mime,
+            on_click='ignore',
+            help="Data hasil lengkap (sebelum difilter) termasuk Material Desc."
         )
 
     else:
         st.info("👆 Silakan pilih mode unggah dan masukkan file di bagian **Unggah Data** di atas.")
 
-# Panggil fungsi utama
-show_retail1_content()
+# Panggil fungsi utama saat dijalankan langsung (streamlit run retail.py)
+if __name__ == "__main__":
+    show_retail1_content()
 
@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from io import BytesIO
+import replenishment
+from search_index import SearchIndex
+from table_view import TableView, show_paginated_table
+from export import EXPORT_FORMATS, available_formats, export_bytes
+from profiling import register_shared
+from stage_cache import get_stage_cache, upload_fingerprint
+from xlsx_ingest import run_in_background, streamlit_progress
 
 def show_retail2_content():
     # Definisi Jalur File UoM Manual
@@ -10,64 +16,84 @@ def show_retail2_content():
 
     ## 🎯 Fungsi Utama Pemrosesan Data
 
-    @st.cache_data
     def load_and_process_main_data(uploaded_file):
         """Memuat dan memproses data utama dari file Excel."""
         if uploaded_file is None:
             return None
+        # Dibaca di thread latar; progress bar menampilkan baris terbaca dan baris/detik
+        on_update, clear_progress = streamlit_progress("Membaca Stock Analysis")
         try:
-            new_column_names = [
-                'Product Name', 'Material ID', 'Movement Category Retail', 'Min-Max Recommendation Assessment',
-                'Avg Picking (Month-1) in Box', 'Avg Last 14 Days in Box', 'Avg Last 3 Days in Box',
-                'Stock in Box', 'Xdays'
-            ]
-            df = pd.read_excel(uploaded_file, skiprows=3, names=new_column_names)
-            quantity_cols = [col for col in new_column_names if 'Box' in col]
-            for col in quantity_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            return df
+            return run_in_background(replenishment.load_stock_analysis, uploaded_file, on_update=on_update)
         except Exception as e:
             st.error(f"Error saat memuat atau memproses file data utama: {e}")
             return None
+        finally:
+            clear_progress()
 
-    @st.cache_data
     def load_uom_data_manual(file_path):
-        """Memuat dan memproses data UoM secara manual dari jalur file yang ditentukan."""
+        """Indeks UoM bersama (sama dengan tab Interval; dimuat ulang otomatis jika file berubah)."""
         try:
-            df_uom = pd.read_excel(file_path)
-            if 'Material' not in df_uom.columns or 'UOM(in BUn)' not in df_uom.columns:
-                st.error("File UoM tidak memiliki kolom 'Material' dan/atau 'UOM(in BUn)'.")
-                return None
-            df_uom_unique = df_uom.drop_duplicates(subset=['Material'], keep='first')
-            df_uom_unique['UOM(in BUn)'] = pd.to_numeric(df_uom_unique['UOM(in BUn)'], errors='coerce')
-            return df_uom_unique
+            return replenishment.load_uom_table(file_path)
         except FileNotFoundError:
             st.error(f"File UoM tidak ditemukan di folder: **{file_path}**. Mohon periksa jalurnya.")
             return None
+        except ValueError as e:
+            st.error(str(e))
+            return None
         except Exception as e:
             st.error(f"Error saat memuat file UoM: {e}")
             return None
 
-    def calculate_replenishment(df, chosen_avg_column, max_multiplier=1.5):
-        """Menghitung Min/Max Replenishment (dalam Box dan Pcs)."""
-        df['Min Replenishment'] = df[chosen_avg_column].fillna(0).round().astype(int)
-        df['Max Replenishment'] = (df[chosen_avg_column] * max_multiplier).fillna(0).round().astype(int)
+    def read_stock_analysis(uploaded_file, file_key):
+        """Frame Stock Analysis dari stage cache disk (dikunci sidik jari isi file), atau dibaca dari Excel.
+
+        Berjalan di luar fungsi `st.cache_resource` agar progress bar pembacaan tidak ikut di-cache.
+        """
+        return get_stage_cache().cached_frame(
+            'stock_analysis', file_key, {}, lambda: load_and_process_main_data(uploaded_file)
+        )
 
-        df['Min Replenishment (Pcs)'] = (df['Min Replenishment'] * df['Pcs per Box']).fillna(0).round().astype(int)
-        df['Max Replenishment (Pcs)'] = (df['Max Replenishment'] * df['Pcs per Box']).fillna(0).round().astype(int)
+    @st.cache_resource(max_entries=4)
+    def get_stock_data(_stock_df, _uom_index, dataset_key):
+        """Data stok + isi per box, satu salinan bersama untuk semua sesi per (isi file, versi UoM) (`dataset_key`).
 
-        return df
+        Frame ini tidak boleh diubah di tempat; hasil per sesi dibentuk lewat `ScenarioCube.result`.
+        Dipanggil dengan `_stock_df=None` hanya untuk mengambil hasil yang sudah di-cache:
+        LookupError jika belum ada (exception tidak ikut di-cache).
+        """
+        if _stock_df is None:
+            raise LookupError(dataset_key)
+        return register_shared(f"stock:{dataset_key[0]}", replenishment.attach_pcs_per_box(_stock_df, _uom_index))
 
-    @st.cache_data
-    def convert_df_to_excel(df):
-        """Mengubah DataFrame menjadi file Excel dalam format Bytes."""
-        output = BytesIO()
-        # Menggunakan engine openpyxl untuk format .xlsx
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Replenishment_Analysis')
-        
-        processed_data = output.getvalue()
-        return processed_data
+    def load_stock_data(uploaded_file, uom_index, dataset_key):
+        """Data stok bersama untuk `dataset_key`; file hanya dibaca jika frame belum ada di cache.
+
+        Sesi tidak menyimpan referensi frame, sehingga memori per sesi tidak ikut menghitung
+        data bersama dan frame yang dievict cache benar-benar dilepas.
+        """
+        try:
+            return get_stock_data(None, uom_index, dataset_key)
+        except LookupError:
+            pass
+        stock_df = read_stock_analysis(uploaded_file, dataset_key[0])
+        if stock_df is None:
+            return None
+        return get_stock_data(stock_df, uom_index, dataset_key)
+
+    @st.cache_resource(max_entries=4)
+    def get_search_index(_df, dataset_key):
+        """Indeks pencarian Material ID/Product Name, dibangun sekali per file unggahan (`dataset_key`)."""
+        return SearchIndex(_df, 'Material ID', ['Product Name'])
+
+    @st.cache_resource(max_entries=4)
+    def get_table_view(_df, dataset_key):
+        """Urutan sort (Material ID, kolom rata-rata bawaan) dan ringkasan tabel hasil, sekali per dataset (`dataset_key`)."""
+        return TableView(_df, sort_columns=['Material ID', replenishment.DEFAULT_AVG_COLUMN], unique_column='Material ID')
+
+    @st.cache_resource(max_entries=4)
+    def get_scenario_cube(_df, dataset_key):
+        """Cube Min/Max semua kolom rata-rata x pengali, dihitung sekali per file unggahan + versi UoM (`dataset_key`)."""
+        return replenishment.ScenarioCube(_df)
 
     ## 🚀 Streamlit App
     st.title("📦 Retail Replenishment Min Max Planning")
@@ -86,31 +112,22 @@ def show_retail2_content():
             st.stop()
 
     if uploaded_file and df_uom is not None:
-        df = load_and_process_main_data(uploaded_file)
+        # 1. Penggabungan Data (Merge) -- dilakukan sekali per file + versi UoM, dipakai bersama semua sesi
+        dataset_key = (upload_fingerprint(uploaded_file), df_uom.version)
+        try:
+            df = load_stock_data(uploaded_file, df_uom, dataset_key)
+        except Exception as e:
+            st.error(f"Gagal saat menggabungkan data UoM: {e}")
+            st.stop()
 
         if df is not None:
             st.success("Data Retail Warehouse Stock Analysis berhasil dimuat!")
 
-            # 1. Penggabungan Data (Merge)
-            try:
-                df = pd.merge(
-                    df,
-                    df_uom[['Material', 'UOM(in BUn)']],
-                    left_on='Material ID',
-                    right_on='Material',
-                    how='left'
-                )
-                df.rename(columns={'UOM(in BUn)': 'Pcs per Box'}, inplace=True)
-                df.drop(columns=['Material'], inplace=True)
-            except Exception as e:
-                st.error(f"Gagal saat menggabungkan data UoM: {e}")
-                st.stop()
-
             # --- (Pengaturan Kalkulasi) ---
             st.subheader("⚙️ Pengaturan Kalkulasi")
             
-            avg_cols = [col for col in df.columns if 'Avg' in col and 'Box' in col]
-            default_index = avg_cols.index('Avg Picking (Month-1) in Box') if 'Avg Picking (Month-1) in Box' in avg_cols else 0
+            avg_cols = replenishment.average_columns(df)
+            default_index = avg_cols.index(replenishment.DEFAULT_AVG_COLUMN) if replenishment.DEFAULT_AVG_COLUMN in avg_cols else 0
             
             col_calc, col_mult = st.columns(2)
             
@@ -130,8 +147,11 @@ def show_retail2_content():
                 )
 
             # 2. Kalkulasi Min/Max Replenishment
-            # Lakukan kalkulasi sekali dan simpan hasilnya
-            df_full_result = calculate_replenishment(df.copy(), chosen_avg_column, max_multiplier)
+            # Semua skenario dihitung sekali; slider dan pilihan kolom hanya mengambil irisan cube
+            scenario_cube = get_scenario_cube(df, dataset_key)
+
+            with st.expander("📊 Ringkasan Semua Skenario (What-If)"):
+                st.dataframe(scenario_cube.summary(), use_container_width=True, hide_index=True)
 
             # --- FITUR PENCARIAN BARU ---
             st.subheader("🔍 Filter Data Hasil")
@@ -140,16 +160,13 @@ def show_retail2_content():
                 placeholder="Masukkan ID Material atau Nama Produk",
             )
 
-            # Menerapkan Filter
-            df_filtered = df_full_result.copy()
-            if search_query:
-                # Menggunakan .str.contains() untuk pencarian fleksibel (case-insensitive)
-                # Material ID diubah ke string untuk pencarian yang konsisten
-                mask = (
-                    df_filtered['Material ID'].astype(str).str.contains(search_query, case=False, na=False) |
-                    df_filtered['Product Name'].str.contains(search_query, case=False, na=False)
-                )
-                df_filtered = df_filtered[mask]
+            # Menerapkan Filter: hanya mask baris; data bersama tidak disalin
+            row_mask = None
+            if search_query.strip():
+                # Pencarian substring (case-insensitive) lewat indeks yang sama dengan tab Interval;
+                # seluruh input dianggap satu frasa
+                search_index = get_search_index(df, dataset_key)
+                row_mask = search_index.search([search_query.strip()])
 
             # --- Hasil dan Download ---
             st.subheader("✅ Hasil Kalkulasi Replenishment")
@@ -162,24 +179,44 @@ def show_retail2_content():
                 'Min Replenishment (Pcs)', 'Max Replenishment (Pcs)'
             ]
 
-            # Menampilkan data yang SUDAH DIFILTER
-            st.dataframe(df_filtered[display_cols], use_container_width=True)
+            def result_rows(rows):
+                """Hasil skenario aktif hanya untuk posisi baris `rows` (kolom yang ditampilkan)."""
+                return scenario_cube.result(
+                    chosen_avg_column, max_multiplier, rows=rows,
+                    columns=['Product Name', 'Material ID', chosen_avg_column]
+                )[display_cols]
+
+            # Menampilkan data yang SUDAH DIFILTER, per halaman (sort di server).
+            # Min/Max Replenishment mengikuti urutan kolom rata-rata yang dipilih.
+            table_view = get_table_view(df, dataset_key)
+            view_rows = show_paginated_table(
+                table_view, display_cols, key='retail2_table', mask=row_mask,
+                filter_key=(dataset_key, search_query.strip()),
+                sort_options=['Material ID', 'Product Name', chosen_avg_column],
+                page_rows=result_rows, use_container_width=True
+            )
 
-            st.info(f"Ditampilkan **{len(df_filtered)}** dari total **{len(df_full_result)}** item.")
+            n_rows, _ = table_view.summary(row_mask, (dataset_key, search_query.strip()))
+            st.info(f"Ditampilkan **{n_rows}** dari total **{table_view.n_rows}** item.")
             
             # Tombol Download
-            df_to_download = df_filtered.copy() # Ambil data yang ditampilkan (filtered baris)
-
-            # HANYA AMBIL KOLOM YANG DITAMPILKAN SEBELUM KONVERSI KE EXCEL
-            df_to_download = df_to_download[display_cols] 
+            # HANYA AMBIL KOLOM YANG DITAMPILKAN (baris yang sudah difilter, urutan sesuai tabel)
 
-            excel_data = convert_df_to_excel(df_to_download)
+            export_format = st.selectbox(
+                "Format file:",
+                available_formats(),
+                format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                key='retail2_export_format'
+            )
+            _, extension, mime = EXPORT_FORMATS[export_format]
 
             st.download_button(
-                label="📥 Download Hasil Analisis (Excel XLSX)",
-                data=excel_data,
-                file_name='retail_stock_replenishment_filtered_analysis.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                label=f"📥 Download Hasil Analisis ({export_format.upper()})",
+                # File baru dibuat saat tombol diklik
+                data=lambda: export_bytes(result_rows(view_rows), export_format, sheet_name='Replenishment_Analysis'),
+                file_name='retail_stock_replenishment_filtered_analysis' + extension,
+                mime=mime,
+                on_click='ignore',
             )
 
         else:
@@ -189,6 +226,6 @@ def show_retail2_content():
         st.info("Silakan unggah file Data Retail Warehouse Stock Analysis.")
 
 
-# Panggil fungsi utama
-
-show_retail2_content()
+# Panggil fungsi utama saat dijalankan langsung (streamlit run retail2.py)
+if __name__ == "__main__":
+    show_retail2_content()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Label untuk nilai kosong pada kolom kategori (sama dengan filter Movement Type)
+MISSING_LABEL = 'N/A'
+
+# Skema data hasil proses interval: 'id' = integer ringkas, 'category' = kategori, 'float32' = kuantitas
+PROCESSED_SCHEMA = {
+    'Material ID': 'id',
+    'Material Desc': 'category',
+    'Movement Type': 'category',
+    'Time Interval': 'category',
+    'UOM': 'category',
+    'Min Total Quantity (BOX)': 'float32',
+    'Max Total Quantity (BOX)': 'float32',
+    'Average Total Quantity (BOX)': 'float32',
+}
+
+
+def frame_memory_mb(df):
+    """Memori DataFrame (termasuk isi string) dalam MB."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _to_category(series):
+    """Kategori berisi string terurut; nilai kosong menjadi MISSING_LABEL."""
+    values = series.astype(str).where(series.notna(), MISSING_LABEL)
+    return values.astype(pd.CategoricalDtype(sorted(values.unique())))
+
+
+def _to_compact_id(series):
+    """ID angka menjadi integer terkecil yang cukup; ID non-angka dibiarkan."""
+    numeric = pd.to_numeric(series, errors='coerce')
+    if numeric.isna().sum() != series.isna().sum() or (numeric.dropna() % 1 != 0).any():
+        return series
+    if numeric.isna().any():
+        return numeric.astype('Int64')
+    return pd.to_numeric(numeric.astype(np.int64), downcast='integer')
+
+
+def apply_schema(df, schema=PROCESSED_SCHEMA):
+    """Mengubah tipe kolom sesuai skema (kolom yang tidak ada dilewati).
+
+    Memori sebelum/sesudah (MB) disimpan di `df.attrs['memory_mb']`.
+    """
+    before = frame_memory_mb(df)
+    df = df.copy()
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        if kind == 'category':
+            df[col] = _to_category(df[col])
+        elif kind == 'float32':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+        elif kind == 'id':
+            df[col] = _to_compact_id(df[col])
+    df.attrs['memory_mb'] = (before, frame_memory_mb(df))
+    return df
+
+
+def category_options(series):
+    """Nilai unik terurut untuk pilihan filter (kategori yang benar-benar muncul)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.remove_unused_categories().cat.categories.tolist()
+    return sorted(series.astype(str).where(series.notna(), MISSING_LABEL).unique())
+
+
+def category_mask(series, selected):
+    """Mask `series.isin(selected)` yang dihitung pada kode kategori."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str).where(series.notna(), MISSING_LABEL).isin(selected).to_numpy()
+    codes = series.cat.categories.get_indexer(list(selected))
+    return np.isin(series.cat.codes.to_numpy(), codes[codes >= 0])
+
+
+def export_frame(df):
+    """Salinan untuk ekspor: kolom float32 dikembalikan ke float64 tanpa sisa pembulatan biner."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == np.float32]:
+        df[col] = df[col].astype(str).astype(np.float64)
+    return df
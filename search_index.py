@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Panjang n-gram untuk indeks substring
+NGRAM = 3
+
+
+class SearchIndex:
+    """Indeks pencarian teks (n-gram terbalik) untuk satu DataFrame, dibangun sekali per dataset.
+
+    Pencarian tetap bersifat substring tanpa membedakan huruf besar/kecil, sama seperti
+    `str.contains(term, case=False)`, tetapi hanya memeriksa nilai unik yang lolos
+    indeks n-gram. Hasil berupa mask boolean per baris (urutan posisi baris DataFrame).
+    """
+
+    def __init__(self, df, id_column, text_columns=()):
+        self.n_rows = len(df)
+        self.id_column = id_column
+        self.columns = [id_column, *text_columns]
+        self._codes = {}
+        self._uniques = {}
+        self._postings = {}
+        for col in self.columns:
+            values = df[col].astype(str).str.lower().where(df[col].notna(), '')
+            codes, uniques = pd.factorize(values)
+            self._codes[col] = codes
+            self._uniques[col] = np.asarray(uniques, dtype=object)
+            self._postings[col] = self._build_postings(self._uniques[col])
+
+        # Nilai ID unik terurut untuk pencarian awalan (prefix) dengan binary search
+        id_uniques = self._uniques[id_column]
+        self._id_order = np.argsort(id_uniques.astype(str), kind='stable')
+        self._id_sorted = id_uniques[self._id_order].astype(str)
+
+    @staticmethod
+    def _build_postings(uniques):
+        postings = {}
+        for value_id, value in enumerate(uniques):
+            for gram in {value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)}:
+                postings.setdefault(gram, []).append(value_id)
+        return {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def _contains(self, col, term):
+        """Mask nilai unik kolom `col` yang mengandung `term`."""
+        uniques = self._uniques[col]
+        matched = np.zeros(len(uniques), dtype=bool)
+        if len(term) < NGRAM:
+            candidates = np.arange(len(uniques))
+        else:
+            postings = self._postings[col]
+            grams = {term[i:i + NGRAM] for i in range(len(term) - NGRAM + 1)}
+            if any(gram not in postings for gram in grams):
+                return matched
+            lists = sorted((postings[gram] for gram in grams), key=len)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+                if not len(candidates):
+                    return matched
+        # Verifikasi kandidat (n-gram cocok belum tentu berurutan)
+        matched[candidates] = [term in uniques[i] for i in candidates]
+        return matched
+
+    def _prefix(self, term):
+        """Mask nilai unik ID yang diawali `term`."""
+        start = np.searchsorted(self._id_sorted, term, side='left')
+        stop = np.searchsorted(self._id_sorted, term + '\uffff', side='left')
+        matched = np.zeros(len(self._id_sorted), dtype=bool)
+        matched[self._id_order[start:stop]] = True
+        return matched
+
+    def match_term(self, term, id_prefix=False):
+        """Mask baris yang cocok dengan satu kata kunci di salah satu kolom."""
+        term = term.lower()
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for col in self.columns:
+            if col == self.id_column and id_prefix:
+                matched = self._prefix(term)
+            else:
+                matched = self._contains(col, term)
+            if matched.any():
+                mask |= matched[self._codes[col]]
+        return mask
+
+    def search(self, terms, match_all=False, id_prefix=False):
+        """Mask baris untuk beberapa kata kunci (OR, atau AND jika `match_all`)."""
+        terms = [term for term in terms if term]
+        if not terms:
+            return np.ones(self.n_rows, dtype=bool)
+        mask = self.match_term(terms[0], id_prefix)
+        for term in terms[1:]:
+            if match_all:
+                mask &= self.match_term(term, id_prefix)
+            else:
+                mask |= self.match_term(term, id_prefix)
+        return mask
+
+
+def split_terms(query):
+    """Memecah input pencarian menjadi kata kunci (dipisah spasi, huruf kecil)."""
+    return [term.strip().lower() for term in query.split() if term.strip()]
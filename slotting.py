@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+
+def make_slots(num_rows, num_cols):
+    """Daftar slot (row, column, jarak Manhattan dari (0, 0)), urut dari yang terdekat."""
+    rows, cols = np.divmod(np.arange(num_rows * num_cols), num_cols)
+    distance = rows + cols
+    order = np.argsort(distance, kind='stable')
+    return rows[order], cols[order], distance[order]
+
+
+def layout_objective(item_rows, item_cols, weights, co_occurrence=None, pair_weight=1.0):
+    """Perkiraan jarak picking sebuah layout.
+
+    sum(weight_i * jarak slot_i ke (0, 0)) + pair_weight * sum(co_ij * jarak slot_i ke slot_j)
+    untuk setiap pasangan i < j.
+    """
+    item_rows = np.asarray(item_rows)
+    item_cols = np.asarray(item_cols)
+    objective = float(np.sum(np.asarray(weights, dtype=float) * (item_rows + item_cols)))
+    if co_occurrence is not None and pair_weight:
+        coo = sparse.triu(co_occurrence, k=1).tocoo()
+        pair_distance = np.abs(item_rows[coo.row] - item_rows[coo.col]) + np.abs(item_cols[coo.row] - item_cols[coo.col])
+        objective += pair_weight * float(np.sum(coo.data * pair_distance))
+    return objective
+
+
+def greedy_slotting(weights, num_rows, num_cols):
+    """Bobot terbesar mendapat slot terdekat (urutan input menjadi pemecah seri)."""
+    slot_rows, slot_cols, _ = make_slots(num_rows, num_cols)
+    priority = np.argsort(-np.asarray(weights, dtype=float), kind='stable')
+    item_slot = np.empty(len(priority), dtype=np.int64)
+    item_slot[priority] = np.arange(len(priority))
+    return slot_rows[item_slot].copy(), slot_cols[item_slot].copy()
+
+
+def _top_neighbours(co_occurrence, n_items, k):
+    neighbours = []
+    for i in range(n_items):
+        start, end = co_occurrence.indptr[i], co_occurrence.indptr[i + 1]
+        idx = co_occurrence.indices[start:end]
+        vals = co_occurrence.data[start:end]
+        neighbours.append(idx[np.argsort(-vals, kind='stable')[:k]])
+    return neighbours
+
+
+def optimize_slotting(weights, num_rows, num_cols, co_occurrence=None, pair_weight=1.0,
+                      neighbours=5, max_passes=20, time_limit=5.0):
+    """Menempatkan item ke slot untuk meminimalkan `layout_objective`.
+
+    Tahap 1: item dengan bobot (First Pick Frequency) terbesar mendapat slot
+    terdekat. Untuk suku linear saja ini sudah optimal, dan sama dengan
+    penempatan greedy lama jika item dikirim dalam urutan prioritas.
+    Tahap 2: local search dengan menukar item (atau slot kosong) di sekitar
+    tetangga co-occurrence-nya, sehingga pasangan yang sering diambil bersama
+    saling mendekat. Berhenti jika tidak ada perbaikan, `max_passes` tercapai,
+    atau melewati `time_limit` detik.
+
+    Mengembalikan (slot_rows, slot_cols, stats) per item sesuai urutan `weights`.
+    """
+    start_time = time.perf_counter()
+    weights = np.asarray(weights, dtype=float)
+    n_items = len(weights)
+    n_slots = num_rows * num_cols
+    if n_items > n_slots:
+        raise ValueError(f"Jumlah item ({n_items}) melebihi jumlah slot ({n_slots}).")
+
+    # Tahap 1: bobot terbesar -> slot terdekat
+    pos_r, pos_c = greedy_slotting(weights, num_rows, num_cols)
+    priority = np.argsort(-weights, kind='stable')
+
+    stats = {'n_items': n_items, 'n_slots': n_slots, 'swaps': 0, 'passes': 0}
+    if co_occurrence is not None:
+        co_occurrence = sparse.csr_matrix(co_occurrence, dtype=float)
+    stats['greedy_objective'] = layout_objective(pos_r, pos_c, weights, co_occurrence, pair_weight)
+
+    if co_occurrence is not None and pair_weight and co_occurrence.nnz and n_items > 1:
+        # Grid isi slot: indeks item, atau -1 untuk slot kosong
+        grid = np.full((num_rows, num_cols), -1, dtype=np.int64)
+        grid[pos_r, pos_c] = np.arange(n_items)
+        indptr, indices, data = co_occurrence.indptr, co_occurrence.indices, co_occurrence.data
+        top = _top_neighbours(co_occurrence, n_items, neighbours)
+
+        def item_cost(item, r, c, exclude):
+            lo, hi = indptr[item], indptr[item + 1]
+            # Pasangan dengan item yang ditukar tidak berubah jaraknya, jadi dikecualikan
+            keep = indices[lo:hi] != exclude
+            idx = indices[lo:hi][keep]
+            dist = np.abs(r - pos_r[idx]) + np.abs(c - pos_c[idx])
+            return weights[item] * (r + c) + pair_weight * np.sum(data[lo:hi][keep] * dist)
+
+        def swap_delta(a, b, rb, cb):
+            ra, ca = pos_r[a], pos_c[a]
+            old = item_cost(a, ra, ca, b)
+            new = item_cost(a, rb, cb, b)
+            if b >= 0:
+                old += item_cost(b, rb, cb, a)
+                new += item_cost(b, ra, ca, a)
+            return new - old
+
+        steps = ((0, 1), (0, -1), (1, 0), (-1, 0))
+        while stats['passes'] < max_passes and time.perf_counter() - start_time < time_limit:
+            stats['passes'] += 1
+            improved = False
+            for a in priority:
+                targets = set()
+                for k in top[a]:
+                    for dr, dc in steps:
+                        r, c = pos_r[k] + dr, pos_c[k] + dc
+                        if 0 <= r < num_rows and 0 <= c < num_cols:
+                            targets.add((r, c))
+                for r, c in targets:
+                    b = grid[r, c]
+                    if b == a:
+                        continue
+                    if swap_delta(a, b, r, c) < -1e-9:
+                        ra, ca = pos_r[a], pos_c[a]
+                        grid[ra, ca], grid[r, c] = b, a
+                        pos_r[a], pos_c[a] = r, c
+                        if b >= 0:
+                            pos_r[b], pos_c[b] = ra, ca
+                        stats['swaps'] += 1
+                        improved = True
+                        break
+            if not improved:
+                break
+
+    stats['objective'] = layout_objective(pos_r, pos_c, weights, co_occurrence, pair_weight)
+    stats['runtime_s'] = round(time.perf_counter() - start_time, 4)
+    return pos_r, pos_c, stats
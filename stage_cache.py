@@ -0,0 +1,259 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from data_cache import CACHE_DIR, _has_pyarrow
+
+# Folder cache hasil stage pipeline (bertahan setelah restart/redeploy)
+STAGE_CACHE_DIR = os.path.join(CACHE_DIR, 'stages')
+# Batas ukuran total cache (MB); entri yang paling lama tidak dipakai dihapus lebih dulu
+STAGE_CACHE_MAX_MB = float(os.environ.get('SDR_STAGE_CACHE_MB', 1024))
+# Ukuran potongan saat menghitung sidik jari isi file
+_HASH_BLOCK = 1 << 20
+
+
+def content_fingerprint(source):
+    """Sidik jari isi file (blake2b 128-bit atas seluruh byte + ukuran).
+
+    `source` berupa path atau objek file (mis. UploadedFile Streamlit); posisi baca
+    objek file dikembalikan ke awal. File yang sama menghasilkan kunci yang sama
+    walaupun diunggah ulang dengan nama lain atau setelah server di-restart.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        if handle is source:
+            handle.seek(0)
+        for block in iter(lambda: handle.read(_HASH_BLOCK), b''):
+            digest.update(block)
+            size += len(block)
+    finally:
+        if handle is source:
+            handle.seek(0)
+        else:
+            handle.close()
+    return f"{digest.hexdigest()}-{size}"
+
+
+# Sidik jari per file_id unggahan (hanya yang terbaru disimpan)
+MAX_UPLOAD_FINGERPRINTS = 64
+_upload_fingerprints = {}
+
+
+def upload_fingerprint(uploaded_file):
+    """Sidik jari isi untuk UploadedFile, dihitung sekali per unggahan (`file_id`)."""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return content_fingerprint(uploaded_file)
+    fingerprint = _upload_fingerprints.get(file_id)
+    if fingerprint is None:
+        fingerprint = content_fingerprint(uploaded_file)
+        if len(_upload_fingerprints) >= MAX_UPLOAD_FINGERPRINTS:
+            _upload_fingerprints.pop(next(iter(_upload_fingerprints)))
+        _upload_fingerprints[file_id] = fingerprint
+    return fingerprint
+
+
+def stage_key(stage_name, fingerprint, params=None):
+    """Kunci entri: nama stage + sidik jari input + parameter stage (urutan parameter tidak berpengaruh)."""
+    raw = json.dumps({'stage': stage_name, 'input': fingerprint, 'params': params or {}}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    """Cache hasil stage di disk: satu file kolumnar (Parquet, atau pickle tanpa pyarrow) per frame.
+
+    Setiap entri terdiri dari `<kunci>.json` (nama frame, metadata kecil, stage, parameter)
+    dan `<kunci>.<frame>.<ext>`. Waktu akses dicatat lewat mtime file JSON; jika total
+    ukuran melebihi `max_mb`, entri yang paling lama tidak dipakai dihapus. Statistik
+    hit/miss dihitung per proses. Ukuran total dan jumlah entri dihitung dari folder
+    sekali, lalu diperbarui setiap penulisan/eviction (tulisan proses lain baru terlihat
+    saat eviction berikutnya memindai ulang folder).
+    """
+
+    def __init__(self, directory=STAGE_CACHE_DIR, max_mb=STAGE_CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 ** 2
+        self.ext = 'parquet' if _has_pyarrow() else 'pkl'
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        # (jumlah entri, total byte) di disk; None = belum dipindai
+        self._totals = None
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _paths(self, key):
+        """File JSON entri dan semua file frame-nya."""
+        return os.path.join(self.directory, f"{key}.json"), glob.glob(os.path.join(self.directory, f"{key}.*.{self.ext}"))
+
+    def load(self, key):
+        """(frames, meta) untuk `key`, atau None jika tidak ada/rusak."""
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(meta_path, encoding='utf-8') as handle:
+                entry = json.load(handle)
+            frames = {}
+            for name in entry['frames']:
+                path = os.path.join(self.directory, f"{key}.{name}.{self.ext}")
+                frames[name] = pd.read_parquet(path) if self.ext == 'parquet' else pd.read_pickle(path)
+            os.utime(meta_path)
+        except Exception:
+            # Tidak ada, atau rusak (mis. penulisan terputus / dihapus saat eviction): anggap miss
+            self._count('misses')
+            return None
+        self._count('hits')
+        return frames, entry.get('meta', {})
+
+    def _disk_totals(self):
+        """(jumlah entri, total byte) cache di disk; folder dipindai hanya sekali."""
+        with self._lock:
+            totals = self._totals
+        if totals is None:
+            entries = self._entries() if os.path.isdir(self.directory) else []
+            totals = (len(entries), sum(size for _, size, _ in entries))
+            with self._lock:
+                if self._totals is None:
+                    self._totals = totals
+                totals = self._totals
+        return totals
+
+    def _entry_size(self, key):
+        """Ukuran byte entri `key` di disk (0 jika tidak ada)."""
+        meta_path, frame_paths = self._paths(key)
+        size = 0
+        for path in [meta_path, *frame_paths]:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def store(self, key, frames, meta=None, stage_name=None, params=None):
+        """Menyimpan frame (dict nama -> DataFrame) + metadata JSON; dilewati jika frame tidak bisa ditulis."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Folder dipindai sebelum menulis agar entri baru tidak terhitung dua kali
+        self._disk_totals()
+        old_size = self._entry_size(key)
+        written = []
+        try:
+            for name, frame in frames.items():
+                path = os.path.join(self.directory, f"{key}.{name}.{self.ext}")
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    # Index non-default (mis. tabel anotasi per Material Group 2) ikut disimpan
+                    if self.ext == 'parquet':
+                        frame.to_parquet(tmp_path)
+                    else:
+                        frame.to_pickle(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                written.append(path)
+            entry = {'stage': stage_name, 'params': params, 'frames': list(frames), 'meta': meta or {},
+                     'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            meta_path = os.path.join(self.directory, f"{key}.json")
+            tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(entry, handle, default=str)
+            os.replace(tmp_path, meta_path)
+        except Exception:
+            # Kolom dengan tipe campuran tidak bisa disimpan; lewati cache saja
+            for path in written:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return False
+        self._count('writes')
+        new_size = self._entry_size(key)
+        with self._lock:
+            n_entries, total = self._totals
+            self._totals = (n_entries + (0 if old_size else 1), total + new_size - old_size)
+            over_limit = self._totals[1] > self.max_bytes
+        if over_limit:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """[(mtime akses, ukuran byte, file)] per entri."""
+        entries = []
+        for meta_path in glob.glob(os.path.join(self.directory, '*.json')):
+            key = os.path.basename(meta_path)[:-len('.json')]
+            _, frame_paths = self._paths(key)
+            files = [meta_path, *frame_paths]
+            try:
+                entries.append((os.path.getmtime(meta_path), sum(os.path.getsize(path) for path in files), files))
+            except OSError:
+                continue
+        return entries
+
+    def evict(self):
+        """Menghapus entri yang paling lama tidak dipakai sampai total ukuran di bawah batas."""
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        n_entries = len(entries)
+        for _, size, files in entries:
+            if total <= self.max_bytes:
+                break
+            for path in files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            n_entries -= 1
+            self._count('evictions')
+        with self._lock:
+            self._totals = (n_entries, total)
+
+    def stats(self):
+        """Statistik hit/miss proses ini + jumlah entri dan ukuran cache di disk (tanpa memindai folder)."""
+        n_entries, total = self._disk_totals()
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+        stats['entries'] = n_entries
+        stats['size_mb'] = total / 1024 ** 2
+        return stats
+
+    def cached_frames(self, stage_name, fingerprint, params, compute):
+        """Hasil stage dari cache, atau `compute()` -> (frames, meta) yang lalu disimpan."""
+        key = stage_key(stage_name, fingerprint, params)
+        cached = self.load(key)
+        if cached is not None:
+            return cached
+        frames, meta = compute()
+        self.store(key, frames, meta, stage_name=stage_name, params=params)
+        return frames, meta
+
+    def cached_frame(self, stage_name, fingerprint, params, compute):
+        """Seperti `cached_frames` untuk stage yang menghasilkan satu DataFrame (None tidak disimpan)."""
+        key = stage_key(stage_name, fingerprint, params)
+        cached = self.load(key)
+        if cached is not None:
+            return cached[0]['result']
+        result = compute()
+        if result is not None:
+            self.store(key, {'result': result}, stage_name=stage_name, params=params)
+        return result
+
+
+_default_cache = None
+
+
+def get_stage_cache():
+    """Cache stage bersama untuk proses ini (folder dan batas ukuran dari environment)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = StageCache()
+    return _default_cache
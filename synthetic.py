@@ -0,0 +1,196 @@
+"""Generator data ZRW70 sintetis (beserta master UoM dan Material Group) untuk uji skala.
+
+Contoh:
+    python synthetic.py --rows 100000 --out data_sintetis/
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from layout_pipeline import MASTER_COLUMNS, ZONES
+from replenishment import STOCK_ANALYSIS_COLUMNS
+
+# Ukuran baku untuk benchmark
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+STORAGE_TYPES = ('ZYY', *ZONES)
+MOVEMENT_TYPES = {'601': 0.7, '641': 0.2, '999': 0.1}
+# Bobot relatif jam pembuatan TO (puncak pagi dan sore, sedikit di luar jam kerja)
+HOUR_WEIGHTS = {
+    6: 1, 7: 4, 8: 8, 9: 10, 10: 9, 11: 7, 12: 4, 13: 6, 14: 8,
+    15: 9, 16: 8, 17: 6, 18: 4, 19: 3, 20: 2, 21: 1, 22: 1
+}
+DESC_WORDS = ('SUSU', 'BISKUIT', 'SABUN', 'SHAMPO', 'KOPI', 'TEH', 'MIE', 'MINYAK', 'GULA', 'BERAS',
+              'DETERJEN', 'PASTA', 'SIRUP', 'SNACK', 'AIR', 'KECAP', 'SAOS', 'TISU', 'POPOK', 'COKLAT')
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+
+def _rng(seed):
+    return np.random.default_rng(seed)
+
+
+def generate_materials(n_skus=2_000, n_groups=None, storage_types=STORAGE_TYPES, zyy_share=0.3, seed=0):
+    """Master material sintetis: ID, deskripsi, UoM, isi per box, Material Group 2, dan zona penyimpanan."""
+    rng = _rng(seed)
+    n_groups = n_groups or max(1, n_skus // 20)
+    material_ids = 1_000_000 + np.arange(n_skus)
+    first_word = rng.choice(DESC_WORDS, n_skus)
+    group = rng.integers(0, n_groups, n_skus)
+
+    # Sebagian SKU di ZYY (retail), sisanya tersebar di zona layout
+    zones = [st for st in storage_types if st != 'ZYY']
+    in_zyy = rng.random(n_skus) < (zyy_share if 'ZYY' in storage_types else 0.0)
+    storage = np.where(in_zyy, 'ZYY', rng.choice(zones, n_skus) if zones else 'ZYY')
+
+    return pd.DataFrame({
+        'Material ID': material_ids,
+        'Material Desc': [f"{word} {i:05d} {(i % 9 + 1) * 100}G" for i, word in enumerate(first_word)],
+        'UOM Actual': np.where(rng.random(n_skus) < 0.6, 'PCS', 'BOX'),
+        'Pcs per Box': rng.choice([1, 6, 12, 24, 48], n_skus),
+        'Material Group 2': [f"MG{g:04d}" for g in group],
+        'Product lvl 1-Category': [f"CAT{g % 5}" for g in group],
+        'Product lvl 2-Type': [f"TYPE{g % 17}" for g in group],
+        'Product lvl 3-Group': [f"GRP{g % 41}" for g in group],
+        'Storage Type Suggestion': storage,
+    })
+
+
+def generate_zrw70(n_rows, materials=None, n_documents=None, movement_types=MOVEMENT_TYPES,
+                   hour_weights=HOUR_WEIGHTS, start_date='2025-10-01', n_days=31, sku_skew=1.1,
+                   as_category=True, seed=0):
+    """Frame ZRW70 mentah sintetis dengan kolom yang dipakai aplikasi.
+
+    Popularitas SKU mengikuti distribusi Zipf (`sku_skew`), jam pembuatan mengikuti
+    `hour_weights`, dan setiap Reference Document berisi beberapa baris berurutan di
+    satu zona. Dengan `as_category`, kolom teks disimpan sebagai kategori agar 10 juta
+    baris tetap muat di memori.
+    """
+    rng = _rng(seed)
+    if materials is None:
+        materials = generate_materials(seed=seed)
+    n_documents = n_documents or max(1, n_rows // 8)
+
+    # Baris per dokumen (urut dokumen); jumlah baris tepat n_rows
+    doc_of_row = np.sort(rng.integers(0, n_documents, n_rows))
+    doc_codes, doc_of_row = np.unique(doc_of_row, return_inverse=True)
+    n_docs = len(doc_codes)
+
+    # Setiap dokumen dikerjakan di satu zona; SKU dipilih dari zona itu dengan bobot Zipf
+    storage = materials['Storage Type Suggestion'].to_numpy()
+    zone_names, zone_of_sku = np.unique(storage, return_inverse=True)
+    popularity = 1.0 / np.arange(1, len(materials) + 1) ** sku_skew
+    rng.shuffle(popularity)
+    zone_weight = np.bincount(zone_of_sku, weights=popularity)
+    doc_zone = rng.choice(len(zone_names), n_docs, p=zone_weight / zone_weight.sum())
+    row_zone = doc_zone[doc_of_row]
+
+    sku = np.empty(n_rows, dtype=np.int64)
+    for z in range(len(zone_names)):
+        rows = np.flatnonzero(row_zone == z)
+        if len(rows):
+            skus = np.flatnonzero(zone_of_sku == z)
+            p = popularity[skus] / popularity[skus].sum()
+            sku[rows] = rng.choice(skus, len(rows), p=p)
+
+    # Waktu: tanggal + jam per dokumen, baris di dalam dokumen berselang beberapa detik
+    hours = np.array(list(hour_weights))
+    hour_p = np.array(list(hour_weights.values()), dtype=float)
+    doc_day = rng.integers(0, n_days, n_docs)
+    doc_seconds = rng.choice(hours, n_docs, p=hour_p / hour_p.sum()) * 3600 + rng.integers(0, 3600, n_docs)
+    doc_start = np.r_[0, np.flatnonzero(np.diff(doc_of_row)) + 1]
+    offset = np.cumsum(rng.integers(5, 120, n_rows))
+    offset -= np.repeat(offset[doc_start], np.diff(np.r_[doc_start, n_rows]))
+    row_seconds = np.minimum(doc_seconds[doc_of_row] + offset, 86_399)
+
+    day_start = pd.Timestamp(start_date) + pd.to_timedelta(doc_day[doc_of_row], unit='D')
+    created_date = (day_start - EXCEL_EPOCH).days.to_numpy(dtype=float)
+    created_time = pd.Categorical.from_codes(row_seconds, [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86_400)])
+    confirm_time = day_start + pd.to_timedelta(row_seconds + rng.integers(60, 1800, n_rows), unit='s')
+
+    movement = list(movement_types)
+    movement_p = np.array(list(movement_types.values()), dtype=float)
+
+    df = pd.DataFrame({
+        'Reference Document': 4_000_000_000 + doc_codes[doc_of_row],
+        'TO Dummy': np.arange(1, n_rows + 1),
+        'Storage Type Suggestion': pd.Categorical(zone_names[row_zone]),
+        'Created Date': created_date,
+        'Created Time': created_time,
+        'Confirm 1 Time': confirm_time,
+        'Material ID': materials['Material ID'].to_numpy()[sku],
+        'Material Desc': pd.Categorical.from_codes(sku, materials['Material Desc']),
+        'Movement Type': pd.Categorical(rng.choice(movement, n_rows, p=movement_p / movement_p.sum())),
+        'TO Dummy Quantity': rng.geometric(0.3, n_rows) * np.where(materials['UOM Actual'].to_numpy()[sku] == 'PCS', 6, 1),
+        'UOM Actual': pd.Categorical(materials['UOM Actual'].to_numpy()[sku]),
+    })
+    if not as_category:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+    return df
+
+
+def uom_master(materials):
+    """Master UoM (format ZRW12) dari tabel material sintetis."""
+    return pd.DataFrame({'Material': materials['Material ID'].astype(float), 'UOM(in BUn)': materials['Pcs per Box'].astype(float)})
+
+
+def material_group_master(materials):
+    """Master Material Group (format 'Material Group.xlsx') dari tabel material sintetis."""
+    return materials[MASTER_COLUMNS].copy()
+
+
+def generate_stock_analysis(n_rows, materials=None, seed=0):
+    """Frame Retail Warehouse Stock Analysis sintetis (kolom seperti `load_stock_analysis`)."""
+    rng = _rng(seed)
+    if materials is None:
+        materials = generate_materials(seed=seed)
+    sku = rng.integers(0, len(materials), n_rows)
+    avg_month = rng.gamma(2.0, 5.0, n_rows)
+    return pd.DataFrame({
+        'Product Name': materials['Material Desc'].to_numpy()[sku],
+        'Material ID': materials['Material ID'].to_numpy()[sku],
+        'Movement Category Retail': rng.choice(['Fast', 'Medium', 'Slow'], n_rows),
+        'Min-Max Recommendation Assessment': rng.choice(['OK', 'Review'], n_rows),
+        'Avg Picking (Month-1) in Box': avg_month,
+        'Avg Last 14 Days in Box': avg_month * rng.uniform(0.5, 1.5, n_rows),
+        'Avg Last 3 Days in Box': avg_month * rng.uniform(0.3, 1.8, n_rows),
+        'Stock in Box': rng.integers(0, 200, n_rows).astype(float),
+        'Xdays': rng.integers(1, 30, n_rows),
+    })[STOCK_ANALYSIS_COLUMNS]
+
+
+def write_dataset(out_dir, n_rows, n_skus=2_000, seed=0):
+    """Menulis ZRW70 (CSV), master UoM dan Material Group (XLSX) sintetis ke `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    materials = generate_materials(n_skus, seed=seed)
+    paths = {
+        'zrw70': os.path.join(out_dir, f"zrw70_synthetic_{n_rows}.csv"),
+        'uom': os.path.join(out_dir, 'ZRW12-UoM.XLSX'),
+        'master': os.path.join(out_dir, 'Material Group.xlsx'),
+    }
+    generate_zrw70(n_rows, materials, as_category=False, seed=seed).to_csv(paths['zrw70'], index=False)
+    # Ekstensi '.XLSX' (huruf besar, seperti file asli) ditolak pandas jika ditulis lewat path
+    with open(paths['uom'], 'wb') as handle:
+        uom_master(materials).to_excel(handle, index=False, engine='openpyxl')
+    material_group_master(materials).to_excel(paths['master'], index=False)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membuat data ZRW70 sintetis beserta file master.")
+    parser.add_argument('--rows', type=int, default=SCALES['100k'])
+    parser.add_argument('--skus', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+    for name, path in write_dataset(args.out, args.rows, args.skus, args.seed).items():
+        print(f"[OK] {name} -> {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
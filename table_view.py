@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Pilihan jumlah baris per halaman tabel hasil
+PAGE_SIZES = (50, 100, 250, 500)
+DEFAULT_PAGE_SIZE = 100
+# Jumlah ringkasan filter (jumlah baris / nilai unik) yang disimpan per dataset
+MAX_CACHED_SUMMARIES = 32
+ORIGINAL_ORDER = 'Urutan asli'
+
+
+class TableView:
+    """Urutan sort dan ringkasan untuk satu DataFrame bersama, dihitung sekali per dataset.
+
+    Urutan per kolom disimpan sebagai permutasi posisi baris (nilai kosong di akhir), sehingga
+    hasil filter yang terurut cukup diambil dengan `order[mask[order]]` tanpa sort ulang.
+    Kolom di `sort_columns` dihitung di awal; kolom lain dihitung saat pertama dipakai.
+    """
+
+    def __init__(self, df, sort_columns=(), unique_column=None):
+        self.df = df
+        self.n_rows = len(df)
+        # Objek ini dipakai bersama semua sesi (st.cache_resource)
+        self._lock = threading.Lock()
+        self._orders = {}
+        for col in sort_columns:
+            if col in df.columns:
+                self._order(col)
+
+        # Kode faktor untuk menghitung nilai unik hasil filter tanpa hashing ulang
+        self.unique_column = unique_column
+        self._unique_codes = None
+        if unique_column in df.columns:
+            codes, uniques = pd.factorize(df[unique_column])
+            self._unique_codes = codes
+            self._n_uniques = len(uniques)
+        self._summaries = OrderedDict()
+
+    def _order(self, column):
+        """(permutasi posisi terurut naik, jumlah nilai tidak kosong) untuk `column`."""
+        with self._lock:
+            cached = self._orders.get(column)
+            if cached is None:
+                series = self.df[column].reset_index(drop=True)
+                order = series.sort_values(kind='stable', na_position='last').index.to_numpy()
+                cached = (order, int(series.notna().sum()))
+                self._orders[column] = cached
+            return cached
+
+    def ordered_rows(self, mask=None, sort_by=None, ascending=True):
+        """Posisi baris yang lolos `mask` (None = semua), diurutkan menurut `sort_by`."""
+        if sort_by is None or sort_by not in self.df.columns:
+            return np.arange(self.n_rows) if mask is None else np.flatnonzero(mask)
+        order, n_valid = self._order(sort_by)
+        if not ascending:
+            # Nilai kosong tetap di akhir, seperti `sort_values(ascending=False)`
+            order = np.concatenate([order[:n_valid][::-1], order[n_valid:]])
+        return order if mask is None else order[mask[order]]
+
+    def summary(self, mask=None, filter_key=None):
+        """(jumlah baris, jumlah nilai unik `unique_column`) untuk hasil filter.
+
+        Hasil disimpan per `filter_key` (mis. tuple pilihan filter) agar rerun dengan filter
+        yang sama tidak menghitung ulang.
+        """
+        if filter_key is not None:
+            with self._lock:
+                if filter_key in self._summaries:
+                    self._summaries.move_to_end(filter_key)
+                    return self._summaries[filter_key]
+
+        if mask is None:
+            n_rows = self.n_rows
+            codes = self._unique_codes
+        else:
+            n_rows = int(np.count_nonzero(mask))
+            codes = None if self._unique_codes is None else self._unique_codes[mask]
+        n_unique = None
+        if codes is not None:
+            present = np.bincount(codes[codes >= 0], minlength=self._n_uniques)
+            n_unique = int(np.count_nonzero(present))
+        result = (n_rows, n_unique)
+
+        if filter_key is not None:
+            with self._lock:
+                self._summaries[filter_key] = result
+                while len(self._summaries) > MAX_CACHED_SUMMARIES:
+                    self._summaries.popitem(last=False)
+        return result
+
+
+def page_bounds(n_rows, page, page_size):
+    """(awal, akhir, jumlah halaman) untuk halaman `page` (mulai 1, dibatasi ke rentang valid)."""
+    n_pages = max(1, -(-n_rows // page_size))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows), n_pages
+
+
+def show_paginated_table(view, columns, key, mask=None, filter_key=None, sort_options=None, page_rows=None, **dataframe_kwargs):
+    """Menampilkan tabel per halaman: sort dan pemotongan halaman di server, hanya halaman aktif yang dikirim ke browser.
+
+    `page_rows(posisi_baris)` boleh diisi untuk membentuk frame halaman sendiri
+    (mis. kolom hasil kalkulasi); bawaannya baris `view.df` pada kolom `columns`.
+    Mengembalikan posisi baris hasil filter dalam urutan yang dipilih.
+    """
+    import streamlit as st
+
+    sort_options = [col for col in (sort_options or columns) if col in view.df.columns]
+    col_sort, col_dir, col_size, col_page = st.columns([3, 2, 2, 2])
+    with col_sort:
+        sort_by = st.selectbox("Urutkan berdasarkan:", [ORIGINAL_ORDER, *sort_options], key=f"{key}_sort_by")
+    with col_dir:
+        direction = st.radio("Arah:", ('Naik', 'Turun'), horizontal=True, key=f"{key}_sort_dir",
+                             disabled=sort_by == ORIGINAL_ORDER)
+    with col_size:
+        page_size = st.selectbox("Baris per halaman:", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                                 key=f"{key}_page_size")
+
+    rows = view.ordered_rows(mask, None if sort_by == ORIGINAL_ORDER else sort_by, direction == 'Naik')
+    n_pages = page_bounds(len(rows), 1, page_size)[2]
+
+    # Kembali ke halaman 1 jika filter/sort berubah atau halaman melewati batas
+    page_key, state_key = f"{key}_page", f"{key}_state"
+    state = (filter_key, sort_by, direction, page_size)
+    if st.session_state.get(state_key) != state or st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = 1
+        st.session_state[state_key] = state
+    with col_page:
+        page = st.number_input(f"Halaman (dari {n_pages}):", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start, stop, _ = page_bounds(len(rows), page, page_size)
+    visible = rows[start:stop]
+    if page_rows is not None:
+        frame = page_rows(visible)
+    else:
+        frame = view.df.iloc[visible, view.df.columns.get_indexer(columns)]
+    st.dataframe(frame, **dataframe_kwargs)
+    st.caption(f"Baris {start + 1 if stop else 0:,}–{stop:,} dari {len(rows):,}. "
+               "Klik header kolom hanya mengurutkan halaman ini; gunakan pilihan **Urutkan berdasarkan** untuk seluruh hasil.")
+    return rows
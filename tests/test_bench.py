@@ -0,0 +1,24 @@
+from bench import compare, platform_info, platform_mismatch
+
+
+def test_platform_mismatch_same_machine():
+    assert platform_mismatch(platform_info()) == []
+
+
+def test_platform_mismatch_other_machine():
+    baseline_info = {**platform_info(), 'cpus': 64, 'cpu': 'Mesin lain'}
+    mismatch = platform_mismatch(baseline_info)
+    assert len(mismatch) == 2
+    assert any(line.startswith('cpus:') for line in mismatch)
+
+
+def test_platform_mismatch_old_baseline_without_cpu_info():
+    info = platform_info()
+    assert platform_mismatch({'python': info['python'], 'machine': info['machine']})
+
+
+def test_compare_flags_throughput_and_memory():
+    baseline = {'process_raw_data@10k': {'rows_per_s': 100_000.0, 'peak_mb': 10.0}}
+    results = {'process_raw_data@10k': {'rows_per_s': 80_000.0, 'peak_mb': 12.0}}
+    assert len(compare(results, baseline, tolerance=0.15)) == 2
+    assert compare(results, baseline, tolerance=0.25) == []
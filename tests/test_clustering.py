@@ -0,0 +1,38 @@
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+
+from clustering import cluster_items
+
+CO = sp.csr_matrix(np.array([
+    [5, 4, 0, 0],
+    [4, 5, 0, 1],
+    [0, 0, 6, 3],
+    [0, 1, 3, 6],
+]))
+
+
+def test_memory_tracking_is_opt_in():
+    _, stats = cluster_items(CO, n_clusters=2)
+    assert stats['peak_memory_mb'] is None
+    assert not tracemalloc.is_tracing()
+
+    _, stats = cluster_items(CO, n_clusters=2, track_memory=True)
+    assert stats['peak_memory_mb'] is not None
+    assert not tracemalloc.is_tracing()
+
+
+def test_outer_tracer_peak_is_kept():
+    tracemalloc.start()
+    try:
+        buffer = bytearray(8 * 1024 * 1024)
+        del buffer
+        _, before = tracemalloc.get_traced_memory()
+        _, stats = cluster_items(CO, n_clusters=2, track_memory=True)
+        _, after = tracemalloc.get_traced_memory()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert stats['peak_memory_mb'] is None
+    assert after >= before >= 8 * 1024 * 1024
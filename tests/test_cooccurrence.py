@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from cooccurrence import cooccurrence_matrix
+
+
+def legacy_cooccurrence(df):
+    """Loop ganda lama dari layouting.py, sebagai pembanding."""
+    grouped = df.groupby('Reference Document')['Material Group 2'].unique().tolist()
+    item_ids = sorted(df['Material Group 2'].dropna().unique())
+    id_to_index = {item: i for i, item in enumerate(item_ids)}
+    matrix = np.zeros((len(item_ids), len(item_ids)), dtype=int)
+    for doc_items in grouped:
+        doc_ids = [item for item in doc_items if item in id_to_index]
+        for i in range(len(doc_ids)):
+            for j in range(i + 1, len(doc_ids)):
+                idx1, idx2 = id_to_index[doc_ids[i]], id_to_index[doc_ids[j]]
+                matrix[idx1, idx2] += 1
+                matrix[idx2, idx1] += 1
+    return matrix, item_ids
+
+
+def test_sparse_product_matches_legacy_loop():
+    # Duplikat item dalam satu dokumen, item kosong, dokumen satu item, dan dokumen kosong
+    df = pd.DataFrame({
+        'Reference Document': ['D1', 'D1', 'D1', 'D2', 'D2', 'D2', 'D3', 'D4', 'D4', None, 'D5'],
+        'Material Group 2': ['A', 'B', 'A', 'B', 'C', None, 'C', 'A', 'C', 'B', 'D'],
+    })
+    co_occurrence, item_ids = cooccurrence_matrix(df)
+    expected, expected_ids = legacy_cooccurrence(df)
+    assert item_ids == expected_ids
+    np.testing.assert_array_equal(co_occurrence.toarray(), expected)
+
+
+def test_sparse_product_matches_legacy_loop_random():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Reference Document': rng.integers(0, 40, 400).astype(str),
+        'Material Group 2': rng.choice(list('ABCDEFGHIJKL'), 400),
+    })
+    co_occurrence, item_ids = cooccurrence_matrix(df)
+    expected, expected_ids = legacy_cooccurrence(df)
+    assert item_ids == expected_ids
+    np.testing.assert_array_equal(co_occurrence.toarray(), expected)
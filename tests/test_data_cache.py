@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import find_csv_twin, read_static_table
+
+pytest.importorskip('openpyxl')
+
+COLUMNS = ['Material ID', 'Time Interval', 'Movement Type', 'Min Total Quantity (BOX)']
+
+
+@pytest.fixture
+def export_xlsx(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    path = tmp_path / 'export.xlsx'
+    pd.DataFrame({
+        'Material ID': [10016, 10017],
+        'Time Interval': ['07:00-09:00', '09:00-11:00'],
+        'Min Total Quantity (BOX)': [0.5, 1.25],
+        'Movement Type': ['FAST', 'SLOW'],
+    }).to_excel(path, index=False)
+    return str(path)
+
+
+def _write_newer_csv(df, path, xlsx_path):
+    df.to_csv(path)
+    mtime = os.path.getmtime(xlsx_path) + 60
+    os.utime(path, (mtime, mtime))
+
+
+def test_twin_without_required_column_falls_back_to_xlsx(export_xlsx, tmp_path):
+    # Seperti 'export (1).csv' di repo: kolom index di depan, tanpa 'Movement Type'
+    twin = tmp_path / 'export (1).csv'
+    _write_newer_csv(pd.DataFrame({'Material ID': [1], 'Time Interval': ['07:00-09:00'],
+                                   'Min Total Quantity (BOX)': [9.0]}), twin, export_xlsx)
+
+    assert find_csv_twin(export_xlsx, COLUMNS) is None
+    df = read_static_table(export_xlsx, columns=COLUMNS, use_csv_twin=True)
+    assert df['Movement Type'].tolist() == ['FAST', 'SLOW']
+    assert df['Material ID'].tolist() == [10016, 10017]
+
+
+def test_matching_twin_is_used(export_xlsx, tmp_path):
+    twin = tmp_path / 'export (1).csv'
+    _write_newer_csv(pd.DataFrame({'Material ID': [1], 'Time Interval': ['07:00-09:00'],
+                                   'Min Total Quantity (BOX)': [9.0], 'Movement Type': ['FAST']}), twin, export_xlsx)
+
+    assert find_csv_twin(export_xlsx, COLUMNS) == str(twin)
+    df = read_static_table(export_xlsx, columns=COLUMNS, use_csv_twin=True)
+    assert list(df.columns) == COLUMNS
+    assert df['Material ID'].tolist() == [1]
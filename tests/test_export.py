@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from export import write_parquet
+
+pytest.importorskip('pyarrow')
+
+
+def test_write_parquet_string_columns_round_trip(tmp_path):
+    # Kolom object seperti 'Product Name' di halaman Min Max; 'Catatan' kosong di potongan pertama
+    df = pd.DataFrame({
+        'Product Name': pd.Series(['SUSU 100G', 'KOPI 200G', 'TEH 50G', 'GULA 1KG', 'MIE 75G'], dtype=object),
+        'Material ID': [1000001, 1000002, 1000003, 1000004, 1000005],
+        'Catatan': pd.Series([None, None, 'cek', None, 'ok'], dtype=object),
+        'Min Replenishment': [1, 2, 3, 4, 5],
+    })
+    path = tmp_path / 'hasil.parquet'
+    write_parquet(df, path, chunk_rows=2)
+
+    result = pd.read_parquet(path)
+    assert list(result.columns) == list(df.columns)
+    assert result['Product Name'].tolist() == df['Product Name'].tolist()
+    assert result['Catatan'].isna().tolist() == df['Catatan'].isna().tolist()
+    assert result['Catatan'].dropna().tolist() == ['cek', 'ok']
+    assert result['Material ID'].tolist() == df['Material ID'].tolist()
+
+
+def test_write_parquet_empty_frame(tmp_path):
+    df = pd.DataFrame({'Product Name': pd.Series([], dtype=object), 'Material ID': pd.Series([], dtype='int64')})
+    path = tmp_path / 'kosong.parquet'
+    write_parquet(df, path)
+    assert list(pd.read_parquet(path).columns) == ['Product Name', 'Material ID']
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from layout_pipeline import aligned_cooccurrence
+
+
+def test_aligned_cooccurrence_follows_requested_order():
+    zone_df = pd.DataFrame({
+        'Reference Document': ['D1', 'D1', 'D2', 'D2', 'D2'],
+        'Material Group 2': ['A', 'B', 'A', 'B', 'C'],
+    })
+    matrix = aligned_cooccurrence(zone_df, ['C', 'A', 'B']).toarray()
+    np.testing.assert_array_equal(matrix, [[0, 1, 1], [1, 0, 2], [1, 2, 0]])
+
+
+def test_aligned_cooccurrence_group_without_document_is_zero():
+    # 'Z' tidak punya Reference Document sehingga tidak ada di matriks co-occurrence
+    zone_df = pd.DataFrame({
+        'Reference Document': ['D1', 'D1', None],
+        'Material Group 2': ['A', 'B', 'Z'],
+    })
+    matrix = aligned_cooccurrence(zone_df, ['Z', 'A', 'B']).toarray()
+    np.testing.assert_array_equal(matrix, [[0, 0, 0], [0, 0, 1], [0, 1, 0]])
@@ -0,0 +1,33 @@
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKIP_DIRS = {'.git', '__pycache__', '.pytest_cache', '.venv', 'venv', '.sdr_cache', 'sdr_store'}
+
+
+def _files(suffix):
+    for root, dirs, files in os.walk(ROOT):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.endswith('.egg-info')]
+        for name in files:
+            if name.endswith(suffix):
+                yield os.path.join(root, name)
+
+
+def test_python_files_use_crlf():
+    # Repo memakai CRLF untuk semua file Python (lihat .gitattributes)
+    offenders = []
+    for path in _files('.py'):
+        with open(path, 'rb') as handle:
+            lines = handle.read().split(b'\n')
+        # Baris terakhir tanpa newline tidak dihitung
+        if any(not line.endswith(b'\r') for line in lines[:-1]):
+            offenders.append(os.path.relpath(path, ROOT))
+    assert offenders == []
+
+
+def test_markdown_files_use_lf():
+    offenders = []
+    for path in _files('.md'):
+        with open(path, 'rb') as handle:
+            if b'\r' in handle.read():
+                offenders.append(os.path.relpath(path, ROOT))
+    assert offenders == []
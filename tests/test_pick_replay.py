@@ -0,0 +1,32 @@
+import pandas as pd
+
+from pick_replay import replay_picks
+
+LAYOUT = pd.DataFrame({'Material Group 2': ['A', 'B', 'C'], 'Row': [0, 0, 0], 'Column': [1, 5, 2]})
+
+
+def test_unconfirmed_lines_are_replayed_last():
+    # Urutan benar A -> C -> B (B belum dikonfirmasi): 1 + 1 + 3 + 5 kembali ke depot
+    picks = pd.DataFrame({
+        'Reference Document': ['D1', 'D1', 'D1'],
+        'Material Group 2': ['A', 'B', 'C'],
+        'Confirm 1 Time': pd.to_datetime(['2025-10-01 08:00', None, '2025-10-01 08:05']),
+    })
+    result = replay_picks(picks, LAYOUT)
+    assert result['Travel Distance'].tolist() == [10]
+    assert result['Lines'].tolist() == [3]
+
+
+def test_replay_matches_sort_values_order():
+    picks = pd.DataFrame({
+        'Reference Document': ['D1', 'D2', 'D1', 'D2', 'D1'],
+        'Material Group 2': ['B', 'A', 'A', 'C', 'C'],
+        'Confirm 1 Time': pd.to_datetime([None, '2025-10-01 09:00', '2025-10-01 08:10', None, '2025-10-01 08:00']),
+    })
+    result = replay_picks(picks, LAYOUT).set_index('Reference Document')['Travel Distance']
+
+    positions = LAYOUT.set_index('Material Group 2')
+    for doc, lines in picks.sort_values(['Reference Document', 'Confirm 1 Time'], kind='stable').groupby('Reference Document'):
+        route = [(0, 0), *[(positions.at[item, 'Row'], positions.at[item, 'Column']) for item in lines['Material Group 2']], (0, 0)]
+        expected = sum(abs(r1 - r0) + abs(c1 - c0) for (r0, c0), (r1, c1) in zip(route, route[1:]))
+        assert result[doc] == expected
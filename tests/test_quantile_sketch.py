@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantile_sketch import build_sketch, exact_quantiles, merge_sketches, quantile_label, sketch_quantiles
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Batas galat: rank nilai perkiraan menyimpang paling banyak 1 poin persentil dari kuantil yang diminta
+MAX_RANK_ERROR = 0.01
+
+
+@pytest.fixture(scope='module')
+def daily_totals():
+    rng = np.random.default_rng(0)
+    n_groups, per_group = 20, 5_000
+    return pd.DataFrame({
+        'Material ID': np.repeat(np.arange(n_groups), per_group),
+        'TO Dummy Quantity': rng.lognormal(3, 1, n_groups * per_group),
+    })
+
+
+def _max_rank_error(df, approx):
+    errors = []
+    for material_id, values in df.groupby('Material ID')['TO Dummy Quantity']:
+        row = approx[approx['Material ID'] == material_id].iloc[0]
+        for q in QUANTILES:
+            errors.append(abs((values <= row[quantile_label(q)]).mean() - q))
+    return max(errors)
+
+
+def test_sketch_quantiles_within_rank_error(daily_totals):
+    keys = ['Material ID']
+    approx = sketch_quantiles(build_sketch(daily_totals, keys, 'TO Dummy Quantity'), keys, QUANTILES)
+    assert len(approx) == daily_totals['Material ID'].nunique()
+    assert _max_rank_error(daily_totals, approx) <= MAX_RANK_ERROR
+
+
+def test_merged_sketches_within_rank_error(daily_totals):
+    # Sketch per potongan (seperti jalur streaming) lalu digabung
+    keys = ['Material ID']
+    shuffled = daily_totals.sample(frac=1, random_state=1)
+    sketches = [build_sketch(shuffled.iloc[start:start + 15_000], keys, 'TO Dummy Quantity') for start in range(0, len(shuffled), 15_000)]
+    approx = sketch_quantiles(merge_sketches(sketches, keys), keys, QUANTILES)
+    assert _max_rank_error(daily_totals, approx) <= MAX_RANK_ERROR
+
+
+def test_small_groups_are_exact():
+    # Grup yang lebih kecil dari kompresi tidak diringkas, sehingga hasilnya sama dengan kuantil eksak
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'Material ID': np.repeat(np.arange(30), 25), 'TO Dummy Quantity': rng.integers(1, 500, 750).astype(float)})
+    keys = ['Material ID']
+    approx = sketch_quantiles(build_sketch(df, keys, 'TO Dummy Quantity'), keys, QUANTILES)
+    exact = exact_quantiles(df, keys, 'TO Dummy Quantity', QUANTILES)
+    pd.testing.assert_frame_equal(approx.sort_values(keys).reset_index(drop=True), exact.sort_values(keys).reset_index(drop=True),
+                                  check_dtype=False)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from slotting import greedy_slotting, layout_objective, optimize_slotting
+
+
+def legacy_greedy(weights, num_rows, num_cols):
+    """Penempatan pop(0) lama dari layouting.py, sebagai pembanding."""
+    order = sorted(range(len(weights)), key=lambda i: -weights[i])
+    available_locations = []
+    for r in range(num_rows):
+        for c in range(num_cols):
+            available_locations.append({'Row': r, 'Column': c, 'Picking Distance': r + c})
+    available_locations.sort(key=lambda x: x['Picking Distance'])
+    rows, cols = [0] * len(weights), [0] * len(weights)
+    for item in order:
+        best_location = available_locations.pop(0)
+        rows[item], cols[item] = best_location['Row'], best_location['Column']
+    return rows, cols
+
+
+@pytest.mark.parametrize('num_rows', [1, 2, 3])
+def test_greedy_matches_legacy_pop_placement(num_rows):
+    rng = np.random.default_rng(num_rows)
+    # Banyak nilai kembar agar pemecah seri ikut diuji
+    weights = rng.integers(0, 5, 17)
+    num_cols = (len(weights) + num_rows - 1) // num_rows
+    rows, cols = greedy_slotting(weights, num_rows, num_cols)
+    expected_rows, expected_cols = legacy_greedy(weights.tolist(), num_rows, num_cols)
+    assert rows.tolist() == expected_rows
+    assert cols.tolist() == expected_cols
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_optimize_never_worse_than_greedy(seed):
+    rng = np.random.default_rng(seed)
+    n_items, num_rows = 30, 2
+    num_cols = (n_items + num_rows - 1) // num_rows + 1
+    weights = rng.integers(0, 50, n_items).astype(float)
+    dense = np.triu(rng.poisson(0.5, (n_items, n_items)), k=1) * 10
+    co_occurrence = sparse.csr_matrix(dense + dense.T)
+
+    rows, cols, stats = optimize_slotting(weights, num_rows, num_cols, co_occurrence=co_occurrence,
+                                          time_limit=float('inf'))
+    greedy_rows, greedy_cols = greedy_slotting(weights, num_rows, num_cols)
+    greedy = layout_objective(greedy_rows, greedy_cols, weights, co_occurrence)
+    optimized = layout_objective(rows, cols, weights, co_occurrence)
+    assert optimized <= greedy
+    assert stats['greedy_objective'] == pytest.approx(greedy)
+    # Setiap slot paling banyak berisi satu item
+    assert len(set(zip(rows.tolist(), cols.tolist()))) == n_items
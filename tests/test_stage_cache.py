@@ -0,0 +1,43 @@
+import pandas as pd
+
+from stage_cache import StageCache, stage_key
+
+
+def _frame(n):
+    return pd.DataFrame({'Material ID': range(n), 'Average Total Quantity (BOX)': [1.5] * n})
+
+
+def _disk_size(cache):
+    return sum(size for _, size, _ in cache._entries())
+
+
+def test_stats_track_size_without_rescanning(tmp_path, monkeypatch):
+    cache = StageCache(directory=str(tmp_path), max_mb=100)
+    cache.cached_frame('interval_stats', 'file-a', {}, lambda: _frame(100))
+    cache.cached_frame('interval_stats', 'file-b', {}, lambda: _frame(200))
+    # Menulis ulang entri yang sama tidak menambah jumlah entri
+    cache.store(stage_key('interval_stats', 'file-a', {}), {'result': _frame(300)})
+
+    expected = _disk_size(cache)
+
+    def no_rescan():
+        raise AssertionError('folder dipindai ulang')
+
+    monkeypatch.setattr(cache, '_entries', no_rescan)
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['size_mb'] * 1024 ** 2 == expected
+    assert stats['writes'] == 3
+
+
+def test_existing_entries_counted_and_evicted(tmp_path):
+    StageCache(directory=str(tmp_path), max_mb=100).cached_frame('stage', 'old', {}, lambda: _frame(1_000))
+    cache = StageCache(directory=str(tmp_path), max_mb=100)
+    assert cache.stats()['entries'] == 1
+
+    cache.max_bytes = _disk_size(cache) * 1.5
+    cache.cached_frame('stage', 'new', {}, lambda: _frame(1_000))
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 1
+    assert stats['size_mb'] * 1024 ** 2 == _disk_size(cache)
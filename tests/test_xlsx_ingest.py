@@ -0,0 +1,92 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from replenishment import STOCK_ANALYSIS_COLUMNS
+from xlsx_ingest import IngestProgress, read_xlsx
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _write_sheet(path, rows, trailing_formatted_rows=0):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    # Sel kosong berformat di bawah data (sisa format ekspor)
+    for offset in range(1, trailing_formatted_rows + 1):
+        sheet.cell(row=len(rows) + offset, column=1).number_format = '0.00'
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def stock_analysis_xlsx(tmp_path):
+    # Tata letak ekspor Stock Analysis: 3 baris judul, header asli, lalu data
+    header = ['Nama Produk', 'Material', 'Kategori', 'Rekomendasi', 'Avg M-1', 'Avg 14', 'Avg 3', 'Stok', 'Hari']
+    rows = [
+        ['Retail Warehouse Stock Analysis'],
+        ['Periode: Oktober 2025'],
+        [],
+        header,
+        ['SUSU 100G', 10016, 'Fast', 'OK', 12.5, 10, 9.25, 40, 7],
+        ['KOPI 200G', 10017, 'Slow', 'Review', 3, 2.5, None, 0, 14],
+        [None] * 9,
+        ['TEH 50G', '10018A', 'Medium', None, '-', 1.5, 2, 15, 3],
+        ['GULA 1KG', 10019, None, 'OK', 7.75, 8, 6.5, None, None],
+        [],
+        ['MIE 75G', 10020, 'Fast', 'OK', 20, 18.5, 22, 60, 5],
+    ]
+    return _write_sheet(tmp_path / 'stock.xlsx', rows, trailing_formatted_rows=3)
+
+
+def _assert_same(result, expected):
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    for col in expected.columns:
+        # Kolom campuran tetap object, kolom angka tetap numerik, seperti read_excel
+        assert pd.api.types.is_numeric_dtype(result[col]) == pd.api.types.is_numeric_dtype(expected[col]), col
+
+
+def test_names_and_skiprows_match_read_excel(stock_analysis_xlsx):
+    expected = pd.read_excel(stock_analysis_xlsx, names=STOCK_ANALYSIS_COLUMNS, skiprows=3)
+    result = read_xlsx(stock_analysis_xlsx, names=STOCK_ANALYSIS_COLUMNS, skiprows=3)
+    _assert_same(result, expected)
+    # Baris kosong di tengah tetap ada (NaN), baris kosong berformat di akhir dibuang, seperti read_excel
+    assert len(result) == 7
+    assert result.iloc[2].isna().all() and result.iloc[5].isna().all()
+
+
+def test_mixed_columns_keep_values(stock_analysis_xlsx):
+    result = read_xlsx(stock_analysis_xlsx, names=STOCK_ANALYSIS_COLUMNS, skiprows=3)
+    filled = result.dropna(how='all')
+    assert filled['Material ID'].tolist() == [10016, 10017, '10018A', 10019, 10020]
+    assert filled['Avg Picking (Month-1) in Box'].tolist() == [12.5, 3, '-', 7.75, 20]
+    assert pd.api.types.is_float_dtype(result['Avg Last 3 Days in Box'])
+    assert pd.api.types.is_float_dtype(result['Stock in Box'])
+
+
+def test_column_subset_and_types_match_read_excel(tmp_path):
+    rows = [
+        ['Reference Document', 'Created Date', 'Material ID', 'TO Dummy', 'Material Desc', 'Catatan'],
+        [5001, datetime.datetime(2025, 10, 1), 10016, 2, 'SUSU', None],
+        [5001, datetime.datetime(2025, 10, 1), 10017, 1.5, 'KOPI', 'x'],
+        [None, None, None, None, None, 'sisa format'],
+        [5002, datetime.datetime(2025, 10, 2), 10016, 3, 'SUSU', None],
+        [None, None, None, None, None, None],
+    ]
+    path = _write_sheet(tmp_path / 'zrw70.xlsx', rows)
+    columns = ['Reference Document', 'Created Date', 'Material ID', 'TO Dummy', 'Material Desc']
+
+    expected = pd.read_excel(path, usecols=columns)
+    result = read_xlsx(path, columns=columns, chunksize=2)
+    _assert_same(result, expected)
+    assert pd.api.types.is_datetime64_any_dtype(result['Created Date'])
+
+
+def test_progress_counts_rows(stock_analysis_xlsx):
+    progress = IngestProgress()
+    df = read_xlsx(stock_analysis_xlsx, names=STOCK_ANALYSIS_COLUMNS, skiprows=3, chunksize=2, progress=progress)
+    assert progress.rows == len(df) == 7
+    assert progress.total_rows >= 7
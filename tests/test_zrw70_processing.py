@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+import synthetic
+from zrw70_processing import process_raw_data, process_raw_data_chunked, quantile_columns
+
+
+@pytest.fixture(scope='module')
+def raw_export(tmp_path_factory):
+    materials = synthetic.generate_materials(300, seed=7)
+    raw = synthetic.generate_zrw70(20_000, materials, seed=7, as_category=False)
+    path = tmp_path_factory.mktemp('zrw70') / 'zrw70.csv'
+    raw.to_csv(path, index=False)
+    return str(path), synthetic.uom_master(materials)
+
+
+def _sorted(df):
+    return df.sort_values(['Material ID', 'Movement Type', 'Time Interval']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('quantiles', [(), (0.5, 0.9)])
+def test_chunked_matches_in_memory(raw_export, quantiles):
+    path, df_uom = raw_export
+    expected = process_raw_data(pd.read_csv(path), df_uom, quantiles=quantiles)
+    # Potongan kecil agar total per jam benar-benar digabung lintas potongan
+    result = process_raw_data_chunked(path, df_uom, chunksize=3_000, quantiles=quantiles)
+
+    assert not expected.empty
+    assert list(result.columns) == list(expected.columns)
+    for column in quantile_columns(quantiles).values():
+        assert column in result.columns
+    pd.testing.assert_frame_equal(_sorted(result), _sorted(expected), check_dtype=False)
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_cache import file_fingerprint, read_static_table
+
+UOM_DATA_FILE = 'ZRW12-UoM.XLSX'
+UOM_COLUMNS = ['Material', 'UOM(in BUn)']
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+class UomIndex:
+    """Indeks Material ID -> isi per box (UOM(in BUn)) dari master UoM.
+
+    Satu baris per Material: konversi valid (numerik) pertama yang muncul di master.
+    `lookup` memakai tabel hash (pd.Index), sehingga pencarian sekolom penuh
+    tidak memerlukan merge.
+    """
+
+    def __init__(self, df_uom, version=None):
+        missing = [col for col in UOM_COLUMNS if col not in df_uom.columns]
+        if missing:
+            raise ValueError(f"File UoM tidak memiliki kolom {', '.join(repr(col) for col in missing)}.")
+        materials = pd.to_numeric(df_uom['Material'], errors='coerce').to_numpy(dtype=float)
+        conversion = pd.to_numeric(df_uom['UOM(in BUn)'], errors='coerce').to_numpy(dtype=float)
+        valid = ~np.isnan(materials) & ~np.isnan(conversion)
+
+        # Kemunculan pertama per Material (urutan file dipertahankan)
+        materials, first = np.unique(materials[valid], return_index=True)
+        self.materials = pd.Index(materials)
+        self.conversion = conversion[valid][first]
+        self.version = version
+
+    def __len__(self):
+        return len(self.conversion)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def positions(self, material_ids):
+        """Posisi setiap Material ID di indeks (-1 jika tidak ada)."""
+        ids = pd.to_numeric(pd.Series(material_ids), errors='coerce').to_numpy(dtype=float)
+        return self.materials.get_indexer(ids)
+
+    def lookup(self, material_ids):
+        """Isi per box untuk setiap Material ID (NaN jika tidak ada di master)."""
+        positions = self.positions(material_ids)
+        return np.where(positions >= 0, self.conversion[positions], np.nan)
+
+    def frame(self):
+        """Master UoM unik sebagai DataFrame ['Material', 'UOM(in BUn)']."""
+        return pd.DataFrame({'Material': self.materials.to_numpy(), 'UOM(in BUn)': self.conversion})
+
+
+def as_uom_index(uom):
+    """UomIndex dari master UoM berupa DataFrame (atau UomIndex itu sendiri)."""
+    return uom if isinstance(uom, UomIndex) else UomIndex(uom)
+
+
+def get_uom_index(file_path=UOM_DATA_FILE):
+    """Indeks UoM bersama untuk proses ini; dimuat ulang otomatis jika file berubah (mtime/ukuran).
+
+    `version` pada indeks = sidik jari file, bisa dipakai sebagai kunci cache.
+    """
+    version = file_fingerprint(file_path)
+    with _lock:
+        cached = _loaded.get(file_path)
+        if cached is None or cached.version != version:
+            cached = UomIndex(read_static_table(file_path, columns=UOM_COLUMNS), version=version)
+            _loaded[file_path] = cached
+        return cached
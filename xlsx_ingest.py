@@ -0,0 +1,193 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from profiling import stage
+
+# Jumlah baris per potongan (juga interval pembaruan progres)
+CHUNK_ROWS = 20_000
+# Interval pembaruan progress bar dari thread pemanggil (detik)
+POLL_SECONDS = 0.25
+
+
+class IngestProgress:
+    """Progres pembacaan yang ditulis thread latar dan dibaca thread pemanggil."""
+
+    def __init__(self):
+        self.rows = 0
+        self.total_rows = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def update(self, rows, total_rows=None):
+        self.rows = rows
+        if total_rows is not None:
+            self.total_rows = total_rows
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_s(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self):
+        """Bagian yang sudah dibaca (0-1), atau None jika jumlah baris sheet tidak diketahui."""
+        if not self.total_rows:
+            return None
+        return min(1.0, self.rows / self.total_rows)
+
+
+def _header(sheet, skiprows, names):
+    row = next(sheet.iter_rows(min_row=skiprows + 1, max_row=skiprows + 1, values_only=True), None)
+    if row is None:
+        return None
+    header = [str(h) if h is not None else f'Unnamed: {i}' for i, h in enumerate(row)]
+    if names is not None:
+        # Seperti read_excel(names=...): header file diganti berdasarkan posisi
+        header = list(names) + header[len(names):]
+    return header
+
+
+def _typed(values):
+    """Kolom Python (hasil openpyxl) -> Series dengan tipe hasil inferensi (angka, datetime, teks)."""
+    series = pd.Series(values, dtype=object).infer_objects()
+    if series.dtype == object:
+        # Sel kosong di kolom campuran menjadi NaN (bukan None), seperti read_excel
+        series = series.where(series.notna(), np.nan)
+    return series
+
+
+def iter_xlsx_chunks(source, columns=None, names=None, skiprows=0, chunksize=CHUNK_ROWS, progress=None):
+    """Membaca sheet pertama XLSX per potongan dalam mode read-only, hanya kolom `columns`.
+
+    Sel di kanan kolom terakhir yang dibutuhkan tidak dibuat sama sekali, dan setiap
+    potongan dibentuk per kolom (bukan per baris) lalu diberi tipe. `names`/`skiprows`
+    berperilaku seperti pada `pd.read_excel`; seperti di sana, baris kosong di tengah
+    data tetap menjadi baris NaN, sedangkan baris kosong di akhir sheet (mis. sisa
+    format) dibuang. Jika `progress` diberikan, jumlah baris terbaca diperbarui setiap potongan.
+    """
+    from openpyxl import load_workbook
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = _header(sheet, skiprows, names)
+        if header is None:
+            return
+        if columns is None:
+            keep = list(range(len(names))) if names is not None else list(range(len(header)))
+        else:
+            keep = [i for i, h in enumerate(header) if h in columns]
+        if not keep:
+            return
+        out_names = [header[i] for i in keep]
+        pick = itemgetter(*keep)
+        single = len(keep) == 1
+        max_col = keep[-1] + 1
+        if progress is not None and sheet.max_row:
+            progress.update(0, max(0, sheet.max_row - skiprows - 1))
+
+        rows_read = 0
+        buffer = []
+        blank = (None,) * len(keep)
+        pending_blank = 0
+        for row in sheet.iter_rows(min_row=skiprows + 2, max_col=max_col, values_only=True):
+            # Baris kosong ditahan dulu: baru ditulis jika masih ada baris berisi sesudahnya
+            if all(value is None for value in row):
+                pending_blank += 1
+                continue
+            if pending_blank:
+                buffer.extend([blank] * pending_blank)
+                pending_blank = 0
+            if len(row) < max_col:
+                row = row + (None,) * (max_col - len(row))
+            buffer.append((pick(row),) if single else pick(row))
+            if len(buffer) >= chunksize:
+                rows_read += len(buffer)
+                yield pd.DataFrame({name: _typed(values) for name, values in zip(out_names, zip(*buffer))})
+                buffer = []
+                if progress is not None:
+                    progress.update(rows_read)
+        if buffer:
+            rows_read += len(buffer)
+            yield pd.DataFrame({name: _typed(values) for name, values in zip(out_names, zip(*buffer))})
+        if progress is not None:
+            progress.update(rows_read)
+    finally:
+        workbook.close()
+
+
+def read_xlsx(source, columns=None, names=None, skiprows=0, chunksize=CHUNK_ROWS, progress=None):
+    """Seluruh sheet pertama XLSX sebagai satu DataFrame, hanya kolom `columns` (lihat `iter_xlsx_chunks`)."""
+    with stage('read_xlsx') as record:
+        chunks = list(iter_xlsx_chunks(source, columns, names, skiprows, chunksize, progress))
+        if not chunks:
+            return pd.DataFrame(columns=list(names or columns or []))
+        # Kolom dengan tipe berbeda antar potongan (mis. int lalu float) disatukan oleh concat;
+        # potongan yang kolomnya kosong semua (object) tidak boleh membuat kolom angka jadi object
+        df = pd.concat(chunks, ignore_index=True).infer_objects()
+        record['rows'] = len(df)
+    return df
+
+
+def run_in_background(func, *args, on_update=None, poll_s=POLL_SECONDS, **kwargs):
+    """Menjalankan `func(*args, progress=..., **kwargs)` di thread latar dan menunggu hasilnya.
+
+    `on_update(progress)` dipanggil dari thread pemanggil setiap `poll_s` detik (mis. untuk
+    memperbarui progress bar Streamlit, yang hanya boleh disentuh dari thread skrip).
+    Stage profil di thread latar tetap tercatat ke run yang aktif.
+    """
+    progress = IngestProgress()
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='xlsx-ingest') as executor:
+        future = executor.submit(context.run, func, *args, progress=progress, **kwargs)
+        while True:
+            try:
+                result = future.result(timeout=poll_s)
+                break
+            except FutureTimeout:
+                if on_update is not None:
+                    on_update(progress)
+    progress.finish()
+    if on_update is not None:
+        on_update(progress)
+    return result
+
+
+def streamlit_progress(label):
+    """Callback `on_update` yang menampilkan progress bar Streamlit (baris terbaca dan baris/detik).
+
+    Mengembalikan (callback, fungsi untuk menghapus progress bar).
+    """
+    import streamlit as st
+
+    bar = st.progress(0.0, text=label)
+
+    def update(progress):
+        text = f"{label}: {progress.rows:,} baris ({progress.rows_per_s:,.0f} baris/detik, {progress.elapsed:.1f} detik)"
+        fraction = progress.fraction
+        bar.progress(fraction if fraction is not None else 0.0, text=text)
+
+    return update, bar.empty
+
+
+def read_upload(source, columns=None, names=None, skiprows=0, label="Membaca file"):
+    """`read_xlsx` di thread latar dengan progress bar Streamlit; dipakai halaman untuk file unggahan."""
+    on_update, clear = streamlit_progress(label)
+    try:
+        return run_in_background(read_xlsx, source, columns, names, skiprows, on_update=on_update)
+    finally:
+        clear()
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+
+from interval_engine import BOX_QUANTITY_COLUMNS, DEFAULT_INTERVAL_GRID, bin_hours, convert_to_box
+from profiling import stage
+from quantile_sketch import COMPRESSION, build_sketch, exact_quantiles, merge_sketches, quantile_label, sketch_quantiles
+from uom_service import as_uom_index
+from xlsx_ingest import iter_xlsx_chunks
+
+# Kolom data mentah ZRW70 yang dibutuhkan untuk analisis interval
+RAW_COLUMNS = [
+    'Storage Type Suggestion', 'Created Time', 'Created Date', 'Material ID',
+    'Material Desc', 'Movement Type', 'TO Dummy Quantity', 'UOM Actual'
+]
+
+
+def _daily_group_keys(df):
+    group_keys = ['Material ID', 'Created Date', 'Time Interval']
+    if 'Movement Type' in df.columns:
+        group_keys.append('Movement Type')
+    return group_keys
+
+
+def _hourly_group_keys(df):
+    group_keys = ['Material ID', 'Created Date', 'Created Hour']
+    if 'Movement Type' in df.columns:
+        group_keys.append('Movement Type')
+    return group_keys
+
+
+def _material_keys(df):
+    return ['Material ID', 'Movement Type'] if 'Movement Type' in df.columns else ['Material ID']
+
+
+def prepare_rows(df, storage_type='ZYY', interval_grid=DEFAULT_INTERVAL_GRID):
+    """Langkah 1-2: filter Storage Type dan bentuk kolom waktu (Created Hour, Time Interval, Created Date)."""
+    # 1. Filter Data Awal
+    with stage('filter', rows=len(df)):
+        df_filtered = df[df['Storage Type Suggestion'] == storage_type].copy()
+    if df_filtered.empty:
+        return df_filtered
+
+    # 2. Pembersihan & Pembuatan Kolom Waktu
+    with stage('datetime parsing', rows=len(df_filtered)):
+        df_filtered['Created Time'] = pd.to_datetime(df_filtered['Created Time'], format='%H:%M:%S', errors='coerce')
+        df_filtered['Created Hour'] = df_filtered['Created Time'].dt.hour
+        excel_epoch = pd.to_datetime('1899-12-30')
+        df_filtered['Created Date'] = pd.to_datetime(df_filtered['Created Date'], unit='D', origin=excel_epoch, errors='coerce')
+        df_filtered['Material ID'] = df_filtered['Material ID'].astype(float)
+    with stage('interval binning', rows=len(df_filtered)):
+        df_filtered['Time Interval'] = bin_hours(df_filtered['Created Hour'], interval_grid)
+    return df_filtered
+
+
+def material_info_table(df_filtered):
+    """Material Desc (dan Movement Type) pertama yang muncul per Material ID."""
+    merge_cols = ['Material ID', 'Material Desc']
+    if 'Movement Type' in df_filtered.columns:
+        merge_cols.append('Movement Type')
+    return df_filtered[merge_cols].drop_duplicates(subset=_material_keys(df_filtered))
+
+
+def uom_info_table(df_filtered):
+    """Pasangan unik Material ID - UOM Actual dari data mentah."""
+    uom_info = df_filtered[['Material ID', 'UOM Actual']].drop_duplicates()
+    uom_info.columns = ['Material ID', 'UOM']
+    return uom_info
+
+
+def daily_interval_totals(df_filtered):
+    """Langkah 3: total kuantitas harian per Material, Tanggal, Interval (dan Movement Type)."""
+    with stage('groupby harian', rows=len(df_filtered)):
+        return df_filtered.groupby(_daily_group_keys(df_filtered))['TO Dummy Quantity'].sum().reset_index()
+
+
+def hourly_totals(df_filtered):
+    """Total kuantitas harian per Material, Tanggal, Jam (dan Movement Type); jam kosong disimpan sebagai -1."""
+    with stage('groupby per jam', rows=len(df_filtered)):
+        df_hours = df_filtered.assign(**{'Created Hour': df_filtered['Created Hour'].fillna(-1).astype(int)})
+        return df_hours.groupby(_hourly_group_keys(df_hours))['TO Dummy Quantity'].sum().reset_index()
+
+
+def interval_totals_from_hourly(hourly, interval_grid=DEFAULT_INTERVAL_GRID):
+    """Langkah 3 dari total per jam: grid interval bisa dipilih setelah data disimpan."""
+    daily = hourly.assign(**{'Time Interval': bin_hours(hourly['Created Hour'], interval_grid)})
+    return daily.groupby(_daily_group_keys(daily))['TO Dummy Quantity'].sum().reset_index()
+
+
+def _interval_keys(df):
+    group_keys = ['Material ID', 'Time Interval']
+    if 'Movement Type' in df.columns:
+        group_keys.append('Movement Type')
+    return group_keys
+
+
+def quantile_columns(quantiles):
+    """Kolom kuantil total harian -> kolom BOX-nya, mis. 'P90 Total Quantity' -> 'P90 Total Quantity (BOX)'."""
+    return {f"{quantile_label(q)} Total Quantity": f"{quantile_label(q)} Total Quantity (BOX)" for q in quantiles}
+
+
+def interval_summary(daily_quantity_by_interval, with_sketch=True, compression=COMPRESSION):
+    """Ringkasan total harian yang bisa digabung: min/max/jumlah/banyak hari dan sketch kuantil per grup.
+
+    Ringkasan beberapa periode (mis. per bulan) digabung dengan `merge_interval_summaries`
+    tanpa menyimpan seluruh deret harian.
+    """
+    group_keys_agg = _interval_keys(daily_quantity_by_interval)
+    with stage('groupby min/max/mean', rows=len(daily_quantity_by_interval)):
+        stats = daily_quantity_by_interval.groupby(group_keys_agg)['TO Dummy Quantity'].agg(['min', 'max', 'sum', 'count']).reset_index()
+    sketch = None
+    if with_sketch:
+        with stage('quantile sketch', rows=len(daily_quantity_by_interval)):
+            sketch = build_sketch(daily_quantity_by_interval, group_keys_agg, 'TO Dummy Quantity', compression)
+    return {'keys': group_keys_agg, 'stats': stats, 'sketch': sketch}
+
+
+def merge_interval_summaries(summaries, compression=COMPRESSION):
+    """Menggabungkan ringkasan `interval_summary` dari beberapa periode."""
+    summaries = [summary for summary in summaries if summary is not None and not summary['stats'].empty]
+    if not summaries:
+        return None
+    group_keys_agg = summaries[0]['keys']
+    stats = pd.concat([summary['stats'] for summary in summaries], ignore_index=True)
+    stats = stats.groupby(group_keys_agg).agg({'min': 'min', 'max': 'max', 'sum': 'sum', 'count': 'sum'}).reset_index()
+    sketches = [summary['sketch'] for summary in summaries]
+    sketch = None if any(s is None for s in sketches) else merge_sketches(sketches, group_keys_agg, compression)
+    return {'keys': group_keys_agg, 'stats': stats, 'sketch': sketch}
+
+
+def finalize_interval_stats(daily_quantity_by_interval, material_info, uom_info, df_uom, quantiles=(),
+                            exact_quantiles_mode=False, summary=None):
+    """Langkah 4-8: agregasi min/max/mean (+ kuantil), gabung deskripsi & UoM, lalu konversi ke BOX.
+
+    Kuantil total harian (mis. P50/P90/P95) dihitung dari sketch t-digest; dengan
+    `exact_quantiles_mode` dihitung eksak dari deret harian (mode validasi). Jika
+    `summary` (hasil `interval_summary`/`merge_interval_summaries`) diberikan, deret
+    harian hanya dibutuhkan untuk mode eksak.
+    """
+    # 4. Hitung Min, Max, dan Rata-rata Total Harian per Material dan Interval
+    if summary is None:
+        summary = interval_summary(daily_quantity_by_interval, with_sketch=bool(quantiles) and not exact_quantiles_mode)
+    group_keys_agg = summary['keys']
+    stats = summary['stats']
+
+    quantity_by_interval = stats[group_keys_agg].assign(min=stats['min'], max=stats['max'], mean=stats['sum'] / stats['count'])
+    quantity_by_interval.columns = group_keys_agg + ['Average Total Quantity', 'Min Total Quantity', 'Max Total Quantity']
+
+    if quantiles:
+        with stage('quantiles', rows=len(quantity_by_interval)):
+            if exact_quantiles_mode:
+                quantile_values = exact_quantiles(daily_quantity_by_interval, group_keys_agg, 'TO Dummy Quantity', quantiles)
+            else:
+                quantile_values = sketch_quantiles(summary['sketch'], group_keys_agg, quantiles)
+            quantile_values.columns = group_keys_agg + list(quantile_columns(quantiles))
+            quantity_by_interval = pd.merge(quantity_by_interval, quantile_values, on=group_keys_agg, how='left')
+
+    # 5. Gabungkan Material Desc & Movement Type ke Data Kuantitas
+    with stage('material merge', rows=len(quantity_by_interval)):
+        quantity_by_interval = pd.merge(quantity_by_interval, material_info, on=_material_keys(material_info), how='left')
+
+    with stage('UoM lookup', rows=len(quantity_by_interval)):
+        # 6. Isi per box dari indeks UoM (satu konversi per Material ID, tanpa merge)
+        uom_index = as_uom_index(df_uom)
+        quantity_by_interval['Conversion_to_PCS'] = uom_index.lookup(quantity_by_interval['Material ID'])
+
+        # 7. UOM pertama per Material ID dari data mentah; hanya untuk material yang ada di master UoM
+        uom_first = uom_info.dropna(subset=['UOM']).drop_duplicates(subset=['Material ID'])
+        uom_position = pd.Index(uom_first['Material ID']).get_indexer(quantity_by_interval['Material ID'])
+        # Posisi -1 (tidak ada) menunjuk ke elemen None terakhir
+        uom_values = np.append(uom_first['UOM'].to_numpy(dtype=object), None)
+        quantity_by_interval['UOM'] = np.where(
+            (uom_position >= 0) & quantity_by_interval['Conversion_to_PCS'].notna(), uom_values[uom_position], None
+        )
+
+        # Urutan baris sama seperti groupby per kunci unik
+        unique_keys = ['Material ID', 'Time Interval']
+        if 'Movement Type' in quantity_by_interval.columns:
+            unique_keys.append('Movement Type')
+        quantity_by_interval_unique = quantity_by_interval.sort_values(unique_keys, kind='stable').reset_index(drop=True)
+
+    # 8. Konversi ke BOX
+    with stage('BOX conversion', rows=len(quantity_by_interval_unique)):
+        quantity_by_interval_unique = convert_to_box(quantity_by_interval_unique, {**BOX_QUANTITY_COLUMNS, **quantile_columns(quantiles)})
+
+    # Pembersihan akhir
+    quantity_by_interval_unique['Material ID'] = quantity_by_interval_unique['Material ID'].astype('Int64')
+    return quantity_by_interval_unique.sort_values(by='Average Total Quantity (BOX)', ascending=False).round(2)
+
+
+def process_raw_data(df, df_uom, storage_type='ZYY', interval_grid=DEFAULT_INTERVAL_GRID, quantiles=(), exact_quantiles_mode=False):
+    """Memproses seluruh data mentah ZRW70 di memori. Mengembalikan DataFrame kosong jika tidak ada data."""
+    with stage('process_raw_data', rows=len(df)):
+        df_filtered = prepare_rows(df, storage_type, interval_grid)
+        if df_filtered.empty:
+            return pd.DataFrame()
+        return finalize_interval_stats(
+            daily_interval_totals(df_filtered),
+            material_info_table(df_filtered),
+            uom_info_table(df_filtered),
+            df_uom,
+            quantiles=quantiles,
+            exact_quantiles_mode=exact_quantiles_mode
+        )
+
+
+def _source_name(source):
+    return source if isinstance(source, str) else getattr(source, 'name', '')
+
+
+def iter_raw_chunks(source, chunksize=50_000, columns=RAW_COLUMNS):
+    """Membaca file mentah (XLSX atau CSV) per potongan baris, hanya kolom yang dibutuhkan."""
+    if isinstance(source, pd.DataFrame):
+        # Data yang sudah ada di memori dianggap satu potongan
+        yield source
+        return
+    if _source_name(source).lower().endswith('.csv'):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        usecols = None if columns is None else (lambda col: col in columns)
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=usecols)
+    else:
+        yield from iter_xlsx_chunks(source, columns, chunksize=chunksize)
+
+
+def collect_hourly_totals(source, chunksize=50_000, storage_type='ZYY'):
+    """Membaca file mentah per potongan dan melipatnya ke total harian per jam.
+
+    Mengembalikan (total per jam, info material, info UoM), atau (None, None, None)
+    jika tidak ada baris untuk `storage_type`. Memori puncak mengikuti jumlah grup
+    unik (Material ID, Created Date, Created Hour, Movement Type), bukan jumlah baris file.
+    """
+    hourly = None
+    material_info = None
+    uom_info = None
+
+    for chunk in iter_raw_chunks(source, chunksize):
+        df_filtered = prepare_rows(chunk, storage_type)
+        if df_filtered.empty:
+            continue
+
+        # Total parsial digabung dengan akumulasi sebelumnya (jumlah bersifat mergeable)
+        partial = hourly_totals(df_filtered)
+        if hourly is None:
+            hourly = partial
+        else:
+            hourly = pd.concat([hourly, partial], ignore_index=True)
+            hourly = hourly.groupby(_hourly_group_keys(hourly))['TO Dummy Quantity'].sum().reset_index()
+
+        # Urutan kemunculan pertama tetap terjaga karena potongan dibaca berurutan
+        chunk_material = material_info_table(df_filtered)
+        material_info = chunk_material if material_info is None else pd.concat([material_info, chunk_material], ignore_index=True).drop_duplicates(subset=_material_keys(chunk_material))
+        chunk_uom = uom_info_table(df_filtered)
+        uom_info = chunk_uom if uom_info is None else pd.concat([uom_info, chunk_uom], ignore_index=True).drop_duplicates()
+
+    return hourly, material_info, uom_info
+
+
+def process_raw_data_chunked(source, df_uom, chunksize=50_000, storage_type='ZYY', interval_grid=DEFAULT_INTERVAL_GRID,
+                             quantiles=(), exact_quantiles_mode=False):
+    """Versi streaming dari `process_raw_data` (lewat total per jam). Hasil akhir sama dengan jalur di memori."""
+    with stage('process_raw_data_chunked'):
+        hourly, material_info, uom_info = collect_hourly_totals(source, chunksize, storage_type)
+        if hourly is None:
+            return pd.DataFrame()
+        return finalize_interval_stats(
+            interval_totals_from_hourly(hourly, interval_grid), material_info, uom_info, df_uom,
+            quantiles=quantiles, exact_quantiles_mode=exact_quantiles_mode
+        )